@@ -0,0 +1,137 @@
+"""
+JSON 직렬화 벤치마크 - 표준 json vs fast_json(orjson)
+
+실제 응답과 비슷한 페이로드 3종으로 호출당 시간을 비교합니다.
+  1) /mcp/recommend 응답 (차량 10대, NumPy 점수/가격, datetime, 중첩 금융/리뷰 분석)
+  2) SSE 진행률 프레임 (작은 dict, 초당 가장 많이 직렬화됨)
+  3) context_sync 세션 (대화 이력 50건)
+두 백엔드 결과를 다시 파싱해서 같은지도 확인합니다.
+
+사용법:
+    python bench_json.py            # 각 2000회
+    python bench_json.py 10000
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+import fast_json
+from fast_json import _default
+
+
+async def _import_context_sync():
+    # context_sync는 import 시 전역 도구가 백그라운드 태스크를 만들므로 이벤트 루프 안에서 import
+    from tools import context_sync
+    return context_sync
+
+
+def make_recommendation(n: int = 10) -> dict:
+    rng = np.random.default_rng(0)
+    now = datetime(2025, 9, 21, 12, 0, 0, 123456)
+    vehicles = []
+    for i in range(n):
+        vehicles.append({
+            "vehicle_id": f"{38_000_000 + i}",
+            "brand": "현대", "model": "그랜저 하이브리드", "year": np.int64(2019 + i % 5),
+            "price": np.int64(2_500 + 100 * i), "mileage": np.int64(rng.integers(10_000, 120_000)),
+            "score": np.float64(rng.random()), "weight": np.float32(0.8),
+            "features": rng.random(16),
+            "source": "vehicle_expert", "sources": ["vehicle_expert", "ncf_model"],
+            "reason": "예산 범위 내 저주행 하이브리드, 동급 대비 가격 경쟁력 우수",
+            "finance": {
+                "options": [
+                    {"type": t, "monthly_payment": np.float64(rng.random() * 100), "total_cost": np.float64(rng.random() * 5000),
+                     "interest_rate": np.float64(0.045), "term_months": 36}
+                    for t in ("cash", "installment", "lease")
+                ],
+                "tco": {"depreciation": np.float64(812.5), "insurance": np.float64(300.0), "fuel": np.float64(640.2)},
+            },
+            "review": {
+                "sentiment": {"positive": np.float64(0.72), "neutral": np.float64(0.18), "negative": np.float64(0.10)},
+                "keywords": ["연비", "승차감", "정숙성", "옵션"],
+                "analyzed_at": now - timedelta(minutes=i),
+            },
+            "listed_at": now - timedelta(days=i),
+        })
+    return {
+        "success": True,
+        "recommendations": {
+            "vehicles": vehicles, "fusion_method": "weighted_average",
+            "agent_contributions": {"vehicle_expert": 0.85, "finance_expert": 0.8, "review_analyst": 0.78},
+            "ncf_contribution": np.float64(0.85),
+        },
+        "degraded": False,
+        "components": {"completed": ["vehicle_expert", "finance_expert", "review_analyst", "ncf_model"], "timed_out": [], "failed": []},
+        "execution_time": 1.234, "timestamp": now,
+    }
+
+
+def make_progress() -> dict:
+    return {"type": "agent_progress", "agent_name": "차량전문가", "status": "analyzing",
+            "progress": np.float64(0.3), "message": "차량전문가 데이터 분석 중", "timestamp": datetime.now().isoformat()}
+
+
+def make_session(SessionContext):
+    now = datetime(2025, 9, 21, 12, 0, 0)
+    return SessionContext(
+        session_id="session-1", user_id="user-1", created_at=now, last_updated=now,
+        participating_agents={"vehicle_expert", "finance_expert", "review_analyst"},
+        shared_variables={"budget": 3000, "fuel": "하이브리드"},
+        conversation_history=[{"role": "user" if i % 2 else "agent", "content": f"메시지 {i} " * 10,
+                               "timestamp": (now + timedelta(seconds=i)).isoformat()} for i in range(50)],
+        user_preferences={"brands": ["현대", "기아"], "budget_max": 3500},
+        current_task="recommend", task_progress={"step": 3, "total": 5},
+    )
+
+
+def stdlib_dumps(obj) -> bytes:
+    # 기존 방식 (json.dumps + 변환 함수)
+    return json.dumps(obj, default=_default).encode("utf-8")
+
+
+def same(a, b) -> bool:
+    """파싱 결과 비교 (float32는 orjson이 짧은 표현으로 쓰므로 float은 근사 비교)"""
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return isinstance(b, list) and len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return isinstance(b, (int, float)) and math.isclose(a, b, rel_tol=1e-6)
+    return a == b
+
+
+def per_call_us(fn, obj, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(obj)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main(repeat: int = 2000):
+    context_sync = asyncio.run(_import_context_sync())
+    session = make_session(context_sync.SessionContext)
+    tool = context_sync.ContextSyncTool
+    assert tool._deserialize_session(tool._serialize_session(session)) == session, "세션 왕복 불일치"
+
+    payloads = {"recommend 응답": make_recommendation(), "SSE 진행률": make_progress(), "세션 컨텍스트": session}
+    print(f"[BENCH] fast_json 백엔드: {fast_json.BACKEND}")
+    for name, obj in payloads.items():
+        assert same(json.loads(stdlib_dumps(obj)), fast_json.loads(fast_json.dumps(obj))), f"{name}: 결과 불일치"
+        base = per_call_us(stdlib_dumps, obj, repeat)
+        fast = per_call_us(fast_json.dumps, obj, repeat)
+        size = len(fast_json.dumps(obj))
+        print(f"  {name:10s} ({size:6,d} B): json {base:8.1f} us → fast_json {fast:7.1f} us  (x{base / fast:.1f})")
+    print("[OK] 두 백엔드 직렬화 결과 동일")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,66 @@
+"""
+NCF 레지스트리 점검 - 레지스트리에서 warm-up한 NCF 예측기로 실제 추론이 되는지 확인합니다.
+
+/ready가 ncf_predictor를 ready로 보고해도 서버의 호출 경로(_execute_ncf_prediction)가
+도구 API와 맞지 않으면 모든 요청이 빈 결과가 되므로, 서버 메서드를 그대로 호출해서 확인합니다.
+
+  1) ncf_predictor warm-up (모델 로드/초기화 대기)
+  2) _execute_ncf_prediction → NCFPredictTool.execute(action=predict) 결과가 비어 있지 않고 오류가 없음
+  3) 예측 형식 (vehicle_id, score 0~1) 과 점수 내림차순
+
+사용법:
+    python check_ncf_registry.py          # 예시 후보 차량 20대로 점검
+    python check_ncf_registry.py --db     # DB(search_vehicles)에서 후보 조회
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from agent_registry import AgentRegistry, default_components
+from carfin_mcp_server import CarFinMCPServer
+
+PROFILE = {
+    "user_id": "check-user",
+    "budget": {"min": 1500, "max": 3500},
+    "preferred_brands": ["현대", "기아"],
+}
+
+
+def sample_candidates(n: int = 20):
+    brands = ["현대", "기아", "제네시스", "BMW"]
+    return [
+        {"vehicleid": 1000 + i, "manufacturer": brands[i % len(brands)], "model": f"모델{i}",
+         "modelyear": 2015 + i % 10, "price": 1200 + 150 * i, "distance": 10_000 * (i + 1),
+         "fueltype": "가솔린", "cartype": "준중형차"}
+        for i in range(n)
+    ]
+
+
+async def main(use_db: bool = False):
+    registry = AgentRegistry([c for c in default_components() if c.name == "ncf_predictor"])
+    await registry.warm_up()
+    assert registry.ready, registry.status()
+    print(f"[OK] ncf_predictor warm-up: {registry.status()['components']['ncf_predictor']}")
+
+    server = CarFinMCPServer(agent_registry=registry)
+    if not use_db:
+        async def candidates(user_profile):
+            return sample_candidates()
+        server._ncf_candidates = candidates
+
+    result = await server._execute_ncf_prediction(PROFILE)
+    assert "error" not in result, result
+    predictions = result["predictions"]
+    assert predictions, result
+    assert all("vehicle_id" in p and 0.0 <= p["score"] <= 1.0 for p in predictions), predictions
+    scores = [p["score"] for p in predictions]
+    assert scores == sorted(scores, reverse=True), scores
+    print(f"[OK] NCF 추론 {len(predictions)}건, 상위: {predictions[0]['vehicle_id']} ({predictions[0]['score']:.4f})")
+    print(f"[OK] 모델 정보: {result['model_info']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(use_db="--db" in sys.argv[1:]))
@@ -0,0 +1,86 @@
+"""
+세션 버스 점검 - 레플리카 2개를 띄운 것처럼 SSEManager 2개를 만들고
+A 레플리카에서 보낸 이벤트가 B 레플리카의 SSE 대기열에 도착하는지 확인합니다.
+
+  1) 다른 레플리카 세션으로 전달 (진행률 합치기 포함)
+  2) 전체 방송이 양쪽 레플리카에 모두 도착
+  3) 레플리카 간 전달 지연 (이벤트 1000건)
+  4) 연결 종료 후에는 전달되지 않음 (undelivered 집계)
+
+사용법:
+    python check_session_bus.py                                  # 프로세스 내부 버스
+    MCP_SESSION_BUS_URL=redis://localhost:6379/0 python check_session_bus.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from carfin_mcp_server import SSEManager
+from session_bus import LocalHub, LocalSessionBus, RedisSessionBus, SESSION_BUS_URL
+
+
+def make_buses():
+    if SESSION_BUS_URL:
+        return RedisSessionBus(SESSION_BUS_URL), RedisSessionBus(SESSION_BUS_URL)
+    hub = LocalHub()
+    return LocalSessionBus(hub), LocalSessionBus(hub)
+
+
+async def drain(queue, count: int, timeout: float = 2.0):
+    return [await asyncio.wait_for(queue.get(), timeout) for _ in range(count)]
+
+
+async def main(events: int = 1000):
+    bus_a, bus_b = make_buses()
+    replica_a, replica_b = SSEManager(bus=bus_a), SSEManager(bus=bus_b)
+    await replica_a.start()
+    await replica_b.start()
+    print(f"[CHECK] 세션 버스: {bus_a.name}")
+
+    try:
+        # 1) POST는 A, SSE 연결은 B
+        queue = await replica_b.create_session("session-1")
+        await asyncio.sleep(0.05)  # Redis 구독 반영 대기
+        await replica_a.send_to_session({"type": "agent_progress", "agent_name": "차량전문가", "progress": 0.3}, "session-1")
+        await replica_a.send_to_session({"type": "recommendation_complete", "vehicles": [1, 2, 3]}, "session-1")
+        received = await drain(queue, 2)
+        assert received[0].startswith("event: agent_progress"), received[0]
+        assert received[1].startswith("event: recommendation_complete"), received[1]
+        print("[OK] 다른 레플리카의 SSE 세션으로 전달")
+
+        # 2) 방송은 양쪽 레플리카의 세션 모두
+        other = await replica_a.create_session("session-2")
+        await asyncio.sleep(0.05)
+        await replica_b.broadcast_all({"type": "system_notice", "message": "점검"})
+        assert (await drain(queue, 1))[0].startswith("event: system_notice")
+        assert (await drain(other, 1))[0].startswith("event: system_notice")
+        print("[OK] 전체 방송이 모든 레플리카에 도착")
+
+        # 3) 지연 (A → B, 대기열 꺼내기까지)
+        started = time.perf_counter()
+        for i in range(events):
+            await replica_a.send_to_session({"type": "agent_result", "seq": i}, "session-1")
+            await drain(queue, 1)
+        per_event_us = (time.perf_counter() - started) / events * 1e6
+        print(f"[BENCH] 레플리카 간 전달 {events}건: 건당 {per_event_us:.1f} us")
+
+        # 4) 연결 종료 후
+        replica_b.remove_session("session-1", queue)
+        await asyncio.sleep(0.05)
+        await replica_a.send_to_session({"type": "agent_result"}, "session-1")
+        assert bus_a.metrics()["undelivered"] >= 1, bus_a.metrics()
+        print("[OK] 연결 종료 후 이벤트는 undelivered로 집계")
+
+        print(f"[METRICS] A: {replica_a.metrics()['bus']}")
+        print(f"[METRICS] B: {replica_b.metrics()['bus']}")
+    finally:
+        await replica_a.close()
+        await replica_b.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(*(int(a) for a in sys.argv[1:2])))
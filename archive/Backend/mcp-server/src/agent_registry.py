@@ -0,0 +1,147 @@
+"""
+에이전트 레지스트리 - 서버 시작 시 에이전트/모델을 한 번만 만들어 두고 요청 간 공유
+
+- 요청마다 import + 생성하던 VehicleExpert/FinanceExpert/ReviewAnalyst 에이전트와 NCF 예측기를
+  서버 시작 시 백그라운드로 미리 생성(warm-up)해서 첫 요청 지연을 없앰
+- 무거운 import(KoBERT, torch, sklearn)는 스레드에서 실행해 이벤트 루프를 막지 않음
+- 컴포넌트별 상태(pending/loading/ready/failed)와 로딩 시간을 readiness 프로브로 노출
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("CarFin-MCP.AgentRegistry")
+
+
+class AgentUnavailableError(RuntimeError):
+    """warm-up이 끝나지 않았거나 실패한 컴포넌트를 요청했을 때"""
+
+
+@dataclass
+class AgentComponent:
+    name: str
+    factory: Callable[[], Any]
+    # 이벤트 루프 스레드에서 생성해야 하는 경우 (생성자에서 asyncio.create_task 등을 호출)
+    in_loop: bool = False
+    # 생성 후 추가 준비 (모델 로드 대기 등)
+    warm: Optional[Callable[[Any], Awaitable[None]]] = None
+    status: str = "pending"
+    error: Optional[str] = None
+    load_seconds: Optional[float] = None
+    instance: Any = field(default=None, repr=False)
+
+
+def _vehicle_expert():
+    from agents.vehicle_expert_agent import VehicleExpertAgent
+    return VehicleExpertAgent()
+
+def _finance_expert():
+    from agents.finance_expert_agent import FinanceExpertAgent
+    return FinanceExpertAgent()
+
+def _review_analyst():
+    # import 시 KoBERT 모델 로드
+    from agents.review_analyst_agent import ReviewAnalystAgent
+    return ReviewAnalystAgent()
+
+def _ncf_predictor():
+    # 모듈 전역 인스턴스 재사용 (생성자가 모델 로드 태스크를 예약하므로 루프 안에서 import)
+    from tools.ncf_predict import ncf_predict_tool
+    return ncf_predict_tool
+
+async def _wait_ncf_model(tool, timeout: float = 120.0, interval: float = 0.05):
+    """생성자가 예약한 모델 로드(_load_or_init_model)가 끝날 때까지 대기"""
+    deadline = time.monotonic() + timeout
+    while getattr(tool, "model", None) is None:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"NCF 모델 로드 대기 시간 초과 ({timeout:.0f}초)")
+        await asyncio.sleep(interval)
+
+
+def default_components() -> List[AgentComponent]:
+    return [
+        AgentComponent("vehicle_expert", _vehicle_expert),
+        AgentComponent("finance_expert", _finance_expert),
+        AgentComponent("review_analyst", _review_analyst),
+        AgentComponent("ncf_predictor", _ncf_predictor, in_loop=True, warm=_wait_ncf_model),
+    ]
+
+
+class AgentRegistry:
+    """에이전트/모델 인스턴스 보관소 (프로세스당 하나, 요청 핸들러에 주입)"""
+
+    def __init__(self, components: Optional[List[AgentComponent]] = None):
+        self.components: Dict[str, AgentComponent] = {
+            c.name: c for c in (components if components is not None else default_components())
+        }
+        self._warm_task: Optional[asyncio.Task] = None
+        self._done = asyncio.Event()
+
+    async def _load(self, component: AgentComponent):
+        start = time.perf_counter()
+        component.status = "loading"
+        try:
+            if component.in_loop:
+                instance = component.factory()
+            else:
+                instance = await asyncio.to_thread(component.factory)
+            if component.warm is not None:
+                await component.warm(instance)
+            component.instance = instance
+            component.status = "ready"
+            logger.info(f"✅ 에이전트 준비 완료: {component.name} ({time.perf_counter() - start:.2f}초)")
+        except Exception as e:
+            component.status = "failed"
+            component.error = str(e)
+            logger.error(f"❌ 에이전트 준비 실패: {component.name}: {e}")
+        finally:
+            component.load_seconds = round(time.perf_counter() - start, 3)
+
+    async def warm_up(self):
+        """모든 컴포넌트를 동시에 준비 (실패한 컴포넌트는 failed로 남고 나머지는 계속 사용 가능)"""
+        try:
+            await asyncio.gather(*(self._load(c) for c in self.components.values()))
+        finally:
+            self._done.set()
+        ready = sum(c.status == "ready" for c in self.components.values())
+        logger.info(f"🔥 에이전트 warm-up 완료: {ready}/{len(self.components)}")
+
+    def start_warm_up(self) -> asyncio.Task:
+        """백그라운드 warm-up 시작 (서버는 바로 요청을 받고, readiness는 완료 후 true)"""
+        if self._warm_task is None:
+            self._warm_task = asyncio.create_task(self.warm_up())
+        return self._warm_task
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        return self._done.is_set() and all(c.status == "ready" for c in self.components.values())
+
+    def get(self, name: str) -> Any:
+        component = self.components.get(name)
+        if component is None:
+            raise AgentUnavailableError(f"Unknown agent: {name}")
+        if component.status != "ready":
+            detail = f": {component.error}" if component.error else ""
+            raise AgentUnavailableError(f"Agent '{name}' is {component.status}{detail}")
+        return component.instance
+
+    def status(self) -> Dict[str, Any]:
+        """readiness 프로브 응답 본문"""
+        return {
+            "ready": self.ready,
+            "warm_up_finished": self._done.is_set(),
+            "components": {
+                name: {"status": c.status, "load_seconds": c.load_seconds, "error": c.error}
+                for name, c in self.components.items()
+            },
+        }
@@ -9,17 +9,23 @@ import json
 import logging
 import os
 import sys
-from typing import Dict, List, Any, Optional, AsyncGenerator
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Any, Optional, AsyncGenerator, Awaitable, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 import uvicorn
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
 # 실제 AI 파이프라인 import
 from real_ai_pipeline import process_real_ai_collaboration
+from agent_registry import AgentRegistry
+import fast_json
+from recommendation_cache import RecommendationCache
+from session_bus import SessionBus, create_session_bus
 
 # 로깅 설정
 logging.basicConfig(
@@ -28,6 +34,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger("CarFin-MCP")
 
+# /mcp/recommend 지연 예산 - 요청 전체 예산 안에 끝난 컴포넌트 결과만 융합
+RECOMMEND_BUDGET_SECONDS = float(os.getenv("MCP_RECOMMEND_BUDGET_MS", "3000")) / 1000
+RECOMMEND_MAX_BUDGET_SECONDS = float(os.getenv("MCP_RECOMMEND_MAX_BUDGET_MS", "10000")) / 1000
+# 컴포넌트별 타임아웃 (요청 예산보다 길면 요청 예산이 우선)
+COMPONENT_TIMEOUT_SECONDS = {
+    "vehicle_expert": float(os.getenv("MCP_VEHICLE_EXPERT_TIMEOUT_MS", "2500")) / 1000,
+    "finance_expert": float(os.getenv("MCP_FINANCE_EXPERT_TIMEOUT_MS", "2500")) / 1000,
+    "review_analyst": float(os.getenv("MCP_REVIEW_ANALYST_TIMEOUT_MS", "2500")) / 1000,
+    "ncf_model": float(os.getenv("MCP_NCF_TIMEOUT_MS", "1500")) / 1000,
+}
+# 융합/응답 직렬화에 남겨 둘 시간
+FUSION_RESERVE_SECONDS = 0.05
+# NCF가 점수를 매길 후보 차량 수 (예산 조건으로 DB에서 검색)
+NCF_CANDIDATE_LIMIT = int(os.getenv("MCP_NCF_CANDIDATE_LIMIT", "50"))
+NCF_TOP_K = 10
+
 # MCP 요청/응답 모델
 class MCPRequest(BaseModel):
     tool_name: str = Field(..., description="MCP Tool 이름")
@@ -46,6 +68,7 @@ class RecommendationRequest(BaseModel):
     user_profile: Dict[str, Any] = Field(..., description="사용자 프로필")
     request_type: str = Field("full_recommendation", description="요청 타입")
     limit: int = Field(10, description="추천 결과 개수")
+    deadline_ms: Optional[int] = Field(None, gt=0, description="요청 지연 예산 (ms, 기본 MCP_RECOMMEND_BUDGET_MS)")
 
 @dataclass
 class AgentResult:
@@ -68,41 +91,218 @@ class AgentProgressUpdate:
         if self.timestamp is None:
             self.timestamp = datetime.now()
 
-class SSEManager:
-    """SSE(Server-Sent Events) 연결 관리 클래스"""
-
-    def __init__(self):
-        self.active_sessions: Dict[str, asyncio.Queue] = {}
+class FastJSONResponse(JSONResponse):
+    """fast_json(orjson)으로 렌더링하는 응답 - NumPy/datetime이 섞인 결과도 그대로 직렬화
+
+    라우트에서 이 응답을 직접 반환하면 FastAPI의 jsonable_encoder 변환 단계도 건너뜀
+    """
+
+    def render(self, content: Any) -> bytes:
+        return fast_json.dumps(content)
+
+# SSE 세션별 큐 한도 - 느린 클라이언트가 있어도 세션당 메모리는 이 이상 늘지 않음
+SSE_QUEUE_SIZE = int(os.getenv("MCP_SSE_QUEUE_SIZE", "100"))
+# 진행률 이벤트 - 아직 전달 안 된 같은 종류(같은 에이전트)의 이전 메시지는 최신 것으로 덮어씀
+SSE_COALESCE_TYPES = {"agent_progress", "ncf_progress", "fusion_progress", "keep_alive"}
+
+class SessionQueue:
+    """세션 하나의 전송 대기열 (직렬화된 SSE 문자열 보관, 크기 제한)
+
+    - 진행률 이벤트는 (type, agent_name) 기준으로 합쳐서 최신 것만 유지
+    - 가득 차면 가장 오래된 진행률 이벤트부터 버림
+    - 버릴 진행률 이벤트도 없으면(결과/오류 메시지만 쌓임) 클라이언트가 멈춘 것으로 보고 세션을 닫음
+    """
+
+    def __init__(self, maxsize: int = SSE_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._items: deque = deque()  # [coalesce_key or None, payload]
+        self._pending: Dict[Any, list] = {}
+        self._ready = asyncio.Event()
+        self.closed = False
+        self.close_reason: Optional[str] = None
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, payload: str, coalesce_key: Any = None) -> bool:
+        """대기열에 추가 (절대 기다리지 않음). 세션이 닫혀 있거나 닫히면 False"""
+        if self.closed:
+            return False
+        if coalesce_key is not None and coalesce_key in self._pending:
+            self._pending[coalesce_key][1] = payload
+            self.coalesced += 1
+            return True
+        if len(self._items) >= self.maxsize and not self._drop_oldest_progress():
+            self.close("slow_consumer")
+            self.dropped += 1  # 지금 넣으려던 메시지
+            return False
+        entry = [coalesce_key, payload]
+        self._items.append(entry)
+        if coalesce_key is not None:
+            self._pending[coalesce_key] = entry
+        self._ready.set()
+        return True
+
+    def _drop_oldest_progress(self) -> bool:
+        for entry in self._items:
+            if entry[0] is not None:
+                self._items.remove(entry)
+                del self._pending[entry[0]]
+                self.dropped += 1
+                return True
+        return False
+
+    async def get(self) -> Optional[str]:
+        """다음 메시지 (세션이 닫혔고 남은 메시지가 없으면 None)"""
+        while not self._items:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        key, payload = self._items.popleft()
+        if key is not None:
+            del self._pending[key]
+        self.sent += 1
+        return payload
+
+    def close(self, reason: str = "closed"):
+        if not self.closed:
+            self.closed = True
+            self.close_reason = reason
+            if reason == "slow_consumer":
+                self.dropped += len(self._items)
+                self._items.clear()
+                self._pending.clear()
+            self._ready.set()
 
-    def create_session(self, session_id: str) -> asyncio.Queue:
-        """새로운 SSE 세션 생성"""
-        if session_id in self.active_sessions:
-            # 기존 세션이 있으면 정리
+class SSEManager:
+    """SSE(Server-Sent Events) 연결 관리 클래스
+
+    bus가 있으면 이 레플리카에 연결이 없는 세션의 이벤트를 버스로 발행하고,
+    다른 레플리카가 발행한 이 레플리카 세션의 이벤트를 받아 대기열에 넣음
+    """
+
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE, bus: Optional[SessionBus] = None):
+        self.queue_size = queue_size
+        self.bus = bus
+        self.active_sessions: Dict[str, SessionQueue] = {}
+        # 종료된 세션 누적 지표
+        self.closed_stats = {"sent": 0, "dropped": 0, "coalesced": 0, "slow_consumer_closed": 0, "replaced": 0}
+
+    async def start(self):
+        """버스 수신 시작 (서버 lifespan에서 호출)"""
+        if self.bus is not None:
+            await self.bus.start(self._deliver)
+
+    async def close(self):
+        for session_id in list(self.active_sessions):
             self.remove_session(session_id)
-
-        queue = asyncio.Queue()
+        if self.bus is not None:
+            await self.bus.close()
+
+    async def create_session(self, session_id: str) -> SessionQueue:
+        """새로운 SSE 세션 생성 (같은 ID의 기존 세션은 닫아서 이전 연결의 스트림도 종료)"""
+        previous = self.active_sessions.pop(session_id, None)
+        if previous is not None:
+            # 버스 구독은 새 연결이 이어받으므로 해제하지 않음
+            self.closed_stats["replaced"] += 1
+            logger.warning(f"♻️ SSE 세션 재연결, 기존 연결 종료: {session_id}")
+            self._retire(previous)
+
+        queue = SessionQueue(self.queue_size)
         self.active_sessions[session_id] = queue
+        if self.bus is not None:
+            await self.bus.subscribe(session_id)
         logger.info(f"🔗 SSE 세션 생성: {session_id}")
         return queue
 
-    def remove_session(self, session_id: str):
-        """SSE 세션 제거"""
-        if session_id in self.active_sessions:
-            del self.active_sessions[session_id]
-            logger.info(f"🔌 SSE 세션 종료: {session_id}")
+    def remove_session(self, session_id: str, queue: Optional[SessionQueue] = None):
+        """SSE 세션 제거 (queue를 주면 그 큐가 현재 세션일 때만 - 재연결된 새 세션을 지우지 않도록)"""
+        current = self.active_sessions.get(session_id)
+        if current is None or (queue is not None and current is not queue):
+            return
+        del self.active_sessions[session_id]
+        self._retire(current)
+        if self.bus is not None:
+            self.bus.unsubscribe(session_id)
+        logger.info(f"🔌 SSE 세션 종료: {session_id}")
+
+    def _retire(self, queue: SessionQueue):
+        queue.close()
+        self.closed_stats["sent"] += queue.sent
+        self.closed_stats["dropped"] += queue.dropped
+        self.closed_stats["coalesced"] += queue.coalesced
+
+    def _enqueue(self, session_id: str, queue: SessionQueue, payload: str, coalesce_key: Any):
+        if not queue.put_nowait(payload, coalesce_key) and queue.close_reason == "slow_consumer":
+            logger.warning(f"🐢 SSE 세션 대기열 초과로 종료: {session_id}")
+            self.closed_stats["slow_consumer_closed"] += 1
+            self.remove_session(session_id, queue)
+
+    @staticmethod
+    def _coalesce_key(message: dict, event_type: str) -> Any:
+        if event_type in SSE_COALESCE_TYPES:
+            return (event_type, message.get("agent_name"))
+        return None
+
+    def _deliver(self, session_id: Optional[str], payload: str, coalesce_key: Any):
+        """버스에서 받은 메시지를 이 레플리카의 대기열에 넣음 (session_id가 None이면 전체)"""
+        if session_id is None:
+            for sid, queue in list(self.active_sessions.items()):
+                self._enqueue(sid, queue, payload, coalesce_key)
+            return
+        queue = self.active_sessions.get(session_id)
+        if queue is not None:
+            self._enqueue(session_id, queue, payload, coalesce_key)
 
     async def send_to_session(self, message: dict, session_id: str):
-        """특정 세션에 메시지 전송"""
-        if session_id in self.active_sessions:
-            try:
-                await self.active_sessions[session_id].put(message)
-            except Exception as e:
-                logger.error(f"❌ SSE 메시지 전송 실패 (세션: {session_id}): {e}")
+        """특정 세션에 메시지 전송 (대기열에 넣기만 하므로 느린 클라이언트가 호출자를 막지 않음)
+
+        세션이 이 레플리카에 있으면 바로 대기열에, 없으면 버스로 발행해 연결을 가진 레플리카가 받음
+        """
+        queue = self.active_sessions.get(session_id)
+        if queue is None and self.bus is None:
+            return
+        try:
+            event_type = message.get("type", "message")
+            payload = self.format_sse_message(message, event_type)
+            coalesce_key = self._coalesce_key(message, event_type)
+            if queue is not None:
+                self._enqueue(session_id, queue, payload, coalesce_key)
+            else:
+                await self.bus.publish(session_id, payload, coalesce_key)
+        except Exception as e:
+            logger.error(f"❌ SSE 메시지 전송 실패 (세션: {session_id}): {e}")
 
     async def broadcast_all(self, message: dict):
-        """모든 활성 세션에 메시지 전송"""
-        for session_id in list(self.active_sessions.keys()):
-            await self.send_to_session(message, session_id)
+        """모든 활성 세션에 메시지 전송 (한 번만 직렬화, 세션별로 기다리지 않음, 버스가 있으면 전체 레플리카)"""
+        event_type = message.get("type", "message")
+        payload = self.format_sse_message(message, event_type)
+        coalesce_key = self._coalesce_key(message, event_type)
+        if self.bus is not None:
+            await self.bus.broadcast(payload, coalesce_key)
+        else:
+            self._deliver(None, payload, coalesce_key)
+
+    def metrics(self) -> Dict[str, Any]:
+        """대기열 깊이/버림/합침 지표"""
+        queues = list(self.active_sessions.values())
+        depths = [len(q) for q in queues]
+        return {
+            "active_sessions": len(queues),
+            "queue_limit": self.queue_size,
+            "queued_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "sent": self.closed_stats["sent"] + sum(q.sent for q in queues),
+            "dropped": self.closed_stats["dropped"] + sum(q.dropped for q in queues),
+            "coalesced": self.closed_stats["coalesced"] + sum(q.coalesced for q in queues),
+            "slow_consumer_closed": self.closed_stats["slow_consumer_closed"],
+            "replaced_sessions": self.closed_stats["replaced"],
+            "bus": self.bus.metrics() if self.bus is not None else None
+        }
 
     def format_sse_message(self, data: dict, event_type: str = None) -> str:
         """SSE 형식으로 메시지 포맷"""
@@ -111,19 +311,33 @@ class SSEManager:
         if event_type:
             message_parts.append(f"event: {event_type}")
 
-        message_parts.append(f"data: {json.dumps(data)}")
+        message_parts.append(f"data: {fast_json.dumps_str(data)}")
         message_parts.append("")  # SSE는 빈 줄로 메시지 구분
 
         return "\n".join(message_parts)
 
+# 에이전트 이름 → (레지스트리 컴포넌트, 호출 메서드, 인자 구성)
+AGENT_CALLS = {
+    "vehicle_expert": ("vehicle_expert", "analyze_and_recommend", lambda profile, sid: (profile, [], sid)),
+    "finance_expert": ("finance_expert", "analyze_financial_impact", lambda profile, sid: ([], profile, sid)),
+    "review_analyst": ("review_analyst", "analyze_user_satisfaction", lambda profile, sid: ([], profile, sid)),
+}
+
 class CarFinMCPServer:
     """CarFin MCP 서버 - 멀티에이전트 협업 오케스트레이터"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        agent_registry: Optional[AgentRegistry] = None,
+        recommendation_cache: Optional[RecommendationCache] = None,
+        session_bus: Optional[SessionBus] = None
+    ):
         self.app = FastAPI(
             title="CarFin-MCP Server",
             description="멀티에이전트 협업 및 NCF 딥러닝 통합 서버",
-            version="1.0.0-beta"
+            version="1.0.0-beta",
+            lifespan=self._lifespan,
+            default_response_class=FastJSONResponse
         )
 
         # CORS 설정
@@ -137,17 +351,32 @@ class CarFinMCPServer:
 
         # MCP Tools 레지스트리
         self.tools = {}
-        self.agent_pool = {}
         self.session_contexts = {}
 
-        # SSE 관리자
-        self.sse_manager = SSEManager()
+        # 에이전트/NCF 인스턴스 레지스트리 (시작 시 warm-up, 요청 간 공유)
+        self.agent_registry = agent_registry or AgentRegistry()
+
+        # /mcp/recommend 결과 캐시 (메모리 LRU + 선택적 Redis)
+        self.recommendation_cache = recommendation_cache or RecommendationCache()
+
+        # SSE 관리자 (세션 버스로 다른 레플리카의 SSE 연결에도 이벤트 전달)
+        self.sse_manager = SSEManager(bus=session_bus or create_session_bus())
 
         # 라우터 설정
         self._setup_routes()
 
         logger.info("🚀 CarFin-MCP Server 초기화 완료")
 
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        """서버 시작 시 에이전트 warm-up을 백그라운드로 시작 (/ready로 완료 여부 확인) + 세션 버스 수신"""
+        warm_task = self.agent_registry.start_warm_up()
+        await self.sse_manager.start()
+        yield
+        await self.sse_manager.close()
+        if not warm_task.done():
+            warm_task.cancel()
+
     def _setup_routes(self):
         """API 라우터 설정"""
 
@@ -158,9 +387,35 @@ class CarFinMCPServer:
                 "server": "CarFin-MCP",
                 "version": "1.0.0-beta",
                 "tools_registered": len(self.tools),
+                "agents_ready": self.agent_registry.ready,
+                "timestamp": datetime.now().isoformat()
+            }
+
+        @self.app.get("/mcp/sse/metrics")
+        async def sse_metrics():
+            """SSE 세션 대기열 지표"""
+            return {
+                "success": True,
+                "metrics": self.sse_manager.metrics(),
                 "timestamp": datetime.now().isoformat()
             }
 
+        @self.app.get("/mcp/cache/metrics")
+        async def recommendation_cache_metrics():
+            """추천 캐시 적중률/상태"""
+            return {
+                "success": True,
+                "metrics": self.recommendation_cache.metrics(),
+                "timestamp": datetime.now().isoformat()
+            }
+
+        @self.app.get("/ready")
+        async def readiness_check():
+            """Readiness 프로브 - 에이전트/모델 warm-up 완료 전에는 503"""
+            status = self.agent_registry.status()
+            status["timestamp"] = datetime.now().isoformat()
+            return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
         @self.app.post("/mcp/execute", response_model=MCPResponse)
         async def execute_mcp_tool(request: MCPRequest):
             """MCP Tool 실행"""
@@ -178,72 +433,34 @@ class CarFinMCPServer:
 
                 execution_time = (datetime.now() - start_time).total_seconds()
 
-                return MCPResponse(
+                return FastJSONResponse(MCPResponse(
                     success=True,
                     result=result,
                     execution_time=execution_time,
                     tool_name=request.tool_name
-                )
+                ).model_dump())
 
             except Exception as e:
                 execution_time = (datetime.now() - start_time).total_seconds()
                 logger.error(f"❌ MCP Tool '{request.tool_name}' 실행 실패: {e}")
 
-                return MCPResponse(
+                return FastJSONResponse(MCPResponse(
                     success=False,
                     error=str(e),
                     execution_time=execution_time,
                     tool_name=request.tool_name
-                )
+                ).model_dump())
 
         @self.app.post("/mcp/recommend")
         async def orchestrate_recommendation(request: RecommendationRequest):
-            """멀티에이전트 협업 추천 오케스트레이션"""
+            """멀티에이전트 협업 추천 오케스트레이션 (에이전트 단계는 정규화된 프로필 기준 캐시)"""
             start_time = datetime.now()
-
-            try:
-                logger.info(f"🎯 추천 오케스트레이션 시작: 사용자 {request.user_profile.get('user_id', 'anonymous')}")
-
-                # 1. 3개 에이전트 병렬 실행
-                agent_tasks = [
-                    self._execute_agent("vehicle_expert", request.user_profile),
-                    self._execute_agent("finance_expert", request.user_profile),
-                    self._execute_agent("review_analyst", request.user_profile)
-                ]
-
-                # 2. NCF 모델 병렬 추론
-                ncf_task = self._execute_ncf_prediction(request.user_profile)
-
-                # 3. 모든 결과 수집
-                agent_results = await asyncio.gather(*agent_tasks, return_exceptions=True)
-                ncf_result = await ncf_task
-
-                # 4. 결과 융합
-                final_recommendation = await self._fuse_recommendations(
-                    agent_results, ncf_result, request.user_profile
-                )
-
-                execution_time = (datetime.now() - start_time).total_seconds()
-
-                logger.info(f"✅ 추천 완료: {execution_time:.2f}초")
-
-                return {
-                    "success": True,
-                    "recommendations": final_recommendation,
-                    "execution_time": execution_time,
-                    "timestamp": datetime.now().isoformat()
-                }
-
-            except Exception as e:
-                execution_time = (datetime.now() - start_time).total_seconds()
-                logger.error(f"❌ 추천 오케스트레이션 실패: {e}")
-
-                return {
-                    "success": False,
-                    "error": str(e),
-                    "execution_time": execution_time,
-                    "timestamp": datetime.now().isoformat()
-                }
+            response = await self._orchestrate_recommendation(request)
+            return FastJSONResponse({
+                **response,
+                "execution_time": (datetime.now() - start_time).total_seconds(),
+                "timestamp": datetime.now().isoformat()
+            })
 
         @self.app.get("/sse/{session_id}")
         async def sse_endpoint(session_id: str, request: Request):
@@ -251,7 +468,7 @@ class CarFinMCPServer:
 
             async def event_stream() -> AsyncGenerator[str, None]:
                 # 세션 생성
-                queue = self.sse_manager.create_session(session_id)
+                queue = await self.sse_manager.create_session(session_id)
 
                 try:
                     # 연결 성공 메시지 전송
@@ -263,13 +480,15 @@ class CarFinMCPServer:
                     }
                     yield self.sse_manager.format_sse_message(connection_msg, "connection")
 
-                    # 큐에서 메시지 스트리밍
+                    # 큐에서 메시지 스트리밍 (보낼 때 이미 직렬화된 SSE 문자열)
                     while True:
                         try:
                             # 메시지 대기 (타임아웃 추가로 연결 유지 확인)
-                            message = await asyncio.wait_for(queue.get(), timeout=30.0)
-                            event_type = message.get("type", "message")
-                            yield self.sse_manager.format_sse_message(message, event_type)
+                            payload = await asyncio.wait_for(queue.get(), timeout=30.0)
+                            if payload is None:
+                                # 재연결로 교체됐거나 대기열 초과로 닫힌 세션
+                                break
+                            yield payload
 
                         except asyncio.TimeoutError:
                             # Keep-alive 메시지 전송
@@ -286,8 +505,8 @@ class CarFinMCPServer:
                 except Exception as e:
                     logger.error(f"❌ SSE 연결 오류: {e}")
                 finally:
-                    # 세션 정리
-                    self.sse_manager.remove_session(session_id)
+                    # 세션 정리 (이 연결의 큐일 때만)
+                    self.sse_manager.remove_session(session_id, queue)
 
             return StreamingResponse(
                 event_stream(),
@@ -314,27 +533,169 @@ class CarFinMCPServer:
                 "sse_endpoint": f"/sse/{session_id}"
             }
 
+    async def _orchestrate_recommendation(self, request: RecommendationRequest) -> Dict[str, Any]:
+        """에이전트 + NCF 실행 후 융합
+
+        에이전트 단계는 프로필 기준이라 user_id를 뺀 정규화 키로 캐시하고(같은 키 동시 요청은 한 번만 계산),
+        NCF는 사용자별 개인화 결과라 캐시하지 않고 요청마다 에이전트 단계와 동시에 실행합니다.
+        """
+        start_time = datetime.now()
+
+        try:
+            logger.info(f"🎯 추천 오케스트레이션 시작: 사용자 {request.user_profile.get('user_id', 'anonymous')}")
+
+            budget = RECOMMEND_BUDGET_SECONDS
+            if request.deadline_ms:
+                budget = min(request.deadline_ms / 1000, RECOMMEND_MAX_BUDGET_SECONDS)
+            component_budget = max(budget - FUSION_RESERVE_SECONDS, 0.0)
+            loop = asyncio.get_running_loop()
+            component_deadline = loop.time() + component_budget
+
+            # 1. NCF(요청마다) + 3개 에이전트(캐시) 병렬 실행 (예산 안에 끝난 것만 사용, 나머지는 취소)
+            ncf_task = asyncio.create_task(self._run_with_deadline(
+                {"ncf_model": self._execute_ncf_prediction(request.user_profile)}, component_budget
+            ))
+            try:
+                key = self.recommendation_cache.make_key(
+                    request.user_profile, request_type=request.request_type, limit=request.limit
+                )
+                # 부분 결과(시간 초과/실패 에이전트가 있는 경우)는 캐시하지 않음
+                # 같은 키를 먼저 계산 중인 요청에 합류하면 이 요청의 남은 예산까지만 기다림
+                try:
+                    agent_part, cache_source = await self.recommendation_cache.get_or_compute(
+                        key,
+                        lambda: self._run_agent_stage(request.user_profile, component_budget),
+                        cacheable=lambda part: not part["timed_out"] and not part["failed"],
+                        timeout=max(component_deadline - loop.time(), 0.0)
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"⏱️ 진행 중인 동일 요청 대기 중 지연 예산 {budget:.2f}초 초과")
+                    agent_part = {"agent_results": [], "timed_out": list(AGENT_CALLS), "failed": []}
+                    cache_source = "coalesced_timeout"
+            except BaseException:
+                ncf_task.cancel()
+                raise
+            ncf_results, ncf_timed_out, ncf_failed = await ncf_task
+
+            agent_results = [
+                AgentResult(**{**r, "timestamp": datetime.fromisoformat(r["timestamp"])})
+                for r in agent_part["agent_results"]
+            ]
+            ncf_result = ncf_results.get("ncf_model") or {
+                "algorithm": "NCF-PyTorch",
+                "predictions": [],
+                "confidence": 0.0,
+                "error": "timeout" if ncf_timed_out else "failed"
+            }
+
+            timed_out = agent_part["timed_out"] + ncf_timed_out
+            failed = agent_part["failed"] + ncf_failed
+            if "ncf_model" in ncf_results and "error" in ncf_result:
+                failed.append("ncf_model")
+
+            # 2. 도착한 결과만으로 융합
+            final_recommendation = await self._fuse_recommendations(
+                agent_results, ncf_result, request.user_profile
+            )
+
+            execution_time = (datetime.now() - start_time).total_seconds()
+            degraded = bool(timed_out or failed)
+
+            logger.info(
+                f"✅ 추천 완료: {execution_time:.2f}초"
+                + (f" (부분 결과 - 시간 초과 {timed_out}, 실패 {failed})" if degraded else "")
+            )
+
+            return {
+                "success": True,
+                "recommendations": final_recommendation,
+                "degraded": degraded,
+                "components": {
+                    "completed": [
+                        name for name in [*AGENT_CALLS, "ncf_model"]
+                        if name not in timed_out and name not in failed
+                    ],
+                    "timed_out": timed_out,
+                    "failed": failed
+                },
+                "cache": cache_source,
+                "deadline_ms": round(budget * 1000),
+                "execution_time": execution_time,
+                "timestamp": datetime.now().isoformat()
+            }
+
+        except Exception as e:
+            execution_time = (datetime.now() - start_time).total_seconds()
+            logger.error(f"❌ 추천 오케스트레이션 실패: {e}")
+
+            return {
+                "success": False,
+                "error": str(e),
+                "execution_time": execution_time,
+                "timestamp": datetime.now().isoformat()
+            }
+
+    async def _run_agent_stage(self, user_profile: Dict[str, Any], budget: float) -> Dict[str, Any]:
+        """3개 에이전트 병렬 실행 (캐시 값 - JSON으로 Redis에 저장되므로 dict/문자열만 사용)"""
+        results, timed_out, failed = await self._run_with_deadline(
+            {name: self._execute_agent(name, user_profile) for name in AGENT_CALLS}, budget
+        )
+        agent_results = [results[name] for name in AGENT_CALLS if name in results]
+        # 에이전트 내부 오류(빈 결과 반환)도 부분 결과로 취급
+        failed += [r.agent_name for r in agent_results if "error" in r.result]
+        return {
+            "agent_results": [
+                {**asdict(r), "timestamp": r.timestamp.isoformat()} for r in agent_results
+            ],
+            "timed_out": timed_out,
+            "failed": failed
+        }
+
+    async def _run_with_deadline(
+        self,
+        jobs: Dict[str, Awaitable[Any]],
+        budget: float
+    ) -> Tuple[Dict[str, Any], List[str], List[str]]:
+        """jobs를 동시에 실행하고 (완료 결과, 시간 초과 목록, 예외 목록) 반환
+
+        각 작업은 COMPONENT_TIMEOUT_SECONDS와 남은 예산 중 짧은 쪽에서 끊기고,
+        예산이 끝나면 아직 실행 중인 작업은 취소합니다. (가장 느린 컴포넌트를 기다리지 않음)
+        """
+        tasks = {
+            asyncio.create_task(asyncio.wait_for(job, min(COMPONENT_TIMEOUT_SECONDS.get(name, budget), budget))): name
+            for name, job in jobs.items()
+        }
+        done, pending = await asyncio.wait(tasks, timeout=budget)
+        for task in pending:
+            task.cancel()
+
+        results, timed_out, failed = {}, [], []
+        for task, name in tasks.items():
+            if task in pending or task.cancelled() or isinstance(task.exception(), asyncio.TimeoutError):
+                timed_out.append(name)
+            elif task.exception() is not None:
+                logger.error(f"❌ 컴포넌트 '{name}' 실행 실패: {task.exception()}")
+                failed.append(name)
+            else:
+                results[name] = task.result()
+        if timed_out:
+            logger.warning(f"⏱️ 지연 예산 {budget:.2f}초 초과로 취소: {timed_out}")
+        return results, timed_out, failed
+
+    async def _run_agent(self, agent_name: str, user_profile: Dict[str, Any], session_id: str) -> Dict[str, Any]:
+        """레지스트리의 공유 에이전트 인스턴스로 분석 실행 - RDS 데이터 기반"""
+        if agent_name not in AGENT_CALLS:
+            raise ValueError(f"Unknown agent: {agent_name}")
+        component, method, build_args = AGENT_CALLS[agent_name]
+        agent = self.agent_registry.get(component)
+        return await getattr(agent, method)(*build_args(user_profile, session_id))
+
     async def _execute_agent(self, agent_name: str, user_profile: Dict[str, Any]) -> AgentResult:
         """개별 에이전트 실행"""
         start_time = datetime.now()
 
         try:
-            # 실제 에이전트 실행 로직 - RDS 데이터 기반
-            from agents.vehicle_expert_agent import VehicleExpertAgent
-            from agents.finance_expert_agent import FinanceExpertAgent
-            from agents.review_analyst_agent import ReviewAnalystAgent
-
-            if agent_name == "vehicle_expert":
-                agent = VehicleExpertAgent()
-                result = await agent.analyze_and_recommend(user_profile, [], "agent_session")
-            elif agent_name == "finance_expert":
-                agent = FinanceExpertAgent()
-                result = await agent.analyze_financial_impact([], user_profile, "agent_session")
-            elif agent_name == "review_analyst":
-                agent = ReviewAnalystAgent()
-                result = await agent.analyze_user_satisfaction([], user_profile, "agent_session")
-            else:
-                raise ValueError(f"Unknown agent: {agent_name}")
+            result = await self._run_agent(agent_name, user_profile, "agent_session")
 
             execution_time = (datetime.now() - start_time).total_seconds()
 
@@ -359,27 +720,33 @@ class CarFinMCPServer:
     async def _execute_ncf_prediction(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
         """실제 NCF 모델 추론 실행 - PyTorch 기반"""
         try:
-            # 실제 NCF 모델 임포트 및 실행
-            from tools.ncf_predict import NCFPredictor
-
-            ncf_predictor = NCFPredictor()
+            # warm-up 때 로드해 둔 NCF 예측기 사용
+            ncf_predictor = self.agent_registry.get("ncf_predictor")
 
-            # 사용자 프로필을 NCF 입력 형식으로 변환
-            user_id = user_profile.get('user_id', 'anonymous')
-            preferences = user_profile.get('preferences', {})
+            # NCF는 사용자-아이템 쌍 점수이므로 후보 차량을 먼저 뽑고 점수를 매김
+            candidates = await self._ncf_candidates(user_profile)
+            if not candidates:
+                raise ValueError("NCF 후보 차량 없음")
 
-            # NCF 모델 실행
-            predictions = await ncf_predictor.predict_user_preferences(
-                user_id=user_id,
-                user_features=preferences,
-                top_k=10
-            )
+            result = await ncf_predictor.execute({
+                "action": "predict",
+                "user_profile": {"user_id": "anonymous", **user_profile},
+                "item_candidates": candidates
+            })
 
             return {
                 "algorithm": "NCF-PyTorch",
-                "predictions": predictions.get('recommendations', []),
-                "confidence": predictions.get('confidence', 0.85),
-                "model_version": predictions.get('model_version', 'ncf-v1.2'),
+                "predictions": [
+                    {
+                        "vehicle_id": pred["item_id"],
+                        "score": pred["score"],
+                        "raw_ncf_score": pred["raw_ncf_score"],
+                        "item_features": pred["item_features"]
+                    }
+                    for pred in result.get("predictions", [])[:NCF_TOP_K]
+                ],
+                "confidence": 0.85,
+                "model_info": result.get("model_info", {}),
                 "data_source": "rds_real_interactions"
             }
 
@@ -394,6 +761,17 @@ class CarFinMCPServer:
                 "data_source": "ncf_model_error"
             }
 
+    async def _ncf_candidates(self, user_profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """NCF 후보 차량 - 사용자 예산 범위의 활성 매물 (search_vehicles 쿼리 재사용)"""
+        from tools.database_query import database_query_tool
+
+        budget = user_profile.get("budget", {})
+        return await database_query_tool.search_vehicles_by_criteria({
+            "min_price": budget.get("min", 0),
+            "max_price": budget.get("max", 50000),
+            "limit": NCF_CANDIDATE_LIMIT
+        })
+
     async def _fuse_recommendations(
         self,
         agent_results: List[AgentResult],
@@ -409,10 +787,10 @@ class CarFinMCPServer:
             for agent_result in agent_results:
                 if isinstance(agent_result, AgentResult) and "recommendations" in agent_result.result:
                     agent_recs = agent_result.result["recommendations"]
-                    for rec in agent_recs[:3]:  # 상위 3개
-                        rec["source"] = agent_result.agent_name
-                        rec["weight"] = agent_result.confidence
-                        final_recommendations.append(rec)
+                    for rec in agent_recs[:3]:  # 상위 3개 (캐시된 에이전트 결과는 수정하지 않고 복사)
+                        final_recommendations.append({
+                            **rec, "source": agent_result.agent_name, "weight": agent_result.confidence
+                        })
 
             # NCF 결과 추가
             if "predictions" in ncf_result:
@@ -537,21 +915,7 @@ class CarFinMCPServer:
             await self._send_agent_progress(session_id, display_name, "analyzing", 0.3, f"{display_name} 데이터 분석 중")
 
             # 실제 에이전트 실행 - RDS 데이터 기반
-            from agents.vehicle_expert_agent import VehicleExpertAgent
-            from agents.finance_expert_agent import FinanceExpertAgent
-            from agents.review_analyst_agent import ReviewAnalystAgent
-
-            if agent_name == "vehicle_expert":
-                agent = VehicleExpertAgent()
-                result = await agent.analyze_and_recommend(user_profile, [], session_id)
-            elif agent_name == "finance_expert":
-                agent = FinanceExpertAgent()
-                result = await agent.analyze_financial_impact([], user_profile, session_id)
-            elif agent_name == "review_analyst":
-                agent = ReviewAnalystAgent()
-                result = await agent.analyze_user_satisfaction([], user_profile, session_id)
-            else:
-                raise ValueError(f"Unknown agent: {agent_name}")
+            result = await self._run_agent(agent_name, user_profile, session_id)
 
             execution_time = (datetime.now() - start_time).total_seconds()
 
@@ -776,10 +1140,8 @@ class CarFinMCPServer:
 
                 logger.info(f"🧠 NCF 모델 업데이트: 사용자 {interaction_data.get('userId', 'unknown')}")
 
-                # NCF 모델 온라인 학습
-                from tools.ncf_predict import NCFPredictor
-
-                predictor = NCFPredictor()
+                # NCF 모델 온라인 학습 (공유 예측기에 반영)
+                predictor = self.agent_registry.get("ncf_predictor")
                 update_result = await predictor.online_learning_update(
                     user_id=interaction_data.get('userId'),
                     item_id=interaction_data.get('vehicleId'),
@@ -0,0 +1,75 @@
+"""
+공용 JSON 직렬화 - orjson이 있으면 orjson, 없으면 표준 json (MCP_JSON_BACKEND로 강제 가능)
+
+SSE 프레임, HTTP 응답, context_sync 저장에서 같이 사용합니다.
+에이전트 결과에 섞여 있는 NumPy 스칼라/배열, datetime, set, Decimal, Enum, dataclass를
+두 백엔드 모두 같은 JSON으로 바꿉니다. (출력은 UTF-8, 공백 없는 compact 형식)
+"""
+
+import dataclasses
+import json
+import logging
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+
+logger = logging.getLogger("CarFin-MCP.FastJSON")
+
+try:
+    import numpy as np
+except ImportError:  # numpy 없는 환경에서도 import 가능하게
+    np = None
+
+_requested = os.getenv("MCP_JSON_BACKEND", "orjson").lower()
+orjson = None
+if _requested == "orjson":
+    try:
+        import orjson
+    except ImportError:
+        logger.warning("⚠️ orjson 미설치 - 표준 json으로 직렬화")
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    """백엔드가 기본 지원하지 않는 타입 변환"""
+    if np is not None:
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def dumps_str(obj: Any) -> str:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    _encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+    def dumps(obj: Any) -> bytes:
+        return _encoder.encode(obj).encode("utf-8")
+
+    def dumps_str(obj: Any) -> str:
+        return _encoder.encode(obj)
+
+    loads = json.loads
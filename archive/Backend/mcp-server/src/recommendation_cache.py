@@ -0,0 +1,254 @@
+"""
+/mcp/recommend 에이전트 단계 결과 캐시 - 메모리 LRU + (선택) Redis 2단 캐시
+
+- 대상: 프로필 기준인 3개 에이전트 결과만. NCF는 user_id별 개인화 결과라 캐시하지 않고 요청마다 실행
+- 키: user_profile을 정규화(휘발성 키 제거, 문자열 소문자, 리스트 정렬)하고
+  예산/연령 같은 숫자는 구간으로 양자화한 뒤 해시 → 비슷한 프로필은 같은 키
+- TTL: 카탈로그 갱신 주기(MCP_CATALOG_REFRESH_SECONDS)에 맞춤. 키에 갱신 구간 번호가 들어가고
+  만료도 다음 갱신 시점을 넘지 않으므로 레플리카 간 조율 없이 갱신 후 새 결과를 계산
+- single-flight: 같은 키를 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다림
+  (기다리는 쪽은 자기 남은 예산(timeout)까지만 기다리고 asyncio.TimeoutError - 계산은 계속됨)
+- Redis는 MCP_CACHE_REDIS_URL이 있을 때만 사용. 연결/조회 오류는 캐시 미스로 처리 (요청은 실패하지 않음)
+- 지표: 메모리/Redis 적중, 미스, 합류(coalesced), 오류 수와 적중률
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import fast_json
+
+logger = logging.getLogger("CarFin-MCP.RecommendationCache")
+
+CACHE_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "2048"))
+CATALOG_REFRESH_SECONDS = float(os.getenv("MCP_CATALOG_REFRESH_SECONDS", "300"))
+REDIS_URL = os.getenv("MCP_CACHE_REDIS_URL", "")
+REDIS_TIMEOUT_SECONDS = float(os.getenv("MCP_CACHE_REDIS_TIMEOUT_MS", "50")) / 1000
+KEY_PREFIX = "mcp:rec:v1"
+
+# 키에서 제외하는 필드 (요청마다 달라서 결과와 무관, user_id는 캐시하지 않는 NCF에서만 사용)
+VOLATILE_KEYS = set(filter(None, os.getenv(
+    "MCP_CACHE_IGNORE_KEYS", "user_id,session_id,request_id,timestamp"
+).split(",")))
+# 필드 경로의 단어 → 양자화 단위 (예산은 만원 단위 100 구간, 나이 5세 구간)
+# 부분 문자열이 아니라 단어 단위로 비교 (max_mileage → mileage, budget.min → budget, usage는 age 아님)
+QUANTIZE_STEPS = {
+    "budget": float(os.getenv("MCP_CACHE_BUDGET_STEP", "100")),
+    "age": 5.0,
+    "income": 100.0,
+    "mileage": 10000.0,
+}
+
+
+def _key_words(key: str) -> list:
+    """필드 경로를 단어로 분리 (budget.min → [budget, min], maxMileage → [max, mileage])"""
+    return re.split(r"[^a-z0-9]+", re.sub(r"([a-z0-9])([A-Z])", r"\1_\2", key).lower())
+
+
+def _quantize(key: str, value: float) -> float:
+    # 뒤쪽 단어부터 확인 (mileage_budget → budget, budget.min → budget)
+    for word in reversed(_key_words(key)):
+        step = QUANTIZE_STEPS.get(word)
+        if step and step > 0:
+            return round(value / step) * step
+    return round(value, 2)
+
+
+def canonicalize(value: Any, key: str = "") -> Any:
+    """캐시 키용 정규형 (순서/대소문자/사소한 숫자 차이를 없앰). key는 상위 필드 경로 (budget.min)"""
+    if isinstance(value, dict):
+        return {
+            str(k): canonicalize(v, f"{key}.{k}" if key else str(k))
+            for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))
+            if str(k) not in VOLATILE_KEYS and v is not None
+        }
+    if isinstance(value, (list, tuple, set)):
+        items = [canonicalize(v, key) for v in value]
+        return sorted(items, key=lambda x: json.dumps(x, sort_keys=True, ensure_ascii=False))
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return _quantize(key, float(value))
+    if isinstance(value, str):
+        text = value.strip().lower()
+        try:
+            return _quantize(key, float(text.replace(",", "")))
+        except ValueError:
+            return text
+    return value
+
+
+class LRUCache:
+    """만료 시각이 있는 메모리 LRU (이벤트 루프 단일 스레드에서만 사용)"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RecommendationCache:
+    """2단 캐시 + single-flight"""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, refresh_seconds: float = CATALOG_REFRESH_SECONDS,
+                 redis_url: str = REDIS_URL):
+        self.memory = LRUCache(max_entries)
+        self.refresh_seconds = refresh_seconds
+        self.redis = None
+        if redis_url:
+            try:
+                import redis.asyncio as redis_asyncio
+                self.redis = redis_asyncio.from_url(
+                    redis_url, socket_timeout=REDIS_TIMEOUT_SECONDS, socket_connect_timeout=REDIS_TIMEOUT_SECONDS
+                )
+                logger.info("✅ 추천 캐시 Redis 사용")
+            except Exception as e:
+                logger.warning(f"⚠️ Redis 초기화 실패, 메모리 캐시만 사용: {e}")
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "coalesced": 0, "coalesced_timeouts": 0, "stores": 0, "redis_errors": 0}
+
+    def _catalog_window(self) -> Tuple[int, float]:
+        """(현재 카탈로그 갱신 구간 번호, 다음 갱신까지 남은 초)"""
+        now = time.time()
+        window = int(now // self.refresh_seconds)
+        return window, (window + 1) * self.refresh_seconds - now
+
+    def make_key(self, user_profile: Dict[str, Any], **extra: Any) -> str:
+        payload = json.dumps(
+            {"profile": canonicalize(user_profile), **canonicalize(extra)},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        window, _ = self._catalog_window()
+        return f"{KEY_PREFIX}:{window}:{digest}"
+
+    async def _redis_get(self, key: str) -> Optional[Any]:
+        if self.redis is None:
+            return None
+        try:
+            raw = await self.redis.get(key)
+            return None if raw is None else fast_json.loads(raw)
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.warning(f"⚠️ Redis 조회 실패 (미스로 처리): {e}")
+            return None
+
+    async def _redis_set(self, key: str, value: Any, ttl: float):
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, fast_json.dumps(value), ex=max(int(ttl), 1))
+        except Exception as e:
+            self.stats["redis_errors"] += 1
+            logger.warning(f"⚠️ Redis 저장 실패: {e}")
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+        timeout: Optional[float] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """(결과, 출처) 반환. 출처: memory | redis | coalesced | miss
+
+        timeout: 다른 요청의 계산에 합류했을 때 기다릴 최대 시간(호출자의 남은 예산).
+        넘으면 asyncio.TimeoutError (먼저 계산하던 요청은 그대로 계속). 직접 계산할 때는 compute가 예산을 지킴
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats["memory_hits"] += 1
+            return value, "memory"
+
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            try:
+                remaining = None if deadline is None else max(deadline - loop.time(), 0.0)
+                value = await asyncio.wait_for(asyncio.shield(inflight), remaining)
+                self.stats["coalesced"] += 1
+                return value, "coalesced"
+            except asyncio.TimeoutError:
+                self.stats["coalesced_timeouts"] += 1
+                raise
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # 이 요청 자체가 취소됨
+                # 먼저 계산하던 요청이 취소됨 → 다른 대기자가 이어받았으면 그걸 기다리고, 아니면 직접 계산
+                inflight = self._inflight.get(key)
+
+        future = loop.create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._redis_get(key)
+            if value is not None:
+                self.stats["redis_hits"] += 1
+                _, ttl = self._catalog_window()
+                self.memory.set(key, value, ttl)
+                source = "redis"
+            else:
+                self.stats["misses"] += 1
+                value = await compute()
+                source = "miss"
+                if cacheable(value):
+                    _, ttl = self._catalog_window()
+                    self.memory.set(key, value, ttl)
+                    await self._redis_set(key, value, ttl)
+                    self.stats["stores"] += 1
+            future.set_result(value)
+            return value, source
+        except BaseException as e:
+            # 기다리던 요청들도 같은 예외를 받음 (취소된 경우에는 대기자 중 하나가 다시 계산)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # 대기자가 없을 때 "never retrieved" 경고 방지
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self):
+        """이 프로세스의 메모리 캐시 비우기 (Redis 항목은 갱신 구간이 바뀌면 자연히 안 쓰임)"""
+        self.memory.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["redis_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "lookups": lookups,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+            "inflight": len(self._inflight),
+            "redis_enabled": self.redis is not None,
+            "catalog_refresh_seconds": self.refresh_seconds,
+        }
@@ -0,0 +1,248 @@
+"""
+세션 이벤트 버스 - 여러 레플리카 사이에서 SSE 이벤트를 연결을 가진 레플리카로 전달
+
+POST /mcp/recommend/realtime/{session_id}를 받은 레플리카와 GET /sse/{session_id} 연결을 가진
+레플리카가 다를 수 있으므로, 로컬에 없는 세션의 이벤트는 버스로 발행하고
+세션을 가진 레플리카가 구독해서 자기 SSE 대기열에 넣습니다.
+
+- LocalSessionBus: 프로세스 내부 전달 (기본값, 단일 워커). 같은 LocalHub를 공유하면
+  한 프로세스 안에서 여러 레플리카를 흉내낼 수 있음 (테스트/점검용)
+- RedisSessionBus: Redis Pub/Sub. 세션마다 채널(mcp:sse:{session_id})을 구독하므로
+  이벤트는 그 세션을 가진 레플리카에만 전달됨. 전체 방송은 공용 채널 하나
+- 버스 위에서 오가는 것은 이미 직렬화된 SSE 문자열 + 합치기 키 (발행 측에서 한 번만 직렬화)
+- 전달 보장은 기존 SSE와 같음: 그 시점에 연결된 세션이 없으면 버려짐 (undelivered로 집계)
+
+설정:
+    MCP_SESSION_BUS_URL   Redis URL (없으면 LocalSessionBus)
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Callable, Dict, Optional, Set
+
+import fast_json
+
+logger = logging.getLogger("CarFin-MCP.SessionBus")
+
+SESSION_BUS_URL = os.getenv("MCP_SESSION_BUS_URL", "")
+CHANNEL_PREFIX = "mcp:sse:"
+BROADCAST_CHANNEL = "mcp:sse-broadcast"
+RECONNECT_DELAY_SECONDS = 1.0
+
+# deliver(session_id 또는 None(전체), 직렬화된 SSE 문자열, 합치기 키)
+DeliverFunc = Callable[[Optional[str], str, Any], None]
+
+
+class SessionBus:
+    """버스 공통 인터페이스 (SSEManager가 사용)"""
+
+    name = "base"
+
+    def __init__(self):
+        self._deliver: Optional[DeliverFunc] = None
+        self.stats = {"published": 0, "received": 0, "undelivered": 0, "errors": 0}
+
+    async def start(self, deliver: DeliverFunc):
+        """수신 메시지를 deliver로 넘기기 시작"""
+        self._deliver = deliver
+
+    async def close(self):
+        self._deliver = None
+
+    async def subscribe(self, session_id: str):
+        """이 레플리카가 session_id의 SSE 연결을 가짐"""
+        raise NotImplementedError
+
+    def unsubscribe(self, session_id: str):
+        """연결 종료 (기다리지 않음 - 동기 정리 경로에서 호출)"""
+        raise NotImplementedError
+
+    async def publish(self, session_id: str, payload: str, coalesce_key: Any = None):
+        raise NotImplementedError
+
+    async def broadcast(self, payload: str, coalesce_key: Any = None):
+        raise NotImplementedError
+
+    def _dispatch(self, session_id: Optional[str], payload: str, coalesce_key: Any):
+        if self._deliver is None:
+            return
+        self.stats["received"] += 1
+        try:
+            self._deliver(session_id, payload, coalesce_key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"❌ 버스 메시지 전달 실패 (세션: {session_id}): {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.stats}
+
+
+class LocalHub:
+    """LocalSessionBus들이 공유하는 구독 테이블 (세션 → 버스)"""
+
+    def __init__(self):
+        self.owners: Dict[str, Set["LocalSessionBus"]] = {}
+        self.members: Set["LocalSessionBus"] = set()
+
+
+class LocalSessionBus(SessionBus):
+    """프로세스 내부 버스 (hub를 공유하는 인스턴스끼리 서로 다른 레플리카처럼 동작)"""
+
+    name = "local"
+
+    def __init__(self, hub: Optional[LocalHub] = None):
+        super().__init__()
+        self.hub = hub or LocalHub()
+
+    async def start(self, deliver: DeliverFunc):
+        await super().start(deliver)
+        self.hub.members.add(self)
+
+    async def close(self):
+        self.hub.members.discard(self)
+        for owners in self.hub.owners.values():
+            owners.discard(self)
+        await super().close()
+
+    async def subscribe(self, session_id: str):
+        self.hub.owners.setdefault(session_id, set()).add(self)
+
+    def unsubscribe(self, session_id: str):
+        owners = self.hub.owners.get(session_id)
+        if owners is not None:
+            owners.discard(self)
+            if not owners:
+                del self.hub.owners[session_id]
+
+    async def publish(self, session_id: str, payload: str, coalesce_key: Any = None):
+        self.stats["published"] += 1
+        owners = self.hub.owners.get(session_id)
+        if not owners:
+            self.stats["undelivered"] += 1
+            return
+        for bus in list(owners):
+            bus._dispatch(session_id, payload, coalesce_key)
+
+    async def broadcast(self, payload: str, coalesce_key: Any = None):
+        self.stats["published"] += 1
+        for bus in list(self.hub.members):
+            bus._dispatch(None, payload, coalesce_key)
+
+
+class RedisSessionBus(SessionBus):
+    """Redis Pub/Sub 버스 (레플리카마다 구독 연결 하나 + 수신 태스크 하나)"""
+
+    name = "redis"
+
+    def __init__(self, url: str):
+        super().__init__()
+        import redis.asyncio as redis_asyncio
+        self.redis = redis_asyncio.from_url(url)
+        self.pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Set[asyncio.Task] = set()
+        # 현재 이 레플리카가 가진 세션 (해제 태스크가 실행되기 전에 재연결되면 해제하지 않음)
+        self._owned: Set[str] = set()
+
+    async def start(self, deliver: DeliverFunc):
+        await super().start(deliver)
+        # 구독 연결은 여기서 먼저 만듦 (세션 구독과 동시에 연결하면 연결이 두 개 생겨 하나를 잃음)
+        # Redis가 아직 안 떠 있어도 서버는 시작하고, 수신 태스크가 연결될 때까지 재시도
+        try:
+            await self._subscribe_broadcast()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ 세션 버스 연결 실패, 백그라운드 재시도: {e}")
+        self._reader = asyncio.create_task(self._read_loop())
+        logger.info("✅ 세션 버스 Redis Pub/Sub 사용")
+
+    async def close(self):
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+        for task in list(self._pending):
+            task.cancel()
+        try:
+            await self.pubsub.aclose()
+            await self.redis.aclose()
+        except Exception as e:
+            logger.warning(f"⚠️ 세션 버스 종료 중 오류: {e}")
+        await super().close()
+
+    async def _subscribe_broadcast(self):
+        # 공용 방송 채널을 항상 구독 → 세션이 하나도 없어도 listen()이 끝나지 않음
+        if BROADCAST_CHANNEL.encode() not in self.pubsub.channels:
+            await self.pubsub.subscribe(BROADCAST_CHANNEL)
+
+    async def _read_loop(self):
+        while True:
+            try:
+                await self._subscribe_broadcast()
+                async for message in self.pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    channel = message["channel"].decode("utf-8")
+                    payload, coalesce_key = fast_json.loads(message["data"])
+                    session_id = None if channel == BROADCAST_CHANNEL else channel[len(CHANNEL_PREFIX):]
+                    self._dispatch(session_id, payload, tuple(coalesce_key) if coalesce_key else None)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 연결이 끊기면 다음 읽기에서 재연결 + 기존 채널 재구독
+                self.stats["errors"] += 1
+                logger.warning(f"⚠️ 세션 버스 수신 오류, 재시도: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def _spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def subscribe(self, session_id: str):
+        self._owned.add(session_id)
+        try:
+            await self.pubsub.subscribe(CHANNEL_PREFIX + session_id)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ 세션 채널 구독 실패 (다른 레플리카 이벤트 미수신): {session_id}: {e}")
+
+    def unsubscribe(self, session_id: str):
+        self._owned.discard(session_id)
+        self._spawn(self._unsubscribe(session_id))
+
+    async def _unsubscribe(self, session_id: str):
+        if session_id in self._owned:
+            return
+        try:
+            await self.pubsub.unsubscribe(CHANNEL_PREFIX + session_id)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ 세션 채널 구독 해제 실패: {session_id}: {e}")
+
+    async def _publish(self, channel: str, payload: str, coalesce_key: Any) -> int:
+        self.stats["published"] += 1
+        try:
+            return await self.redis.publish(channel, fast_json.dumps([payload, coalesce_key]))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"⚠️ 세션 버스 발행 실패: {e}")
+            return 0
+
+    async def publish(self, session_id: str, payload: str, coalesce_key: Any = None):
+        receivers = await self._publish(CHANNEL_PREFIX + session_id, payload, coalesce_key)
+        if not receivers:
+            self.stats["undelivered"] += 1
+
+    async def broadcast(self, payload: str, coalesce_key: Any = None):
+        await self._publish(BROADCAST_CHANNEL, payload, coalesce_key)
+
+
+def create_session_bus(url: str = SESSION_BUS_URL) -> SessionBus:
+    """MCP_SESSION_BUS_URL이 있으면 Redis, 없거나 초기화에 실패하면 프로세스 내부 버스"""
+    if url:
+        try:
+            return RedisSessionBus(url)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis 세션 버스 초기화 실패, 단일 프로세스 버스 사용: {e}")
+    return LocalSessionBus()
@@ -13,6 +13,8 @@ from collections import defaultdict
 import redis
 import pickle
 
+from fast_json import dumps as json_dumps, loads as json_loads
+
 logger = logging.getLogger("CarFin-MCP.ContextSync")
 
 class ContextSyncError(Exception):
@@ -510,12 +512,28 @@ class ContextSyncTool:
             "total_agents": len(all_states)
         }
 
+    @staticmethod
+    def _serialize_session(session_context: SessionContext) -> bytes:
+        """세션 → JSON (datetime은 ISO 문자열, set은 리스트로)"""
+        return json_dumps(session_context)
+
+    @staticmethod
+    def _deserialize_session(data: bytes) -> SessionContext:
+        """JSON → 세션 (이전 버전이 pickle로 저장한 세션도 읽음)"""
+        if data[:1] == b"\x80":
+            return pickle.loads(data)
+        raw = json_loads(data)
+        raw["created_at"] = datetime.fromisoformat(raw["created_at"])
+        raw["last_updated"] = datetime.fromisoformat(raw["last_updated"])
+        raw["participating_agents"] = set(raw["participating_agents"])
+        return SessionContext(**raw)
+
     async def _save_session(self, session_context: SessionContext):
         """세션 저장"""
         if self.use_redis and self.redis_client:
             # Redis에 저장
             key = f"session:{session_context.session_id}"
-            data = pickle.dumps(session_context)
+            data = self._serialize_session(session_context)
             self.redis_client.setex(key, self.sync_config["session_timeout"], data)
         else:
             # 메모리에 저장
@@ -528,7 +546,7 @@ class ContextSyncTool:
             key = f"session:{session_id}"
             data = self.redis_client.get(key)
             if data:
-                return pickle.loads(data)
+                return self._deserialize_session(data)
             return None
         else:
             # 메모리에서 로드
@@ -64,6 +64,7 @@ class DatabaseQueryTool:
                        fueltype, cartype, location, detailurl, photo
                 FROM vehicles
                 WHERE price BETWEEN $1 AND $2
+                AND is_active
                 AND distance <= $3
                 AND modelyear >= $4
                 AND cartype NOT LIKE '%화물%'
@@ -79,6 +80,7 @@ class DatabaseQueryTool:
                        COUNT(*) OVER (PARTITION BY v.manufacturer, v.model) as popularity_count
                 FROM vehicles v
                 WHERE v.price BETWEEN 1000 AND 8000
+                AND v.is_active
                 AND v.distance <= 100000
                 AND v.modelyear >= 2018
                 ORDER BY popularity_count DESC, v.modelyear DESC
@@ -162,6 +164,7 @@ class DatabaseQueryTool:
                 AND modelyear BETWEEN $3 AND $4
                 AND price BETWEEN $5 AND $6
                 AND vehicleid != $7
+                AND is_active
                 ORDER BY price_diff ASC, distance ASC
                 LIMIT $8
             """,
@@ -200,6 +200,7 @@ class NCFPredictTool:
             embedding_dim=64,
             hidden_dims=[128, 64, 32]
         ).to(self.device)
+        self.model.eval()  # 추론 시 Dropout 끔 (학습 때만 train())
 
         # 디렉토리 생성
         os.makedirs(self.model_dir, exist_ok=True)
@@ -238,6 +239,7 @@ class NCFPredictTool:
 
         user_profile = params.get("user_profile", {})
         item_candidates = params.get("item_candidates", [])
+        context = params.get("context")
 
         if not user_profile or not item_candidates:
             raise NCFPredictError("Missing user_profile or item_candidates")
@@ -556,8 +558,10 @@ class NCFPredictTool:
             logger.error(f"❌ 온라인 학습 실패: {e}")
 
     def _encode_user(self, user_id: str, user_profile: Dict[str, Any]) -> int:
-        """사용자 인코딩"""
+        """사용자 인코딩 (임베딩 용량을 넘는 신규 사용자는 0번 - 콜드스타트 - 으로 예측)"""
         if user_id not in self.user_encoder:
+            if len(self.user_encoder) >= self.model.user_embedding_gmf.num_embeddings:
+                return 0
             # 새로운 사용자 추가
             new_idx = len(self.user_encoder)
             self.user_encoder[user_id] = new_idx
@@ -565,8 +569,10 @@ class NCFPredictTool:
         return self.user_encoder[user_id]
 
     def _encode_item(self, item_id: str, item_info: Dict[str, Any]) -> int:
-        """아이템 인코딩"""
+        """아이템 인코딩 (임베딩 용량을 넘는 신규 아이템은 0번으로 예측)"""
         if item_id not in self.item_encoder:
+            if len(self.item_encoder) >= self.model.item_embedding_gmf.num_embeddings:
+                return 0
             # 새로운 아이템 추가
             new_idx = len(self.item_encoder)
             self.item_encoder[item_id] = new_idx
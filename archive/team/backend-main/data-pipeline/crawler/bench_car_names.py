@@ -0,0 +1,106 @@
+"""
+차명 분류/표준화 벤치마크 (합성 차명 100만 건)
+
+이전 구현(카테고리별 리스트를 돌며 부분 문자열 검사, replace 체인)을 기준선으로
+새 분류기(CAR_TYPE_CLASSIFIER.classify_series, normalize_car_name map)와 결과/시간을 비교합니다.
+- 반복 차명: 실제 리뷰처럼 모델명 + 트림/수식어 조합이 반복되는 경우
+- 고유 차명: 모든 이름이 달라 캐시가 듣지 않는 경우 (Aho-Corasick 스캔 비용)
+
+사용법:
+    python bench_car_names.py              # 100만 건
+    python bench_car_names.py 200000
+"""
+
+import os
+import re
+import sys
+import time
+import random
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from hyundai_crawler import (
+    CAR_TYPE_CLASSIFIER, normalize_car_name,
+    compact_models, midsize_models, large_models, suv_models, van_models, truck_models,
+)
+from name_matcher import CarNameClassifier
+
+PREFIXES = ["", "", "", "더 뉴 ", "디 올 뉴 ", "The New "]
+SUFFIXES = ["", "", " Hybrid", " Electric", " N", " 2.5 터보", " 캘리그래피", " 인스퍼레이션", "-프리미엄", " 특장차"]
+UNKNOWN = ["캐스퍼", "제네시스 G80", "스타렉스", "i30", "벨로스터 N", "넥쏘X"]
+
+
+# ---- 기준선: 이전 구현 ----
+def legacy_normalize_car_name(x: str) -> str:
+    x = (x or "")
+    x = x.replace("더 뉴 아이오닉 5", "더 뉴 아이오닉5").replace("아이오닉 5", "아이오닉5").replace("아이오닉 6", "아이오닉6")
+    x = x.replace("아반떼 Hybrid", "아반떼 하이브리드").replace("쏘나타 디 엣지 Hybrid", "쏘나타 디 엣지 하이브리드")
+    x = x.replace("그랜저 Hybrid", "그랜저 하이브리드").replace("코나 Hybrid", "코나 하이브리드").replace("코나 Electric", "코나 일렉트릭")
+    x = x.replace("더 뉴 투싼 Hybrid", "더 뉴 투싼 하이브리드").replace("싼타페 Hybrid", "싼타페 하이브리드")
+    x = x.replace("디 올 뉴 팰리세이드 Hybrid", "디 올 뉴 팰리세이드 하이브리드")
+    x = x.replace("스타리아 라운지 Hybrid", "스타리아 라운지 하이브리드").replace("스타리아 Hybrid", "스타리아 하이브리드")
+    x = x.replace("포터 II Electric", "포터2 일렉트릭").replace("포터 II Electric 특장차", "포터2 일렉트릭 특장차")
+    return x
+
+def _legacy_norm(s: str) -> str:
+    return re.sub(r'[\s\-]+', '', s or '').lower()
+
+_LEGACY_LISTS = [(label, list(map(_legacy_norm, models))) for label, models in [
+    ("준중형", compact_models), ("중형", midsize_models), ("대형", large_models),
+    ("SUV", suv_models), ("승합", van_models), ("트럭", truck_models),
+]]
+
+def legacy_classify_car_type(name: str) -> str:
+    n = _legacy_norm(name)
+    for label, models in _LEGACY_LISTS:
+        if any(m in n for m in models):
+            return label
+    return ""
+
+
+def make_names(n: int, unique: bool, seed: int = 0) -> pd.Series:
+    rnd = random.Random(seed)
+    models = compact_models + midsize_models + large_models + suv_models + van_models + truck_models + UNKNOWN
+    names = []
+    for i in range(n):
+        name = rnd.choice(PREFIXES) + rnd.choice(models) + rnd.choice(SUFFIXES)
+        if unique:
+            name += f" #{i}"
+        names.append(name)
+    return pd.Series(names)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run(names: pd.Series, title: str):
+    legacy, t_legacy = timed(lambda: pd.Series([legacy_classify_car_type(x) for x in names]))
+    # 캐시가 비어 있는 상태에서 측정 (import 때 만든 것과 같은 규칙으로 새로 컴파일)
+    classifier = CarNameClassifier(list(zip(CAR_TYPE_CLASSIFIER.labels, [
+        compact_models, midsize_models, large_models, suv_models, van_models, truck_models])))
+    fast, t_fast = timed(lambda: classifier.classify_series(names))
+    assert legacy.tolist() == fast.tolist(), "분류 결과 불일치"
+
+    legacy_norm, t_legacy_norm = timed(lambda: pd.Series([legacy_normalize_car_name(x) for x in names]))
+    normalize_car_name.cache_clear()
+    fast_norm, t_fast_norm = timed(lambda: names.map(normalize_car_name))
+    assert legacy_norm.tolist() == fast_norm.tolist(), "표준화 결과 불일치"
+
+    print(f"[BENCH] {title}: {len(names):,}건 (고유 {names.nunique():,})")
+    print(f"  분류   이전 {t_legacy:6.2f}s → 새 {t_fast:6.2f}s (x{t_legacy / t_fast:.1f}, {t_fast / len(names) * 1e9:,.0f} ns/행)")
+    print(f"  표준화 이전 {t_legacy_norm:6.2f}s → 새 {t_fast_norm:6.2f}s (x{t_legacy_norm / t_fast_norm:.1f})")
+
+
+def main(n: int = 1_000_000):
+    run(make_names(n, unique=False), "반복 차명")
+    run(make_names(n, unique=True, seed=1), "고유 차명")
+    print("[OK] 이전 구현과 결과 동일")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
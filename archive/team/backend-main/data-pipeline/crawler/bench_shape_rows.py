@@ -0,0 +1,109 @@
+"""
+shape_rows 페이지당 CPU 벤치마크
+
+엔카 검색 API 응답과 같은 모양의 합성 페이지를 만들어
+json_normalize와 shape_rows의 한 페이지 처리 시간(CPU)을 따로 측정합니다.
+이전 행 단위(apply) 구현을 기준선으로 같이 돌리고, 두 결과가 같은지도 확인합니다.
+(네트워크/DB 없이 실행)
+
+사용법:
+    python bench_shape_rows.py               # 50행 페이지 500번
+    python bench_shape_rows.py 500 50        # 500행 페이지 50번
+"""
+
+import os
+import sys
+import time
+import random
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from encar_crawler import shape_rows, to_int_safe, extract_photo, make_detail_url, WANTED_COLS
+
+MANUFACTURERS = ["현대", "기아", "제네시스", "쉐보레", "르노코리아", "KG모빌리티"]
+FUELS = ["가솔린", "디젤", "LPG", "하이브리드", "전기"]
+
+
+def make_page(rows: int, seed: int = 0) -> list:
+    """SearchResults 한 페이지 (Photo 누락/문자열 숫자/결측 등 실제 응답의 변형을 섞음)"""
+    rnd = random.Random(seed)
+    page = []
+    for i in range(rows):
+        car_id = 38_000_000 + seed * rows + i
+        item = {
+            "Id": str(car_id) if i % 7 == 0 else car_id,
+            "Manufacturer": rnd.choice(MANUFACTURERS),
+            "Model": f"모델{rnd.randint(1, 80)}",
+            "Badge": f"배지{rnd.randint(1, 20)}",
+            "BadgeDetail": None if i % 5 == 0 else f"트림{rnd.randint(1, 9)}",
+            "FuelType": rnd.choice(FUELS),
+            "Transmission": "오토",
+            "FormYear": str(rnd.randint(2008, 2025)) if i % 3 == 0 else float(rnd.randint(2008, 2025)),
+            "Mileage": float(rnd.randint(0, 250_000)),
+            "Price": "1,250만원" if i % 13 == 0 else float(rnd.randint(300, 9_000)),
+            "SellType": "일반",
+            "OfficeCityState": rnd.choice(["서울", "경기", "인천", "부산"]),
+            "Photo": "" if i % 11 == 0 else f"/carpicture01/pic{car_id}/{car_id}_",
+            "Photos": [{"type": "001", "location": f"/carpicture/{car_id}_001.jpg", "url": f"/p/{car_id}.jpg"}],
+        }
+        page.append(item)
+    return page
+
+
+def shape_rows_rowwise(df_raw: pd.DataFrame, pageid: str, category_fallback: str, market_key: str) -> pd.DataFrame:
+    """기준선: 이전 행 단위 구현 (to_int_safe/extract_photo/make_detail_url을 행마다 호출)"""
+    id_col = next((c for c in ["vehicleId", "VehicleId", "id", "Id", "carId", "carid"] if c in df_raw.columns), None)
+    df = pd.DataFrame()
+    df["CarSeq"] = df_raw[id_col].apply(to_int_safe).astype("Int64")
+    df["Platform"] = pd.Series(["encar"] * len(df_raw), dtype="string")
+    df["Origin"] = pd.Series(["국산" if market_key == "korean" else "수입"] * len(df_raw), dtype="string")
+    df["CarType"] = pd.Series([category_fallback] * len(df_raw), dtype="string")
+    for out, src in [("Manufacturer", "Manufacturer"), ("Model", "Model"), ("Generation", "Badge"),
+                     ("Trim", "BadgeDetail"), ("FuelType", "FuelType"), ("Transmission", "Transmission")]:
+        df[out] = df_raw[src].astype("string")
+    df["ModelYear"] = df_raw["FormYear"].apply(to_int_safe).astype("Int64")
+    df["Distance"] = df_raw["Mileage"].apply(to_int_safe).astype("Int64")
+    df["Price"] = df_raw["Price"].apply(to_int_safe).astype("Int64")
+    df["SellType"] = df_raw["SellType"].astype("string")
+    df["Location"] = df_raw["OfficeCityState"].astype("string")
+    df["DetailURL"] = df["CarSeq"].map(lambda x: make_detail_url(x, pageid) if pd.notna(x) else None).astype("string")
+    df["Photo"] = df_raw.apply(extract_photo, axis=1).astype("string")
+    df["VehicleNo"] = pd.Series([None] * len(df), dtype="string")
+    df["OriginPrice"] = pd.Series([None] * len(df), dtype="Int64")
+    df["ColorName"] = pd.Series([None] * len(df), dtype="string")
+    df["FirstRegistrationDate"] = pd.Series([None] * len(df), dtype="Int64")
+    return df[WANTED_COLS]
+
+
+def bench(fn, raws: list, repeat: int) -> float:
+    """페이지당 평균 CPU 시간(ms)"""
+    started = time.process_time()
+    for i in range(repeat):
+        fn(raws[i % len(raws)], pageid="dc_carsearch", category_fallback="중형", market_key="korean")
+    return (time.process_time() - started) / repeat * 1000
+
+
+def main(page_rows: int = 50, repeat: int = 500):
+    pages = [make_page(page_rows, seed) for seed in range(10)]
+
+    started = time.process_time()
+    raws = [pd.json_normalize(page, max_level=1) for page in pages]
+    normalize = (time.process_time() - started) / len(pages) * 1000
+
+    args = dict(pageid="dc_carsearch", category_fallback="중형", market_key="korean")
+    for raw in raws:
+        pd.testing.assert_frame_equal(shape_rows(raw, **args), shape_rows_rowwise(raw, **args))
+    print("[OK] 벡터화 결과 == 행 단위 결과")
+
+    rowwise = bench(shape_rows_rowwise, raws, repeat)
+    vectorised = bench(shape_rows, raws, repeat)
+    print(f"[BENCH] {page_rows}행 페이지 x {repeat}회 (CPU 시간)")
+    print(f"  json_normalize : {normalize:8.2f} ms/page (공통)")
+    print(f"  shape 행 단위  : {rowwise:8.2f} ms/page")
+    print(f"  shape 벡터화   : {vectorised:8.2f} ms/page  (x{rowwise / vectorised:.1f})")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
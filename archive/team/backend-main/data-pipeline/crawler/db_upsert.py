@@ -0,0 +1,107 @@
+"""
+크롤러 공용 MySQL UPSERT
+
+- get_table: 테이블 메타데이터를 프로세스당 한 번만 reflect 해서 캐시
+  (페이지/청크마다 information_schema를 다시 읽지 않음)
+- upsert_df: rows_per_statement 행씩 잘라 INSERT ... ON DUPLICATE KEY UPDATE
+  → 한 문장이 max_allowed_packet을 넘지 않게 하고,
+    청크마다 따로 커밋/재시도하므로 실패한 청크만 다시 보냄
+
+rows_per_statement 기본값은 DB_UPSERT_ROWS_PER_STATEMENT 환경변수(없으면 500)
+"""
+
+import os
+import threading
+from time import sleep
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import MetaData, Table
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import OperationalError
+
+DEFAULT_ROWS_PER_STATEMENT = int(os.getenv("DB_UPSERT_ROWS_PER_STATEMENT", "500"))
+
+_tables: Dict[Tuple[str, str], Table] = {}
+_tables_lock = threading.Lock()
+
+
+def get_table(engine, table_name: str, retries: int = 3) -> Table:
+    """reflect 결과를 (DB URL, 테이블명) 기준으로 캐시해서 돌려줍니다."""
+    key = (str(engine.url), table_name)
+    table = _tables.get(key)
+    if table is not None:
+        return table
+    with _tables_lock:
+        if key in _tables:
+            return _tables[key]
+        for a in range(retries):
+            try:
+                table = Table(table_name, MetaData(), autoload_with=engine)
+                break
+            except OperationalError as e:
+                if a == retries - 1:
+                    raise
+                print(f"[DB] reflect 재시도 {a+1}/{retries} ... {e}")
+                engine.dispose(); sleep(2)
+        _tables[key] = table
+        print(f"[DB] {table_name} 메타데이터 로드 (컬럼 {len(table.columns)}개)")
+        return table
+
+
+def clear_table_cache():
+    """스키마를 바꾼 뒤(컬럼 추가 등) 다시 reflect 하도록 캐시를 비웁니다."""
+    with _tables_lock:
+        _tables.clear()
+
+
+def _records(df: pd.DataFrame):
+    # pandas 결측(NaN/NA/NaT)은 드라이버가 모르므로 None으로
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def _execute_chunk(engine, stmt, retries: int, label: str):
+    for a in range(retries):
+        try:
+            with engine.begin() as conn:
+                conn.execute(stmt)
+            return
+        except OperationalError as e:
+            if a == retries - 1:
+                raise
+            print(f"[DB] {label} 재시도 {a+1}/{retries} ... {e}")
+            engine.dispose(); sleep(2 * (a + 1))
+
+
+def upsert_df(engine, df_all: pd.DataFrame, table_name: str, rows_per_statement: Optional[int] = None,
+              exclude_update: Iterable[str] = (), retries: int = 3, verbose: bool = False) -> int:
+    """df를 table_name에 청크 단위로 UPSERT 합니다. 저장한 행 수를 반환합니다.
+
+    exclude_update: 키 충돌 시 덮어쓰지 않을 컬럼 (대소문자 무시)
+    """
+    if df_all.empty:
+        return 0
+    table = get_table(engine, table_name)
+
+    # 테이블에 존재하는 컬럼만 남기기 (예방 차원)
+    keep = [c.name for c in table.columns if c.name in df_all.columns]
+    if not keep:
+        return 0
+    df = df_all[keep]
+    exclude = {c.lower() for c in exclude_update}
+    update_cols = [c for c in keep if c.lower() not in exclude]
+
+    size = max(1, rows_per_statement or DEFAULT_ROWS_PER_STATEMENT)
+    n = len(df)
+    chunks = (n + size - 1) // size
+    for i in range(chunks):
+        part = df.iloc[i*size:(i+1)*size]
+        stmt = mysql_insert(table).values(_records(part))
+        if update_cols:
+            stmt = stmt.on_duplicate_key_update(**{c: stmt.inserted[c] for c in update_cols})
+        else:
+            stmt = stmt.prefix_with("IGNORE")
+        _execute_chunk(engine, stmt, retries, f"{table_name} chunk {i+1}/{chunks}")
+        if verbose:
+            print(f"[DB] 업서트 진행 {i+1}/{chunks} (누적 {min((i+1)*size, n)}/{n})")
+    return n
@@ -1,14 +1,18 @@
-import os, re, time
+import os, re, sys, time
+import numpy as np
 import pandas as pd
 import requests
 
 from requests.adapters import HTTPAdapter, Retry
-from sqlalchemy import create_engine, MetaData, Table
-from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy import create_engine
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, nullcontext
 from dotenv import load_dotenv
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import db_upsert
+
 # -----------------------------------------------------------------------------
 # 경로 / 환경
 # -----------------------------------------------------------------------------
@@ -63,13 +67,13 @@ def make_session(referer: str) -> requests.Session:
     )
     return s
 
-def make_readside_session() -> requests.Session:
+def make_readside_session(pool_size: int = 10) -> requests.Session:
     s = requests.Session()
     s.trust_env = False
     retries = Retry(
         total=3, backoff_factor=0.4, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"]
     )
-    s.mount("https://", HTTPAdapter(max_retries=retries))
+    s.mount("https://", HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size))
     s.headers.update(
         {
             "User-Agent": (
@@ -87,6 +91,28 @@ def make_readside_session() -> requests.Session:
         s.headers["Authorization"] = f"Bearer {bearer}"
     return s
 
+def make_detail_page_session(pool_size: int = 10) -> requests.Session:
+    """상세 HTML(vehicleNo 추출)용 세션"""
+    s = requests.Session()
+    s.trust_env = False
+    s.mount("https://", HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    s.headers.update(
+        {
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/140.0.0.0 Safari/537.36"
+            ),
+            "Referer": "https://fem.encar.com/",
+            "Origin": "https://fem.encar.com",
+        }
+    )
+    return s
+
+def _executor_scope(executor, max_workers):
+    """공유 executor가 있으면 그대로 쓰고(종료하지 않음), 없으면 이번 호출용으로 새로 만듦"""
+    return nullcontext(executor) if executor is not None else ThreadPoolExecutor(max_workers=max_workers)
+
 def get_json(s: requests.Session, params: dict):
     r = s.get(BASE_URL, params=params, timeout=15)
     r.raise_for_status()
@@ -171,6 +197,59 @@ def _parse_yyyymmdd(x) -> int | None:
             return None
     return None
 
+# -----------------------------------------------------------------------------
+# 컬럼 단위 정제 (shape_rows용, 행 단위 apply 대신 pandas 문자열/숫자 연산)
+# -----------------------------------------------------------------------------
+def _int_array(values: np.ndarray, mask: np.ndarray) -> pd.arrays.IntegerArray:
+    """float 배열 → Int64 배열 (소수점 버림, mask=결측)"""
+    return pd.arrays.IntegerArray(np.trunc(np.where(mask, 0, values)).astype(np.int64), mask)
+
+def to_int_series(col: pd.Series) -> pd.arrays.IntegerArray:
+    """to_int_safe와 같은 규칙을 컬럼 전체에 적용 (숫자는 버림, 문자열은 숫자만 이어붙임)"""
+    values = col.to_numpy()
+    if values.dtype.kind in "iub":
+        return pd.arrays.IntegerArray(values.astype(np.int64), np.zeros(len(values), dtype=bool))
+    if values.dtype.kind == "f":
+        return _int_array(values, np.isnan(values))
+
+    # 문자열/혼합 컬럼: 문자열은 숫자 외 문자 제거, 숫자는 그대로 (그 외 타입은 결측)
+    obj = values.astype(object)
+    if pd.api.types.infer_dtype(obj, skipna=True) in ("integer", "floating", "mixed-integer-float", "boolean", "decimal"):
+        numbers = pd.to_numeric(pd.Series(obj), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        return _int_array(numbers, np.isnan(numbers))
+    digits = pd.Series(obj).str.replace(r"\D", "", regex=True).to_numpy(dtype=object, na_value=None)
+    is_str = np.not_equal(digits, None)  # 문자열이 아닌 값은 .str 결과가 결측
+    parsed = pd.to_numeric(np.where(is_str & (digits != ""), digits, None), errors="coerce").astype("float64")
+    if not is_str.all():
+        others = np.where(is_str, None, obj)
+        numbers = pd.to_numeric(pd.Series(others), errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+        parsed = np.where(is_str, parsed, numbers)
+    return _int_array(parsed, np.isnan(parsed))
+
+def extract_photo_series(df_raw: pd.DataFrame) -> pd.arrays.StringArray:
+    """extract_photo와 같은 규칙: Photo 문자열 우선, 없으면 Photos 첫 항목"""
+    n = len(df_raw)
+    photo = np.full(n, None, dtype=object)
+    if "Photo" in df_raw.columns:
+        raw_photo = df_raw["Photo"].to_numpy(dtype=object)
+        if pd.api.types.infer_dtype(raw_photo, skipna=True) in ("string", "mixed", "mixed-integer"):
+            valid = pd.Series(raw_photo).str.len().fillna(0).to_numpy() > 0  # 문자열이 아닌 값은 NaN → 제외
+            photo[valid] = raw_photo[valid]
+    if "Photos" in df_raw.columns:
+        # Photos 보완은 Photo가 빈 행에만 (대부분 Photo가 있어 여기 도는 행은 드묾)
+        photos = df_raw["Photos"].to_numpy(dtype=object)
+        for i in np.flatnonzero(photo == None):  # noqa: E711 (object 배열 원소별 비교)
+            photo[i] = extract_photo({"Photos": photos[i]})
+    return pd.array(photo, dtype="string")
+
+def make_detail_url_series(car_seq: pd.arrays.IntegerArray, pageid: str) -> pd.arrays.StringArray:
+    missing = car_seq.isna()
+    cid = np.asarray(car_seq.astype("string").fillna(""), dtype=object)
+    urls = ("https://fem.encar.com/cars/detail/" + cid
+            + f"?pageid={pageid}&listAdvType=pic&carid=" + cid + "&view_type=normal")
+    urls[missing] = None
+    return pd.array(urls, dtype="string")
+
 # -----------------------------------------------------------------------------
 # DB
 # -----------------------------------------------------------------------------
@@ -187,29 +266,10 @@ def make_mysql_engine():
         url = f"mysql+pymysql://{user}:{pwd}@{host}:{port}/{db}?charset=utf8mb4"
     return create_engine(url, pool_pre_ping=True, future=True)
 
-def upsert_df(engine, df: pd.DataFrame, table_name: str):
-    if df.empty:
-        return
-    meta = MetaData()
-    meta.reflect(bind=engine, only=[table_name])
-    table = Table(table_name, meta, autoload_with=engine)
-
-    # 테이블에 존재하는 컬럼만 남기기 (예방 차원)
-    keep = [c for c in df.columns if c in [col.name for col in table.columns]]
-    df2 = df[keep].copy()
-    if df2.empty:
-        return
-
-    recs = df2.to_dict(orient="records")
-    stmt = mysql_insert(table).values(recs)
-
-    # VehicleId/CarSeq 제외하고 UPSERT
-    exclude = {"vehicleid", "carseq"}
-    upd = {c.name: stmt.inserted[c.name] for c in table.columns if c.name in df2.columns and c.name.lower() not in exclude}
-    stmt = stmt.on_duplicate_key_update(**upd)
-
-    with engine.begin() as conn:
-        conn.execute(stmt)
+def upsert_df(engine, df: pd.DataFrame, table_name: str, rows_per_statement=None):
+    # VehicleId/CarSeq 제외하고 UPSERT (메타데이터 캐시 + 청크 단위 문장/재시도는 db_upsert)
+    return db_upsert.upsert_df(engine, df, table_name, rows_per_statement=rows_per_statement,
+                               exclude_update=("vehicleid", "carseq"))
 
 # -----------------------------------------------------------------------------
 # vehicleNo 수집 (상세 HTML에서 추출)
@@ -227,24 +287,12 @@ def _fetch_vehicle_no(url, session):
         pass
     return None
 
-def attach_vehicle_no(df: pd.DataFrame, max_workers=6, throttle_sec=0.0):
+def attach_vehicle_no(df: pd.DataFrame, max_workers=6, throttle_sec=0.0, session=None, executor=None):
     if df.empty or "DetailURL" not in df.columns:
         return df
-    s = requests.Session()
-    s.trust_env = False
-    s.headers.update(
-        {
-            "User-Agent": (
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/140.0.0.0 Safari/537.36"
-            ),
-            "Referer": "https://fem.encar.com/",
-            "Origin": "https://fem.encar.com",
-        }
-    )
+    s = session or make_detail_page_session(max_workers)
     results = [None] * len(df)
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+    with _executor_scope(executor, max_workers) as ex:
         futures = {ex.submit(_fetch_vehicle_no, url, s): i for i, url in enumerate(df["DetailURL"].tolist())}
         for fut in as_completed(futures):
             i = futures[fut]
@@ -281,10 +329,10 @@ def fetch_readside_detail(s: requests.Session, car_seq: int):
     except Exception:
         return None, None
 
-def enrich_with_readside(df: pd.DataFrame, max_workers=8, throttle_sec=0.0) -> pd.DataFrame:
+def enrich_with_readside(df: pd.DataFrame, max_workers=8, throttle_sec=0.0, session=None, executor=None) -> pd.DataFrame:
     if df.empty or "CarSeq" not in df.columns:
         return df
-    s = make_readside_session()
+    s = session or make_readside_session(max_workers)
     ids = df["CarSeq"].dropna().astype(int).tolist()
 
     res_op = [None] * len(df)
@@ -301,7 +349,7 @@ def enrich_with_readside(df: pd.DataFrame, max_workers=8, throttle_sec=0.0) -> p
             time.sleep(throttle_sec)
         return eid, op, cn
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+    with _executor_scope(executor, max_workers) as ex:
         futures = {ex.submit(_job, eid): eid for eid in ids}
         for fut in as_completed(futures):
             eid, op, cn = fut.result()
@@ -331,11 +379,11 @@ def fetch_open_record_detail(s: requests.Session, car_seq: int, vehicle_no: str)
     except Exception:
         return None
 
-def enrich_with_open_record(df: pd.DataFrame, max_workers=8, throttle_sec=0.0) -> pd.DataFrame:
+def enrich_with_open_record(df: pd.DataFrame, max_workers=8, throttle_sec=0.0, session=None, executor=None) -> pd.DataFrame:
     if df.empty or "CarSeq" not in df.columns or "VehicleNo" not in df.columns:
         return df
 
-    s = make_readside_session()
+    s = session or make_readside_session(max_workers)
     carseq_list = df["CarSeq"].tolist()
     vehno_list = df["VehicleNo"].tolist()
 
@@ -349,7 +397,7 @@ def enrich_with_open_record(df: pd.DataFrame, max_workers=8, throttle_sec=0.0) -
             time.sleep(throttle_sec)
         return idx, f
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+    with _executor_scope(executor, max_workers) as ex:
         futures = {ex.submit(_job, idx, carseq_list[idx], vehno_list[idx]): idx for idx in range(len(df))}
         for fut in as_completed(futures):
             idx, f = fut.result()
@@ -368,47 +416,60 @@ WANTED_COLS = [
     "ColorName","ModelYear","FirstRegistrationDate","Distance","Price","OriginPrice","SellType","Location","DetailURL","Photo",
 ]
 
+def _string_col(df_raw: pd.DataFrame, name: str) -> pd.arrays.StringArray:
+    if name in df_raw.columns:
+        return df_raw[name].astype("string").array
+    return pd.array([None] * len(df_raw), dtype="string")
+
+def _int_col(df_raw: pd.DataFrame, name: str) -> pd.arrays.IntegerArray:
+    if name in df_raw.columns:
+        return to_int_series(df_raw[name])
+    return pd.array([None] * len(df_raw), dtype="Int64")
+
 def shape_rows(df_raw: pd.DataFrame, pageid: str, category_fallback: str, market_key: str) -> pd.DataFrame:
     id_col = next((c for c in ["vehicleId", "VehicleId", "id", "Id", "carId", "carid"] if c in df_raw.columns), None)
     if id_col is None:
         raise KeyError("vehicleId-like column not found in SearchResults")
 
-    df = pd.DataFrame()
-    # 내부 식별자
-    df["CarSeq"] = df_raw[id_col].apply(to_int_safe).astype("Int64")
-    df["Platform"] = pd.Series(["encar"] * len(df_raw), dtype="string")
-    df["Origin"] = pd.Series(["국산" if market_key == "korean" else "수입"] * len(df_raw), dtype="string")
+    # 컬럼을 배열로 먼저 만들고 DataFrame은 마지막에 한 번만 생성 (컬럼별 삽입/행 단위 apply 없음)
+    n = len(df_raw)
+    def const(value, dtype):
+        return pd.array([value] * n, dtype=dtype)
 
     # 차종 (API 그대로, 없으면 카테고리 보완)
     if "Category" in df_raw.columns and df_raw["Category"].notna().any():
-        df["CarType"] = df_raw["Category"].astype("string")
+        car_type = _string_col(df_raw, "Category")
     elif "CategoryName" in df_raw.columns and df_raw["CategoryName"].notna().any():
-        df["CarType"] = df_raw["CategoryName"].astype("string")
+        car_type = _string_col(df_raw, "CategoryName")
     else:
-        df["CarType"] = pd.Series([category_fallback] * len(df_raw), dtype="string")
-
-    # 제조사/모델/세대/트림 (분리 저장)
-    df["Manufacturer"] = df_raw.get("Manufacturer").astype("string") if "Manufacturer" in df_raw else pd.Series(dtype="string")
-    df["Model"] = df_raw.get("Model").astype("string") if "Model" in df_raw else pd.Series(dtype="string")
-    df["Generation"] = df_raw.get("Badge").astype("string") if "Badge" in df_raw else pd.Series(dtype="string")
-    df["Trim"] = df_raw.get("BadgeDetail").astype("string") if "BadgeDetail" in df_raw else pd.Series(dtype="string")
-    df["FuelType"] = df_raw.get("FuelType").astype("string") if "FuelType" in df_raw else pd.Series(dtype="string")
-    df["Transmission"] = df_raw.get("Transmission").astype("string") if "Transmission" in df_raw else pd.Series(dtype="string")
-    df["ModelYear"] = df_raw.get("FormYear").apply(to_int_safe).astype("Int64") if "FormYear" in df_raw else pd.Series(dtype="Int64")
-    df["Distance"] = (df_raw.get("Mileage").apply(to_int_safe).astype("Int64") if "Mileage" in df_raw else pd.Series(dtype="Int64"))
-    df["Price"] = df_raw.get("Price").apply(to_int_safe).astype("Int64") if "Price" in df_raw else pd.Series(dtype="Int64")
-    df["SellType"] = df_raw.get("SellType").astype("string") if "SellType" in df_raw else pd.Series(dtype="string")
-    df["Location"] = (df_raw.get("OfficeCityState").astype("string") if "OfficeCityState" in df_raw else pd.Series(dtype="string"))
-    df["DetailURL"] = df["CarSeq"].map(lambda x: make_detail_url(x, pageid) if pd.notna(x) else None).astype("string")
-    df["Photo"] = df_raw.apply(extract_photo, axis=1).astype("string")
-
-    # 보강 예정 필드 초기화
-    df["VehicleNo"] = pd.Series([None] * len(df), dtype="string")
-    df["OriginPrice"] = pd.Series([None] * len(df), dtype="Int64")
-    df["ColorName"] = pd.Series([None] * len(df), dtype="string")
-    df["FirstRegistrationDate"] = pd.Series([None] * len(df), dtype="Int64")
-
-    return df[WANTED_COLS]
+        car_type = const(category_fallback, "string")
+
+    car_seq = to_int_series(df_raw[id_col])  # 내부 식별자
+    cols = {
+        "CarSeq": car_seq,
+        "VehicleNo": const(None, "string"),  # 보강 예정
+        "Platform": const("encar", "string"),
+        "Origin": const("국산" if market_key == "korean" else "수입", "string"),
+        "CarType": car_type,
+        # 제조사/모델/세대/트림 (분리 저장)
+        "Manufacturer": _string_col(df_raw, "Manufacturer"),
+        "Model": _string_col(df_raw, "Model"),
+        "Generation": _string_col(df_raw, "Badge"),
+        "Trim": _string_col(df_raw, "BadgeDetail"),
+        "FuelType": _string_col(df_raw, "FuelType"),
+        "Transmission": _string_col(df_raw, "Transmission"),
+        "ColorName": const(None, "string"),  # 보강 예정
+        "ModelYear": _int_col(df_raw, "FormYear"),
+        "FirstRegistrationDate": const(None, "Int64"),  # 보강 예정
+        "Distance": _int_col(df_raw, "Mileage"),
+        "Price": _int_col(df_raw, "Price"),
+        "OriginPrice": const(None, "Int64"),  # 보강 예정
+        "SellType": _string_col(df_raw, "SellType"),
+        "Location": _string_col(df_raw, "OfficeCityState"),
+        "DetailURL": make_detail_url_series(car_seq, pageid),
+        "Photo": extract_photo_series(df_raw),
+    }
+    return pd.DataFrame({c: cols[c] for c in WANTED_COLS}, index=df_raw.index)
 
 # -----------------------------------------------------------------------------
 # 크롤링 & 적재
@@ -433,82 +494,91 @@ def crawl_market_to_mysql(
     s = make_session(conf["referer"])
     engine = make_mysql_engine()
 
-    # 0) 이미 저장된 CarSeq 집합 로드 (인덱스 필수: CREATE INDEX idx_vehicles_carseq ON vehicles(CarSeq);)
-    existing_ids = set()
-    if resume_from_db:
-        try:
-            df_exist = pd.read_sql("SELECT CarSeq FROM vehicles WHERE CarSeq IS NOT NULL", engine)
-            existing_ids = set(df_exist["CarSeq"].dropna().astype(int).tolist())
-            print(f"[resume] existing CarSeq loaded: {len(existing_ids):,}")
-        except Exception as e:
-            print(f"[resume] load existing ids failed: {e}")
-
-    total_saved = 0
-    for cat in categories:
-        action = build_action_from_categories([cat], car_type=conf["car_type"])
-        total = get_total_count(s, action, sort)
-        print(f"[{market_key}] '{cat}' 대상 {total:,}건")
-
-        saved = 0
-        consecutive_seen_pages = 0
-
-        for offset in range(0, total, page_size):
-            params = {"count": "false", "q": action, "sr": f"|{sort}|{offset}|{page_size}"}
-            data = get_json(s, params)
-            rows = data.get("SearchResults", [])
-            if not rows:
-                break
-
-            raw = pd.json_normalize(rows, max_level=1)
-            shaped = shape_rows(raw, pageid=conf["pageid"], category_fallback=cat, market_key=market_key)
-
-            # 이어받기: 배치 내부 중복 제거 + 기존 CarSeq 스킵
-            if resume_from_db and not shaped.empty:
-                shaped = shaped[~shaped["CarSeq"].isna()].copy()
-                shaped["CarSeq"] = shaped["CarSeq"].astype(int)
-                shaped.drop_duplicates(subset=["CarSeq"], inplace=True)
-
-                before = len(shaped)
-                shaped = shaped[~shaped["CarSeq"].isin(existing_ids)]
-                after = len(shaped)
-
-                if after == 0:
-                    consecutive_seen_pages += 1
-                else:
-                    consecutive_seen_pages = 0
-
-                if consecutive_seen_pages >= stop_after_consecutive_seen:
-                    print(f"[{market_key}] '{cat}' 오래된 구간 감지 → 조기 종료 (offset={offset})")
+    # 보강용 세션/스레드풀은 실행 내내 재사용 (페이지마다 만들면 TLS 연결/스레드 생성 비용이 매번 듦)
+    with ExitStack() as stack:
+        vehno_session = stack.enter_context(make_detail_page_session(vehno_workers))
+        vehno_pool = stack.enter_context(ThreadPoolExecutor(max_workers=vehno_workers))
+        detail_session = stack.enter_context(make_readside_session(detail_workers))
+        detail_pool = stack.enter_context(ThreadPoolExecutor(max_workers=detail_workers))
+        # 0) 이미 저장된 CarSeq 집합 로드 (인덱스 필수: CREATE INDEX idx_vehicles_carseq ON vehicles(CarSeq);)
+        existing_ids = set()
+        if resume_from_db:
+            try:
+                df_exist = pd.read_sql("SELECT CarSeq FROM vehicles WHERE CarSeq IS NOT NULL", engine)
+                existing_ids = set(df_exist["CarSeq"].dropna().astype(int).tolist())
+                print(f"[resume] existing CarSeq loaded: {len(existing_ids):,}")
+            except Exception as e:
+                print(f"[resume] load existing ids failed: {e}")
+
+        total_saved = 0
+        for cat in categories:
+            action = build_action_from_categories([cat], car_type=conf["car_type"])
+            total = get_total_count(s, action, sort)
+            print(f"[{market_key}] '{cat}' 대상 {total:,}건")
+
+            saved = 0
+            consecutive_seen_pages = 0
+
+            for offset in range(0, total, page_size):
+                params = {"count": "false", "q": action, "sr": f"|{sort}|{offset}|{page_size}"}
+                data = get_json(s, params)
+                rows = data.get("SearchResults", [])
+                if not rows:
                     break
 
-            if shaped.empty:
-                time.sleep(sleep_sec)
-                continue
+                raw = pd.json_normalize(rows, max_level=1)
+                shaped = shape_rows(raw, pageid=conf["pageid"], category_fallback=cat, market_key=market_key)
 
-            # 1) 차량번호 수집
-            if fetch_vehicle_no:
-                shaped = attach_vehicle_no(shaped, max_workers=vehno_workers, throttle_sec=vehno_throttle)
+                # 이어받기: 배치 내부 중복 제거 + 기존 CarSeq 스킵
+                if resume_from_db and not shaped.empty:
+                    shaped = shaped[~shaped["CarSeq"].isna()].copy()
+                    shaped["CarSeq"] = shaped["CarSeq"].astype(int)
+                    shaped.drop_duplicates(subset=["CarSeq"], inplace=True)
 
-            # 2) 최초등록일만 open-record에서
-            shaped = enrich_with_open_record(shaped, max_workers=detail_workers, throttle_sec=detail_throttle)
+                    before = len(shaped)
+                    shaped = shaped[~shaped["CarSeq"].isin(existing_ids)]
+                    after = len(shaped)
 
-            # 3) 출시가/색상
-            if fetch_detail:
-                shaped = enrich_with_readside(shaped, max_workers=detail_workers, throttle_sec=detail_throttle)
+                    if after == 0:
+                        consecutive_seen_pages += 1
+                    else:
+                        consecutive_seen_pages = 0
 
-            upsert_df(engine, shaped, "vehicles")
-            saved += len(shaped)
+                    if consecutive_seen_pages >= stop_after_consecutive_seen:
+                        print(f"[{market_key}] '{cat}' 오래된 구간 감지 → 조기 종료 (offset={offset})")
+                        break
 
-            # 방금 본 CarSeq를 즉시 합쳐 다음 페이지에서 스킵률 향상
-            if resume_from_db:
-                existing_ids.update(shaped["CarSeq"].dropna().astype(int).tolist())
+                if shaped.empty:
+                    time.sleep(sleep_sec)
+                    continue
 
-            time.sleep(sleep_sec)
+                # 1) 차량번호 수집
+                if fetch_vehicle_no:
+                    shaped = attach_vehicle_no(shaped, throttle_sec=vehno_throttle,
+                                               session=vehno_session, executor=vehno_pool)
+
+                # 2) 최초등록일만 open-record에서
+                shaped = enrich_with_open_record(shaped, throttle_sec=detail_throttle,
+                                                 session=detail_session, executor=detail_pool)
+
+                # 3) 출시가/색상
+                if fetch_detail:
+                    shaped = enrich_with_readside(shaped, throttle_sec=detail_throttle,
+                                                  session=detail_session, executor=detail_pool)
+
+                upsert_df(engine, shaped, "vehicles")
+                saved += len(shaped)
+
+                # 방금 본 CarSeq를 즉시 합쳐 다음 페이지에서 스킵률 향상
+                if resume_from_db:
+                    existing_ids.update(shaped["CarSeq"].dropna().astype(int).tolist())
+
+                time.sleep(sleep_sec)
 
-        print(f"[{market_key}] '{cat}' 저장 완료: {saved:,}건")
-        total_saved += saved
+            print(f"[{market_key}] '{cat}' 저장 완료: {saved:,}건")
+            total_saved += saved
 
-    print(f"[{market_key}] 총 {total_saved:,}건 UPSERT 완료 → vehicles")
+        print(f"[{market_key}] 총 {total_saved:,}건 UPSERT 완료 → vehicles")
 
 
 def main():
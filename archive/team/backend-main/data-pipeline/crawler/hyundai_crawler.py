@@ -1,18 +1,25 @@
-import os, re, html, time, math, requests, pandas as pd
+import os, re, sys, html, time, math, threading, requests, pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from datetime import datetime
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter, Retry
-from sqlalchemy import create_engine, MetaData, Table
-from sqlalchemy.dialects.mysql import insert as mysql_insert
-from sqlalchemy.exc import OperationalError
-from time import sleep
+from sqlalchemy import create_engine, MetaData, Table, Column, String, BigInteger, DateTime, select
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from db_upsert import get_table, upsert_df
+from name_matcher import CarNameClassifier, norm_name
 
 # -------------------- 공통 설정 --------------------
 TABLE = "hyundai_segment_purchases"  
 PAGE_SIZE_HYUNDAI = 100
 PAGE_SIZE_CASPER = 100
-SLEEP_SECONDS  = 0.6
+DEFAULT_MAX_RPS = 3.0   # 모든 소스 합산 초당 요청 수 (REVIEW_MAX_RPS로 조정)
+CURSOR_TABLE = "crawl_cursors"
 MAX_PAGES_CASPER = 4
+SORT_KEY_HYUNDAI_DEFAULT = "rating"   # API에서 확인된 정렬 키 (최신순 키는 HYUNDAI_SORT_KEY로 지정)
 
 URL_HYUNDAI = "https://www.hyundai.com/wsvc/kr/front/purchaseReview.selectPurchaseReview.do"
 HDR_HYUNDAI = {
@@ -46,13 +53,13 @@ def load_env():
     env_path = root.parent / ".env"
     load_dotenv(dotenv_path=env_path); load_dotenv()
 
-def make_session(headers, method="GET"):
+def make_session(headers, method="GET", pool_size=10):
     s = requests.Session()
     s.headers.update(headers)
     retries = Retry(total=5, backoff_factor=0.8,
                     status_forcelist=[429, 500, 502, 503, 504],
                     allowed_methods=[method])
-    s.mount("https://", HTTPAdapter(max_retries=retries))
+    s.mount("https://", HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size))
     return s
 
 def make_engine():
@@ -68,45 +75,6 @@ def make_engine():
     return create_engine(url, pool_pre_ping=True, pool_recycle=1800,
                          pool_size=5, max_overflow=5, future=True)
 
-def reflect_table(engine, table_name, retries=3):
-    meta = MetaData()
-    for a in range(retries):
-        try:
-            meta.reflect(bind=engine, only=[table_name])
-            return Table(table_name, meta, autoload_with=engine)
-        except OperationalError as e:
-            if a == retries - 1:
-                raise
-            print(f"[DB] reflect 재시도 {a+1}/{retries} ... {e}")
-            engine.dispose(); sleep(2)
-
-def upsert_df(engine, df_all: pd.DataFrame, table_name: str, chunk_size=1000):
-    if df_all.empty:
-        return
-    table = reflect_table(engine, table_name)
-    keep = [c.name for c in table.columns if c.name in df_all.columns]
-    df = df_all[keep].copy()
-    n = len(df)
-    chunks = math.ceil(n / chunk_size)
-    for i in range(chunks):
-        part = df.iloc[i*chunk_size:(i+1)*chunk_size]
-        stmt = mysql_insert(table).values(part.to_dict(orient="records"))
-        upd = {c.name: stmt.inserted[c.name]
-               for c in table.columns
-               if c.name in part.columns and c.name.lower() not in {"id"}}
-        stmt = stmt.on_duplicate_key_update(**upd)
-        for a in range(3):
-            try:
-                with engine.begin() as conn:
-                    conn.execute(stmt)
-                break
-            except OperationalError as e:
-                if a == 2:
-                    raise
-                print(f"[DB] chunk 재시도 {a+1}/3 ... {e}")
-                engine.dispose(); sleep(2)
-        print(f"[DB] 업서트 진행 {i+1}/{chunks} (누적 {min((i+1)*len(part), n)}/{n})")
-
 def clean_text(text: str) -> str:
     if not text:
         return ""
@@ -123,43 +91,195 @@ def clean_text(text: str) -> str:
     return t
 
 # 이름 표준화(다른 테이블 매칭용; 표기 통일)
+# 원문 → 표준 표기. 긴 표기부터 한 번의 정규식 치환으로 처리 (순서대로 replace를 반복하던 것과 결과 동일)
+NAME_REPLACEMENTS = {
+    "더 뉴 아이오닉 5": "더 뉴 아이오닉5", "아이오닉 5": "아이오닉5", "아이오닉 6": "아이오닉6",
+    "아반떼 Hybrid": "아반떼 하이브리드", "쏘나타 디 엣지 Hybrid": "쏘나타 디 엣지 하이브리드",
+    "그랜저 Hybrid": "그랜저 하이브리드", "코나 Hybrid": "코나 하이브리드", "코나 Electric": "코나 일렉트릭",
+    "더 뉴 투싼 Hybrid": "더 뉴 투싼 하이브리드", "싼타페 Hybrid": "싼타페 하이브리드",
+    "디 올 뉴 팰리세이드 Hybrid": "디 올 뉴 팰리세이드 하이브리드",
+    "스타리아 라운지 Hybrid": "스타리아 라운지 하이브리드", "스타리아 Hybrid": "스타리아 하이브리드",
+    "포터 II Electric 특장차": "포터2 일렉트릭 특장차", "포터 II Electric": "포터2 일렉트릭",
+}
+_NAME_REPLACE_RE = re.compile("|".join(map(re.escape, sorted(NAME_REPLACEMENTS, key=len, reverse=True))))
+
+@lru_cache(maxsize=65536)
 def normalize_car_name(x: str) -> str:
-    x = (x or "")
-    x = x.replace("더 뉴 아이오닉 5", "더 뉴 아이오닉5").replace("아이오닉 5", "아이오닉5").replace("아이오닉 6", "아이오닉6")
-    x = x.replace("아반떼 Hybrid", "아반떼 하이브리드").replace("쏘나타 디 엣지 Hybrid", "쏘나타 디 엣지 하이브리드")
-    x = x.replace("그랜저 Hybrid", "그랜저 하이브리드").replace("코나 Hybrid", "코나 하이브리드").replace("코나 Electric", "코나 일렉트릭")
-    x = x.replace("더 뉴 투싼 Hybrid", "더 뉴 투싼 하이브리드").replace("싼타페 Hybrid", "싼타페 하이브리드")
-    x = x.replace("디 올 뉴 팰리세이드 Hybrid", "디 올 뉴 팰리세이드 하이브리드")
-    x = x.replace("스타리아 라운지 Hybrid", "스타리아 라운지 하이브리드").replace("스타리아 Hybrid", "스타리아 하이브리드")
-    x = x.replace("포터 II Electric", "포터2 일렉트릭").replace("포터 II Electric 특장차", "포터2 일렉트릭 특장차")
-    return x
+    return _NAME_REPLACE_RE.sub(lambda m: NAME_REPLACEMENTS[m.group(0)], x or "")
 
 # ---- 비교용 정규화(공백/하이픈 제거, 소문자) ----
-def _norm(s: str) -> str:
-    return re.sub(r'[\s\-]+', '', s or '').lower()
-
-# 분류 리스트 정규화 버전
-compact_models_norm = list(map(_norm, compact_models))
-midsize_models_norm = list(map(_norm, midsize_models))
-large_models_norm = list(map(_norm, large_models))
-suv_models_norm = list(map(_norm, suv_models))
-van_models_norm = list(map(_norm, van_models))
-truck_models_norm = list(map(_norm, truck_models))
+_norm = norm_name
+
+# 분류기는 import 시 한 번만 컴파일 (카테고리 순서 = 우선순위)
+CAR_TYPE_CLASSIFIER = CarNameClassifier([
+    ("준중형", compact_models),
+    ("중형", midsize_models),
+    ("대형", large_models),
+    ("SUV", suv_models),
+    ("승합", van_models),
+    ("트럭", truck_models),
+])
 
 def classify_car_type(name: str) -> str:
-    n = _norm(name)
-    if any(m in n for m in compact_models_norm): return "준중형"
-    if any(m in n for m in midsize_models_norm): return "중형"
-    if any(m in n for m in large_models_norm): return "대형"
-    if any(m in n for m in suv_models_norm): return "SUV"
-    if any(m in n for m in van_models_norm): return "승합"
-    if any(m in n for m in truck_models_norm): return "트럭"
-    return ""
+    return CAR_TYPE_CLASSIFIER.classify(name or "")
+
+# -------------------- 수집 공통 (동시 페이징 / 요청 제한 / 커서) --------------------
+class RateLimiter:
+    """모든 소스 스레드가 공유하는 초당 요청 수 제한 (요청 사이 최소 간격)"""
+    def __init__(self, max_rps):
+        self.interval = 1.0 / max_rps if max_rps else 0.0
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+class ReviewSource(NamedTuple):
+    name: str                                   # 커서 키 (예: hyundai:E, casper)
+    session: requests.Session
+    fetch: Callable[[requests.Session, int], dict]
+    extract_total: Callable[[dict], Optional[int]]
+    extract_items: Callable[[dict], list]
+    to_frame: Callable[[list], pd.DataFrame]   # 페이지 항목들 → 적재용 DataFrame
+    item_id: Callable[[dict], Any]
+    item_date: Callable[[dict], Optional[str]]
+    page_size: int
+    max_pages: Optional[int] = None
+    newest_first: bool = False                  # 최신순 정렬일 때만 커서 이전 구간에서 조기 종료 (실제 순서도 확인)
+    fallback_fetch: Optional[Callable[[requests.Session, int], dict]] = None  # 최신순 응답이 아닐 때 전체 수집용
+
+# 소스별 마지막 수집 위치 (리뷰 id/작성일 최대값)
+cursor_meta = MetaData()
+crawl_cursors = Table(
+    CURSOR_TABLE, cursor_meta,
+    Column("source", String(64), primary_key=True),
+    Column("last_id", BigInteger),
+    Column("last_date", String(32)),
+    Column("updated_at", DateTime),
+)
+
+def load_cursors(engine) -> Dict[str, dict]:
+    cursor_meta.create_all(engine, checkfirst=True)
+    with engine.connect() as conn:
+        return {r.source: dict(r._mapping) for r in conn.execute(select(crawl_cursors))}
+
+def save_cursor(engine, source: str, last_id, last_date):
+    upsert_df(engine, pd.DataFrame([{
+        "source": source, "last_id": last_id, "last_date": last_date, "updated_at": datetime.now(),
+    }]), CURSOR_TABLE, exclude_update=("source",))
+
+def _as_int(v):
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        return None
+
+def _first_present(d: dict, keys):
+    for k in keys:
+        if d.get(k):
+            return str(d[k])
+    return None
+
+def collect_source(engine, src: ReviewSource, limiter: RateLimiter, cursor: Optional[dict]) -> int:
+    """소스 하나를 페이지 순서대로 수집하며 새 리뷰만 페이지마다 바로 적재합니다.
+
+    커서(last_id)보다 큰 id만 새 리뷰로 보고, 최신순 소스는 커서 이전 id가 보이는 페이지에서 멈춥니다.
+    응답이 실제로 id 내림차순이 아니면(정렬 키가 무시된 경우 등) 조기 종료를 끄고 끝까지 페이징합니다.
+    최신순 1페이지가 비었거나 최신순이 아니면 fallback_fetch(기본 정렬)로 처음부터 전체 수집하고,
+    fallback이 없어 1페이지부터 비었으면 커서를 저장하지 않습니다.
+    커서는 소스를 끝까지 마쳤을 때만 갱신 → 중간에 죽으면 다음 실행이 같은 구간을 다시 받음(UPSERT라 안전)
+    """
+    last_id = (cursor or {}).get("last_id")
+    max_id, max_date = last_id, (cursor or {}).get("last_date")
+    written, page, total_pages = 0, 1, None
+    newest_first, prev_min_id = src.newest_first, None
+    fetch = src.fetch
+
+    def fall_back(reason: str) -> bool:
+        nonlocal fetch, newest_first
+        if not (newest_first and src.fallback_fetch is not None and fetch is not src.fallback_fetch):
+            return False
+        print(f"[{src.name}] {reason} → 기본 정렬로 처음부터 전체 수집 (정렬 키 확인 필요)")
+        fetch, newest_first = src.fallback_fetch, False
+        return True
+
+    while not (src.max_pages and page > src.max_pages):
+        limiter.wait()
+        j = fetch(src.session, page)
+        if page == 1:
+            total = src.extract_total(j)
+            total_pages = math.ceil(total / src.page_size) if total else None
+        items = src.extract_items(j)
+        if not items:
+            if page == 1:
+                if fall_back("최신순 1페이지 데이터 없음"):
+                    continue
+                print(f"[{src.name}] 데이터 없음")
+                return written  # 커서 저장 안 함
+            break
+
+        ids = [_as_int(src.item_id(it)) for it in items]
+        known = [i for i in ids if i is not None]
+        if newest_first and (known != sorted(known, reverse=True)
+                             or (prev_min_id is not None and known and known[0] > prev_min_id)):
+            if page == 1 and fall_back("응답이 최신순이 아님"):
+                continue
+            print(f"[{src.name}] 응답이 최신순이 아님 → 조기 종료 없이 끝까지 수집 (정렬 키 확인 필요)")
+            newest_first = False
+        if known:
+            prev_min_id = known[-1]
+        new_items = [it for it, i in zip(items, ids) if last_id is None or i is None or i > last_id]
+        if new_items:
+            upsert_df(engine, src.to_frame(new_items), TABLE, exclude_update=("id",))
+            written += len(new_items)
+        max_id = max([i for i in ids if i is not None] + ([max_id] if max_id is not None else []), default=None)
+        dates = [d for d in (src.item_date(it) for it in items) if d] + ([max_date] if max_date else [])
+        max_date = max(dates, default=None)
+
+        denom = f"/{total_pages}" if total_pages else ""
+        print(f"[{src.name}] {page}{denom} 페이지: 신규 {len(new_items)}/{len(items)}건 (누적 신규 {written})")
+
+        if newest_first and last_id is not None and len(new_items) < len(items):
+            print(f"[{src.name}] 커서(id {last_id}) 이전 구간 도달 → 종료")
+            break
+        if (total_pages and page >= total_pages) or len(items) < src.page_size:
+            break
+        page += 1
+
+    if max_id is not None and (max_id != last_id or max_date != (cursor or {}).get("last_date")):
+        save_cursor(engine, src.name, max_id, max_date)
+    return written
+
+def run_sources(engine, sources: List[ReviewSource], max_rps: float) -> int:
+    """소스들을 동시에 수집 (요청 제한은 전체 공유). 한 소스가 실패해도 나머지는 계속, 실패 소스의 커서는 그대로"""
+    cursors = load_cursors(engine)
+    limiter = RateLimiter(max_rps)
+    grand, failed = 0, []
+    with ThreadPoolExecutor(max_workers=max(1, len(sources))) as ex:
+        futures = {ex.submit(collect_source, engine, src, limiter, cursors.get(src.name)): src for src in sources}
+        for fut in as_completed(futures):
+            src = futures[fut]
+            try:
+                n = fut.result()
+                grand += n
+                print(f"[{src.name}] 완료: 신규 {n}건")
+            except Exception as e:
+                failed.append(src.name)
+                print(f"[{src.name}] 실패: {e}")
+    print(f"[REVIEW] 수집/적재 완료: 신규 {grand}건" + (f" (실패 소스: {', '.join(sorted(failed))})" if failed else ""))
+    return grand
 
 # -------------------- 현대 구매후기 수집 --------------------
-def fetch_page_hyundai(session, car_type_key: str, page_no: int):
+def fetch_page_hyundai(session, car_type_key: str, page_no: int, sort_key: str = SORT_KEY_HYUNDAI_DEFAULT):
     payload = {"carType": car_type_key, "pageNo": page_no,
-               "rowCount": PAGE_SIZE_HYUNDAI, "sortKey": "rating"}
+               "rowCount": PAGE_SIZE_HYUNDAI, "sortKey": sort_key}
     r = session.post(URL_HYUNDAI, data=payload, timeout=20)
     r.raise_for_status()
     return r.json()
@@ -173,54 +293,46 @@ def extract_total_hyundai(j):
         return len(j["data"])
     return None
 
-def collect_hyundai(engine):
-    s = make_session(HDR_HYUNDAI, method="POST")
-    rows_total = 0
-    print("[HYUNDAI] 수집 시작")
-
-    for key in car_type_keys:
-        j1 = fetch_page_hyundai(s, key, 1)
-        total = extract_total_hyundai(j1)
-        total_pages = math.ceil(total / PAGE_SIZE_HYUNDAI) if total else None
-
-        page = 1
-        while True:
-            j = j1 if page == 1 else fetch_page_hyundai(s, key, page)
-            data = j.get("data") or []
-            n = len(data)
-            if n == 0:
-                break
-
-            # 분류는 원문으로, 저장용 모델명만 표준화
-            rows = []
-            for r in data:
-                raw_name = r.get("carName", "")
-                rows.append({
-                    "Id": r.get("reviewId"),
-                    "CarType": classify_car_type(raw_name), # <- 원문으로 분류
-                    "Manufacturer": "현대",
-                    "Model": normalize_car_name(raw_name),  # <- 저장/매칭용 표준화
-                    "Age": r.get("age"),
-                    "Gender": gender_map.get(r.get("gender"), r.get("gender")),
-                    "Satisfaction": float(r.get("carScore") or 0),
-                    "Review": clean_text(r.get("review", "")),
-                })
-            df = pd.DataFrame(rows)
-
-            upsert_df(engine, df, TABLE, chunk_size=1000)
-            rows_total += n
-
-            if total_pages:
-                print(f"[HYUNDAI:{key}] {page}/{total_pages} 페이지: {n}건 (누적 {rows_total}/{total})")
-                if page >= total_pages:
-                    break
-            else:
-                print(f"[HYUNDAI:{key}] {page} 페이지: {n}건 (누적 {rows_total})")
-
-            page += 1
-            time.sleep(SLEEP_SECONDS)
-
-    print(f"[HYUNDAI] 수집/적재 완료 누적: {rows_total}건")
+def hyundai_frame(items: list) -> pd.DataFrame:
+    df = pd.DataFrame([{
+        "Id": r.get("reviewId"),
+        "Manufacturer": "현대",
+        "Model": r.get("carName", ""),
+        "Age": r.get("age"),
+        "Gender": gender_map.get(r.get("gender"), r.get("gender")),
+        "Satisfaction": float(r.get("carScore") or 0),
+        "Review": clean_text(r.get("review", "")),
+    } for r in items])
+    # 분류는 원문으로, 저장용 모델명만 표준화 (둘 다 고유 차명 기준 캐시 → 컬럼 map)
+    df["CarType"] = CAR_TYPE_CLASSIFIER.classify_series(df["Model"])
+    df["Model"] = df["Model"].fillna("").map(normalize_car_name)
+    return df
+
+def hyundai_sources() -> List[ReviewSource]:
+    # 기본 정렬(rating)은 최신순이 아니라 끝까지 페이징하고 새 id만 적재.
+    # 최신순 정렬 키를 HYUNDAI_SORT_KEY로 주고 HYUNDAI_NEWEST_FIRST=1이면 커서 이전 구간에서 조기 종료
+    # (그 키의 응답이 비었거나 최신순이 아니면 기본 정렬로 전체 수집)
+    sort_key = os.getenv("HYUNDAI_SORT_KEY", SORT_KEY_HYUNDAI_DEFAULT)
+    newest_first = os.getenv("HYUNDAI_NEWEST_FIRST", "0") == "1" and sort_key != SORT_KEY_HYUNDAI_DEFAULT
+    s = make_session(HDR_HYUNDAI, method="POST", pool_size=len(car_type_keys))
+    return [
+        ReviewSource(
+            name=f"hyundai:{key}", session=s,
+            fetch=lambda session, page, key=key: fetch_page_hyundai(session, key, page, sort_key),
+            extract_total=extract_total_hyundai,
+            extract_items=lambda j: j.get("data") or [],
+            to_frame=hyundai_frame,
+            item_id=lambda r: r.get("reviewId"),
+            item_date=lambda r: _first_present(r, ("regDate", "regDt", "createDate", "writeDate")),
+            page_size=PAGE_SIZE_HYUNDAI,
+            newest_first=newest_first,
+            fallback_fetch=lambda session, page, key=key: fetch_page_hyundai(session, key, page, SORT_KEY_HYUNDAI_DEFAULT),
+        )
+        for key in car_type_keys
+    ]
+
+def collect_hyundai(engine, max_rps: Optional[float] = None):
+    return run_sources(engine, hyundai_sources(), max_rps or float(os.getenv("REVIEW_MAX_RPS", DEFAULT_MAX_RPS)))
 
 # -------------------- 캐스퍼 수집 --------------------
 def fetch_page_casper(session, page_no: int):
@@ -244,54 +356,41 @@ def extract_total_casper(j):
     lst = d.get("list") or []
     return None if len(lst) == PAGE_SIZE_CASPER else len(lst)
 
-def collect_casper(engine, max_pages=MAX_PAGES_CASPER):
-    s = make_session(HDR_CASPER, method="GET")
-    print("[CASPER] 수집 시작")
-    first = fetch_page_casper(s, 1)
-    total = extract_total_casper(first)
-    print(f"[CASPER] 총 {total if total else '?'}건 (최대 {max_pages if max_pages else '∞'} 페이지)")
-
-    grand = 0
-    page = 1
-    while True:
-        if max_pages and page > max_pages:
-            break
-        j = first if page == 1 else fetch_page_casper(s, page)
-        data = (j.get("data") or {}).get("list") or []
-        n = len(data)
-        if n == 0:
-            if page == 1:
-                print("[CASPER] 데이터 없음")
-            break
-
-        df = pd.DataFrame([{
-            "Id": it.get("epilogueNumber"),
-            "CarType": "경차",
-            "Manufacturer": "현대",
-            "Model": it.get("carName"),
-            "Age": it.get("customerAgeSectionCode"),
-            "Gender": it.get("customerGenderName"),
-            "Satisfaction": float(it.get("satisfactionScore") or 0),
-            "Review": clean_text(it.get("epilogueContents")),
-        } for it in data])
-
-        upsert_df(engine, df, TABLE, chunk_size=1000)
-        grand += n
-        denom = f"/{total}" if total else ""
-        suffix = f"/{max_pages}" if max_pages else ""
-        print(f"[CASPER] {page}{suffix} 페이지: {n}건 (누적 {grand}{denom})")
-
-        page += 1
-        time.sleep(SLEEP_SECONDS)
-
-    print(f"[CASPER] 수집/적재 완료 누적: {grand}건")
+def casper_frame(items: list) -> pd.DataFrame:
+    return pd.DataFrame([{
+        "Id": it.get("epilogueNumber"),
+        "CarType": "경차",
+        "Manufacturer": "현대",
+        "Model": it.get("carName"),
+        "Age": it.get("customerAgeSectionCode"),
+        "Gender": it.get("customerGenderName"),
+        "Satisfaction": float(it.get("satisfactionScore") or 0),
+        "Review": clean_text(it.get("epilogueContents")),
+    } for it in items])
+
+def casper_source(max_pages=MAX_PAGES_CASPER) -> ReviewSource:
+    return ReviewSource(
+        name="casper", session=make_session(HDR_CASPER, method="GET"),
+        fetch=fetch_page_casper,
+        extract_total=extract_total_casper,
+        extract_items=lambda j: (j.get("data") or {}).get("list") or [],
+        to_frame=casper_frame,
+        item_id=lambda it: it.get("epilogueNumber"),
+        item_date=lambda it: _first_present(it, ("registDate", "regDate", "createDate")),
+        page_size=PAGE_SIZE_CASPER,
+        max_pages=max_pages,
+        newest_first=os.getenv("CASPER_NEWEST_FIRST", "0") == "1",
+    )
+
+def collect_casper(engine, max_pages=MAX_PAGES_CASPER, max_rps: Optional[float] = None):
+    return run_sources(engine, [casper_source(max_pages)], max_rps or float(os.getenv("REVIEW_MAX_RPS", DEFAULT_MAX_RPS)))
 
 def main():
     load_env()
     engine = make_engine()
-    reflect_table(engine, TABLE)
-    collect_hyundai(engine)
-    collect_casper(engine)
+    get_table(engine, TABLE)  # 메타데이터는 여기서 한 번만 읽고 이후 캐시 사용
+    # 현대 차종별 + 캐스퍼를 한 번에 동시 수집 (요청 제한 공유)
+    run_sources(engine, hyundai_sources() + [casper_source()], float(os.getenv("REVIEW_MAX_RPS", DEFAULT_MAX_RPS)))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
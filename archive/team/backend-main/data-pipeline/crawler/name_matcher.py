@@ -0,0 +1,103 @@
+"""
+차명 → 차종 분류기 (import 시 한 번 컴파일)
+
+- 정규화(공백/하이픈 제거, 소문자)한 모델명 사전: 이름이 모델명과 정확히 같으면 dict 조회 한 번
+- 부분 일치(트림/연식이 붙은 이름)는 Aho-Corasick 오토마톤으로 이름 길이만큼 한 번만 훑음
+  → 모델 수와 무관하게 이름 하나당 O(len(name))
+- 분류 결과는 원문 이름 기준으로 캐시. 리뷰 데이터는 같은 차명이 반복되므로
+  classify_series는 고유값만 분류한 뒤 pandas map으로 펼침 (행당 dict 조회 한 번)
+
+여러 카테고리의 모델명이 동시에 포함되면 categories에 먼저 적힌 카테고리가 이깁니다.
+(기존 "카테고리 순서대로 any(m in n ...)" 규칙과 동일)
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+_NORM_RE = re.compile(r'[\s\-]+')
+
+
+def norm_name(s: str) -> str:
+    """비교용 정규화 (공백/하이픈 제거, 소문자)"""
+    return _NORM_RE.sub('', s or '').lower()
+
+
+class AhoCorasick:
+    """여러 패턴을 한 번의 스캔으로 찾는 오토마톤. 각 패턴에 붙인 값(priority)의 최솟값을 반환"""
+
+    def __init__(self, patterns: Sequence[Tuple[str, int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._best: List[Optional[int]] = [None]  # 이 상태에서 끝나는(실패 링크 포함) 패턴 중 최소 priority
+        for pattern, priority in patterns:
+            if not pattern:
+                continue
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({}); self._fail.append(0); self._best.append(None)
+                state = nxt
+            self._best[state] = priority if self._best[state] is None else min(self._best[state], priority)
+
+        # BFS로 실패 링크 구성 + 실패 링크 쪽 결과를 미리 합쳐 둠 (깊이 1 상태의 실패 링크는 루트)
+        # 동시에 실패 링크를 따라간 전이까지 펼친 DFA(_delta)를 만들어 스캔 시 문자당 dict 조회 한 번으로 끝냄
+        self._delta: List[Dict[str, int]] = [None] * len(self._goto)
+        self._delta[0] = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                self._fail[nxt] = self._delta[self._fail[state]].get(ch, 0) if state else 0
+                inherited = self._best[self._fail[nxt]]
+                if inherited is not None:
+                    own = self._best[nxt]
+                    self._best[nxt] = inherited if own is None else min(own, inherited)
+
+    def best(self, text: str) -> Optional[int]:
+        delta, best_of = self._delta, self._best
+        state, best = 0, None
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            found = best_of[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:  # 최우선 카테고리면 더 볼 필요 없음
+                    break
+        return best
+
+
+class CarNameClassifier:
+    """categories: [(카테고리명, [모델명, ...]), ...] (앞쪽이 우선)"""
+
+    def __init__(self, categories: Sequence[Tuple[str, Sequence[str]]], default: str = "", cache_size: int = 65536):
+        self.labels = [label for label, _ in categories]
+        self.default = default
+        patterns = [(norm_name(m), i) for i, (_, models) in enumerate(categories) for m in models]
+        self._matcher = AhoCorasick(patterns)
+        # 정확히 모델명인 경우는 오토마톤 없이 바로 (정확 일치라도 다른 카테고리 모델을 포함할 수 있어 결과는 미리 계산)
+        self._exact = {p: self._scan(p) for p, _ in patterns if p}
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _scan(self, normalized: str) -> str:
+        best = self._matcher.best(normalized)
+        return self.default if best is None else self.labels[best]
+
+    def _classify(self, name: str) -> str:
+        n = norm_name(name)
+        label = self._exact.get(n)
+        return label if label is not None else self._scan(n)
+
+    def classify_series(self, names: pd.Series) -> pd.Series:
+        """고유값만 분류해서 map (결측은 빈 이름으로 취급)"""
+        filled = names.fillna("").astype(str)
+        mapping = {name: self.classify(name) for name in filled.unique()}
+        return filled.map(mapping)
@@ -0,0 +1,97 @@
+"""
+scoring_engine top-k 벤치마크 (합성 매물, DB 없이 실행)
+
+합성 카탈로그로 CatalogSnapshot을 만들고
+1) 전체 차량 점수가 calculate_score(차량 dict 한 대씩)와 같은지, top-k 순서가 맞는지 확인
+2) 조건 세트별 top-k 한 번의 시간(중앙값/p95)을 측정합니다. (목표: 20만 대 10ms 미만)
+
+사용법:
+    python bench_scoring_engine.py               # 20만 대, k=5, 200회
+    python bench_scoring_engine.py 500000 20 100
+"""
+
+import os
+import sys
+import time
+import random
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from car_recommender import calculate_score
+from scoring_engine import CatalogSnapshot
+
+CATEGORIES = ['SUV', 'suv', '세단', '경차', '승합', None]
+FUELS = ['가솔린', '디젤', '하이브리드', '전기', 'LPG']
+TRANSMISSIONS = ['자동', '수동', 'CVT']
+ACCIDENTS = ['무사고', '사고', None]
+
+CONDITIONS = {
+    'full': {
+        "Price": 20000000, "Weight_Price": 0.3, "Year": 2018, "Weight_Year": 0.2,
+        "Mileage": 50000, "Weight_Mileage": 0.2, "Category": "SUV", "Weight_Category": 0.1,
+        "FuelType": "하이브리드", "Weight_FuelType": 0.1, "Transmission": "자동", "Weight_Transmission": 0.1,
+        "AccidentHistory": "무사고", "Weight_AccidentHistory": 0.2, "isDisclosed": 1, "Weight_isDisclosed": 0.1,
+    },
+    'price_only': {"Price": 15000000, "Weight_Price": 1},
+    'unknown_category': {"Category": "트럭", "Weight_Category": 1, "Year": 2020, "Weight_Year": 0.5},
+}
+
+
+def make_catalog(n: int, seed: int = 0) -> pd.DataFrame:
+    rnd = np.random.default_rng(seed)
+    def pick(values):
+        return np.array(values, dtype=object)[rnd.integers(0, len(values), n)]
+    frame = pd.DataFrame({
+        'vehicleId': rnd.permutation(np.arange(1, n + 1)) + 30_000_000,
+        'Price': rnd.integers(300, 9000, n) * 10000,
+        'Year': rnd.integers(2008, 2026, n),
+        'Mileage': rnd.integers(0, 250_000, n),
+        'Category': pick(CATEGORIES), 'FuelType': pick(FUELS),
+        'Transmission': pick(TRANSMISSIONS), 'AccidentHistory': pick(ACCIDENTS),
+        'isDisclosed': pick([0, 1, None]),
+    })
+    # 결측 가격 일부
+    frame['Price'] = frame['Price'].astype(object)
+    frame.loc[frame.index[::97], 'Price'] = None
+    return frame
+
+
+def reference_scores(frame: pd.DataFrame, conditions: dict) -> np.ndarray:
+    """calculate_score를 차량 dict마다 호출 (NULL 가격은 SQL처럼 0점 처리)"""
+    out = []
+    for v in frame.sort_values('vehicleId').to_dict(orient='records'):
+        v = {k: (None if (isinstance(x, float) and np.isnan(x)) else x) for k, x in v.items()}
+        if v['Price'] is None:
+            v = {**v, 'Price': float('inf')}
+        out.append(calculate_score(v, conditions))
+    return np.array(out)
+
+
+def main(n: int = 200_000, k: int = 5, repeat: int = 200):
+    frame = make_catalog(n)
+    started = time.perf_counter()
+    snapshot = CatalogSnapshot(frame)
+    print(f"[BENCH] 스냅샷 생성 {n:,}대: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for name, conditions in CONDITIONS.items():
+        expected = reference_scores(frame, conditions)
+        assert np.allclose(snapshot.scores(conditions), expected), f"{name}: 점수 불일치"
+        order = sorted(range(n), key=lambda i: (-expected[i], snapshot.vehicle_ids[i]))[:k]
+        assert [vid for vid, _ in snapshot.top_k(conditions, k)] == snapshot.vehicle_ids[order].tolist(), f"{name}: top-k 불일치"
+    print("[OK] calculate_score와 점수/순위 동일")
+
+    for name, conditions in CONDITIONS.items():
+        times = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            snapshot.top_k(conditions, k)
+            times.append((time.perf_counter() - started) * 1000)
+        times.sort()
+        print(f"  {name:17s} top-{k}: median {times[len(times) // 2]:.2f} ms, p95 {times[int(len(times) * 0.95)]:.2f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(a) for a in sys.argv[1:4]))
@@ -1,5 +1,5 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Tuple
 import pymysql
 from dotenv import load_dotenv
 
@@ -15,33 +15,135 @@ DB_CONFIG = {
     'charset': 'utf8mb4'
 }
 
-def fetch_vehicles_from_db() -> List[Dict]:
-    """vehicles 테이블과 JOIN으로 차량 기본+정보+점검+보험 데이터 조회"""
-    conn = pymysql.connect(**DB_CONFIG)
-    sql = """
+# 조건을 비우는 값 ('무관'은 llm_prompt 기본값)
+ANY_VALUES = (None, '', '무관')
+
+# 점수 규칙: (조건 키, 가중치 키, SQL 조건, 파라미터 변환)
+# calculate_score와 같은 규칙을 SQL CASE 항으로 옮긴 것. 값이 NULL인 차량은 해당 항목 0점
+SCORE_RULES = [
+    ('Price',           'Weight_Price',           'v.Price <= %({p})s',                 int),
+    ('Year',            'Weight_Year',            'v.Year >= %({p})s',                  int),
+    ('Mileage',         'Weight_Mileage',         'v.Mileage <= %({p})s',               int),
+    ('Category',        'Weight_Category',        'LOWER(v.Category) = %({p})s',        lambda x: str(x).lower()),
+    ('FuelType',        'Weight_FuelType',        'LOWER(v.FuelType) = %({p})s',        lambda x: str(x).lower()),
+    ('Transmission',    'Weight_Transmission',    'LOWER(v.Transmission) = %({p})s',    lambda x: str(x).lower()),
+    ('AccidentHistory', 'Weight_AccidentHistory', 'LOWER(vi.AccidentHistory) = %({p})s', lambda x: str(x).lower()),
+    ('isDisclosed',     'Weight_isDisclosed',     'vin.isDisclosed = %({p})s',          int),
+]
+
+# 점수 계산에 쓰는 vehicles 컬럼을 모두 담은 커버링 인덱스
+# → 전체 매물 스캔이 넓은 행(URL 등) 대신 좁은 인덱스만 읽음. 조인은 각 테이블 PK(vehicleId) 사용
+INDEXES = {
+    'vehicles': [
+        ('idx_vehicles_score', 'Price, Year, Mileage, Category, FuelType, Transmission'),
+    ],
+}
+
+def active_conditions(user_conditions: Dict) -> List[Tuple[int, str, object, float]]:
+    """점수에 반영되는 조건만 [(SCORE_RULES 인덱스, 조건 키, 변환된 값, 가중치)]로 반환"""
+    active = []
+    for i, (key, weight_key, _, convert) in enumerate(SCORE_RULES):
+        value = user_conditions.get(key)
+        weight = float(user_conditions.get(weight_key, 0) or 0)
+        # calculate_score와 같이 0/빈 값은 조건 없음으로 취급 (isDisclosed만 0이 유효한 값)
+        if value in ANY_VALUES or (not value and key != 'isDisclosed') or weight == 0:
+            continue
+        active.append((i, key, convert(value), weight))
+    return active
+
+def build_score_query(user_conditions: Dict, top_n: int = 5) -> Tuple[str, Dict]:
+    """사용자 조건 → (가중치 점수로 정렬한 상위 top_n 조회 SQL, 파라미터)
+
+    1단계(ranked): 전체 매물의 점수를 계산해 상위 top_n의 vehicleId만 고름 (인덱스 + PK 조인)
+    2단계: 고른 top_n 대에 대해서만 v.* 와 점검/보험/차량번호 정보를 붙임
+    """
+    terms, params = [], {'top_n': int(top_n)}
+    for i, _, value, weight in active_conditions(user_conditions):
+        p, w = f'c{i}', f'w{i}'
+        params[p], params[w] = value, weight
+        terms.append(f"CASE WHEN {SCORE_RULES[i][2].format(p=p)} THEN %({w})s ELSE 0 END")
+    score_expr = ' + '.join(terms) or '0'
+
+    # 점수에 필요한 테이블만 조인
+    joins = []
+    if 'vi.' in score_expr:
+        joins.append("LEFT JOIN vehicles_inspect vi ON v.vehicleId = vi.vehicleId")
+    if 'vin.' in score_expr:
+        joins.append("LEFT JOIN vehicles_insurance vin ON v.vehicleId = vin.vehicleId")
+
+    sql = f"""
         SELECT
             v.*, -- vehicles 테이블의 모든 컬럼
             vi.WarrantyType, vi.Tuning, vi.ChangeUsage, vi.Recall, vi.RecallStatus, vi.AccidentHistory, vi.SimpleRepair,
             vin.vehicleNo AS insurance_vehicleNo, vin.OwnerChangeCnt, vin.MyAccidentCnt, vin.MyAccidentCost,
             vin.OtherAccidentCnt, vin.OtherAccidentCost, vin.isDisclosed,
-            vinfo.vehicleNo
-        FROM
-            vehicles v
+            vinfo.vehicleNo,
+            ranked.score
+        FROM (
+            SELECT v.vehicleId, {score_expr} AS score
+            FROM vehicles v
+            {' '.join(joins)}
+            ORDER BY score DESC, v.vehicleId
+            LIMIT %(top_n)s
+        ) ranked
+        JOIN
+            vehicles v ON v.vehicleId = ranked.vehicleId
         LEFT JOIN
             vehicles_inspect vi ON v.vehicleId = vi.vehicleId
         LEFT JOIN
             vehicles_insurance vin ON v.vehicleId = vin.vehicleId
         LEFT JOIN
             vehicles_info vinfo ON v.vehicleId = vinfo.vehicleId
-        LIMIT 1000;
+        ORDER BY ranked.score DESC, v.vehicleId;
     """
+    return sql, params
+
+def ensure_indexes(conn) -> None:
+    """INDEXES 중 없는 인덱스만 생성 (MySQL은 CREATE INDEX IF NOT EXISTS 미지원)"""
+    with conn.cursor() as cursor:
+        for table, indexes in INDEXES.items():
+            cursor.execute(
+                "SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s", (table,))
+            existing = {row[0] for row in cursor.fetchall()}
+            for name, columns in indexes:
+                if name in existing:
+                    continue
+                print(f"[DB] CREATE INDEX {name} ON {table}({columns})")
+                cursor.execute(f"CREATE INDEX {name} ON {table}({columns})")
+    conn.commit()
+
+DETAIL_SQL = """
+    SELECT
+        v.*, -- vehicles 테이블의 모든 컬럼
+        vi.WarrantyType, vi.Tuning, vi.ChangeUsage, vi.Recall, vi.RecallStatus, vi.AccidentHistory, vi.SimpleRepair,
+        vin.vehicleNo AS insurance_vehicleNo, vin.OwnerChangeCnt, vin.MyAccidentCnt, vin.MyAccidentCost,
+        vin.OtherAccidentCnt, vin.OtherAccidentCost, vin.isDisclosed,
+        vinfo.vehicleNo
+    FROM
+        vehicles v
+    LEFT JOIN
+        vehicles_inspect vi ON v.vehicleId = vi.vehicleId
+    LEFT JOIN
+        vehicles_insurance vin ON v.vehicleId = vin.vehicleId
+    LEFT JOIN
+        vehicles_info vinfo ON v.vehicleId = vinfo.vehicleId
+    WHERE v.vehicleId IN %(ids)s;
+"""
+
+def fetch_vehicles_by_ids(vehicle_ids: List[int]) -> List[Dict]:
+    """vehicleId 목록의 상세 정보 (입력 순서 유지, 없는 id는 제외)"""
+    if not vehicle_ids:
+        return []
+    conn = pymysql.connect(**DB_CONFIG)
     with conn:
         with conn.cursor(pymysql.cursors.DictCursor) as cursor:
-            cursor.execute(sql)
-            results = cursor.fetchall()
-    return results
+            cursor.execute(DETAIL_SQL, {'ids': [int(x) for x in vehicle_ids]})
+            rows = {row['vehicleId']: row for row in cursor.fetchall()}
+    return [rows[i] for i in vehicle_ids if i in rows]
 
 def calculate_score(vehicle: Dict, user_conditions: Dict) -> float:
+    """차량 한 대의 점수 (SQL 점수와 같은 규칙. 개별 차량 점수 설명/검증용)"""
     score = 0.0
     price = user_conditions.get('Price')
     weight_price = user_conditions.get('Weight_Price', 0)
@@ -88,11 +190,18 @@ def calculate_score(vehicle: Dict, user_conditions: Dict) -> float:
     return score
 
 def get_top_recommendations(user_conditions: Dict, top_n: int = 5) -> List[Dict]:
-    vehicles = fetch_vehicles_from_db()
-    scored_vehicles = []
-    for v in vehicles:
-        total_score = calculate_score(v, user_conditions)
-        v['score'] = total_score
-        scored_vehicles.append(v)
-    scored_vehicles.sort(key=lambda x: x['score'], reverse=True)
-    return scored_vehicles[:top_n]
+    """전체 매물을 DB에서 점수화해서 상위 top_n만 가져옴"""
+    sql, params = build_score_query(user_conditions, top_n)
+    conn = pymysql.connect(**DB_CONFIG)
+    with conn:
+        with conn.cursor(pymysql.cursors.DictCursor) as cursor:
+            cursor.execute(sql, params)
+            results = cursor.fetchall()
+    for v in results:
+        v['score'] = float(v['score'])  # MySQL DECIMAL → float
+    return results
+
+if __name__ == '__main__':
+    # 추천 쿼리용 인덱스 생성: python car_recommender.py
+    with pymysql.connect(**DB_CONFIG) as conn:
+        ensure_indexes(conn)
@@ -0,0 +1,196 @@
+"""
+메모리 컬럼형 차량 점수 엔진
+
+전체 매물 중 점수 계산에 필요한 컬럼만 NumPy 배열 스냅샷으로 들고 있다가
+calculate_score와 같은 가중치 조건을 벡터화된 boolean mask로 한 번에 평가하고
+argpartition으로 상위 k대만 고릅니다. (차량 dict를 한 대씩 돌지 않음)
+
+- 문자열 컬럼(차종/연료/변속기/사고이력)은 소문자 기준 범주 코드(int32, 결측 -1)로 저장
+- 숫자 컬럼 결측은 NaN → 비교 결과 False (SQL NULL과 같이 0점)
+- 스냅샷은 통째로 교체(불변) → 조회 중 리로드돼도 락 없이 일관된 결과
+- start()로 백그라운드 주기 리로드 (CATALOG_RELOAD_SECONDS, 기본 300초). 실패하면 이전 스냅샷 유지
+
+사용 예:
+    from scoring_engine import recommend
+    recommend(user_conditions, top_n=5)
+"""
+
+import os
+import sys
+import time
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pymysql
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from car_recommender import DB_CONFIG, active_conditions, fetch_vehicles_by_ids
+
+RELOAD_SECONDS = float(os.getenv('CATALOG_RELOAD_SECONDS', '300'))
+
+# 스냅샷 컬럼 (이름 = 조건 키) 과 조건별 비교 방식
+NUMERIC_COLUMNS = ['Price', 'Year', 'Mileage']
+CATEGORY_COLUMNS = ['Category', 'FuelType', 'Transmission', 'AccidentHistory']
+CONDITION_OPS = {
+    'Price': '<=', 'Year': '>=', 'Mileage': '<=',
+    'Category': 'eq', 'FuelType': 'eq', 'Transmission': 'eq', 'AccidentHistory': 'eq',
+    'isDisclosed': 'eq',
+}
+
+SNAPSHOT_SQL = """
+    SELECT v.vehicleId, v.Price, v.Year, v.Mileage, v.Category, v.FuelType, v.Transmission,
+           vi.AccidentHistory, vin.isDisclosed
+    FROM vehicles v
+    LEFT JOIN vehicles_inspect vi ON v.vehicleId = vi.vehicleId
+    LEFT JOIN vehicles_insurance vin ON v.vehicleId = vin.vehicleId
+"""
+
+def load_catalog_frame() -> pd.DataFrame:
+    """DB에서 점수용 컬럼만 읽어 DataFrame으로"""
+    conn = pymysql.connect(**DB_CONFIG)
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(SNAPSHOT_SQL)
+            columns = [d[0] for d in cursor.description]
+            rows = cursor.fetchall()
+    return pd.DataFrame(list(rows), columns=columns)
+
+
+class CatalogSnapshot:
+    """점수 계산용 컬럼 배열 묶음 (vehicleId 오름차순, 생성 후 변경하지 않음)"""
+
+    def __init__(self, frame: pd.DataFrame):
+        frame = frame.sort_values('vehicleId', kind='stable').reset_index(drop=True)
+        self.loaded_at = time.time()
+        self.vehicle_ids = frame['vehicleId'].to_numpy(dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        for col in NUMERIC_COLUMNS:
+            self.columns[col] = pd.to_numeric(frame[col], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        for col in CATEGORY_COLUMNS:
+            lowered = frame[col].where(frame[col].notna(), None).map(lambda x: None if x is None else str(x).lower())
+            codes, uniques = pd.factorize(lowered, use_na_sentinel=True)
+            self.columns[col] = codes.astype(np.int32)
+            self.vocab[col] = {value: code for code, value in enumerate(uniques)}
+        disclosed = pd.to_numeric(frame['isDisclosed'], errors='coerce')
+        self.columns['isDisclosed'] = disclosed.fillna(-1).to_numpy(dtype=np.int8)
+
+    def __len__(self) -> int:
+        return len(self.vehicle_ids)
+
+    def mask(self, key: str, value) -> Optional[np.ndarray]:
+        """조건 하나의 boolean mask (일치하는 차량이 없을 게 확실하면 None)"""
+        column, op = self.columns[key], CONDITION_OPS[key]
+        if op == '<=':
+            return column <= value
+        if op == '>=':
+            return column >= value
+        if key in self.vocab:
+            code = self.vocab[key].get(value)
+            return None if code is None else column == code
+        return column == value
+
+    def scores(self, user_conditions: Dict) -> np.ndarray:
+        score = np.zeros(len(self), dtype=np.float64)
+        for _, key, value, weight in active_conditions(user_conditions):
+            mask = self.mask(key, value)
+            if mask is not None:
+                score += mask * weight  # np.add(where=mask)보다 빠름
+        return score
+
+    def top_k(self, user_conditions: Dict, k: int = 5) -> List[Tuple[int, float]]:
+        """[(vehicleId, score)] 점수 내림차순, 동점은 vehicleId 오름차순 (SQL 경로와 같은 순서)"""
+        n = len(self)
+        k = min(int(k), n)
+        if k <= 0:
+            return []
+        score = self.scores(user_conditions)
+        if k < n:
+            part = np.argpartition(-score, k - 1)[:k]
+            threshold = score[part].min()
+            # 경계 점수의 동점은 argpartition이 임의로 고르므로 앞쪽(vehicleId 작은) 것부터 다시 채움
+            above = np.flatnonzero(score > threshold)
+            ties = np.flatnonzero(score == threshold)[:k - len(above)]
+            idx = np.concatenate([above, ties])
+        else:
+            idx = np.arange(n)
+        idx = idx[np.lexsort((idx, -score[idx]))]
+        return list(zip(self.vehicle_ids[idx].tolist(), score[idx].tolist()))
+
+
+class ScoringEngine:
+    """스냅샷 보관 + 주기 리로드"""
+
+    def __init__(self, loader: Callable[[], pd.DataFrame] = load_catalog_frame,
+                 reload_seconds: float = RELOAD_SECONDS):
+        self.loader = loader
+        self.reload_seconds = reload_seconds
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._load()
+        return self._snapshot
+
+    def _load(self) -> CatalogSnapshot:
+        started = time.perf_counter()
+        snapshot = CatalogSnapshot(self.loader())
+        self._snapshot = snapshot  # 참조 교체만 하므로 조회 중인 쪽은 이전 스냅샷을 끝까지 사용
+        print(f"[CATALOG] 스냅샷 로드 {len(snapshot):,}대 ({time.perf_counter() - started:.2f}s)")
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        with self._lock:
+            return self._load()
+
+    def _run(self):
+        while not self._stop.wait(self.reload_seconds):
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"[WARN] 스냅샷 리로드 실패, 이전 스냅샷 유지: {e}")
+
+    def start(self) -> 'ScoringEngine':
+        """백그라운드 주기 리로드 시작 (이미 돌고 있으면 무시)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='catalog-reload', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def top_k(self, user_conditions: Dict, k: int = 5) -> List[Tuple[int, float]]:
+        return self.snapshot.top_k(user_conditions, k)
+
+
+_engine: Optional[ScoringEngine] = None
+_engine_lock = threading.Lock()
+
+def get_engine() -> ScoringEngine:
+    """프로세스 공용 엔진 (처음 호출 시 생성 + 주기 리로드 시작)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = ScoringEngine().start()
+    return _engine
+
+def recommend(user_conditions: Dict, top_n: int = 5) -> List[Dict]:
+    """get_top_recommendations와 같은 결과 형식 (점수는 메모리 스냅샷 기준, 상세는 top_n대만 DB 조회)"""
+    ranked = get_engine().top_k(user_conditions, top_n)
+    scores = dict(ranked)
+    vehicles = fetch_vehicles_by_ids([vid for vid, _ in ranked])
+    for v in vehicles:
+        v['score'] = scores[v['vehicleId']]
+    return vehicles
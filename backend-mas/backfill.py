@@ -0,0 +1,206 @@
+"""
+성능점검/보험이력 백필 공용 유틸
+
+- iter_keyset_targets: 대상 ID를 keyset 페이지(WHERE id > 마지막 id ORDER BY id LIMIT n)로 스트리밍
+  전체를 fetchall 하지 않으므로 바로 수집을 시작하고 메모리도 일정함.
+  shard=(index, count)로 여러 프로세스가 ID 공간을 modulo로 겹치지 않게 나눠 가질 수 있음.
+- iter_rows_by_keys: 미리 정한 키 순서(우선순위 등)대로 대상 행을 청크 단위로 다시 조회해 스트리밍
+- iter_fetched: worker 스레드 N개가 공용 세션으로 동시에 수집하고, 결과를 크기 제한 큐로 흘려보냄
+- RateLimiter: 스레드 공용 초당 요청 수 제한
+"""
+
+import time
+import threading
+import queue
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_PAGE_SIZE = 2000
+
+
+def parse_shard(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """'1/4' → (1, 4). 비어 있으면 None (샤딩 없음)"""
+    if not value:
+        return None
+    index, count = (int(x) for x in value.split("/", 1))
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"잘못된 샤드 지정: {value} (index/count, 0 <= index < count)")
+    return index, count
+
+
+def iter_keyset_targets(
+    connect: Callable[[], Any],
+    select_sql: str,
+    key_column: str,
+    conditions: Iterable[str] = (),
+    page_size: int = DEFAULT_PAGE_SIZE,
+    start_after: int = 0,
+    limit: Optional[int] = None,
+    shard: Optional[Tuple[int, int]] = None,
+) -> Iterator[tuple]:
+    """keyset 페이지 단위로 대상 행을 내보냅니다. 행의 첫 번째 값이 key_column이어야 합니다.
+
+    select_sql은 "SELECT ... FROM ... JOIN ..." 까지이고 WHERE/ORDER BY/LIMIT은 여기서 붙입니다.
+    DB 쓰기와 섞이지 않도록 별도 커넥션을 열어 페이지마다 짧은 쿼리만 실행합니다.
+    """
+    where = list(conditions) + [f"{key_column} > %s"]
+    shard_params: List[Any] = []
+    if shard is not None:
+        where.append(f"MOD({key_column}, %s) = %s")
+        shard_params = [shard[1], shard[0]]
+    sql = f"{select_sql}\nWHERE {' AND '.join(where)}\nORDER BY {key_column}\nLIMIT %s"
+
+    db = connect()
+    cur = db.cursor()
+    last_key = start_after
+    emitted = 0
+    try:
+        while True:
+            size = page_size if limit is None else min(page_size, limit - emitted)
+            if size <= 0:
+                break
+            cur.execute(sql, [last_key] + shard_params + [size])
+            rows = cur.fetchall()
+            db.commit()  # 스냅샷을 오래 잡지 않도록 페이지마다 트랜잭션 종료
+            for row in rows:
+                yield row
+            emitted += len(rows)
+            if len(rows) < size:
+                break
+            last_key = rows[-1][0]
+    finally:
+        cur.close(); db.close()
+
+
+def iter_rows_by_keys(
+    connect: Callable[[], Any],
+    select_sql: str,
+    key_column: str,
+    keys: List[Any],
+    conditions: Iterable[str] = (),
+    chunk_size: int = DEFAULT_PAGE_SIZE,
+) -> Iterator[tuple]:
+    """keys 순서대로 대상 행을 내보냅니다. 행의 첫 번째 값이 key_column이어야 합니다.
+
+    청크마다 "key = ANY(...)"로 조회하고 keys 순서로 다시 정렬합니다.
+    그사이 conditions에서 빠진 행(다른 프로세스가 이미 처리 등)은 건너뜁니다.
+    """
+    sql = f"{select_sql}\nWHERE {' AND '.join(list(conditions) + [f'{key_column} = ANY(%s)'])}"
+    db = connect()
+    cur = db.cursor()
+    try:
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            cur.execute(sql, [list(chunk)])
+            by_key = {row[0]: row for row in cur.fetchall()}
+            db.commit()
+            for key in chunk:
+                row = by_key.get(key)
+                if row is not None:
+                    yield row
+    finally:
+        cur.close(); db.close()
+
+
+class RateLimiter:
+    """스레드 공용 요청 속도 제한 (초당 max_rps회, 요청 간 최소 간격 방식)"""
+    def __init__(self, max_rps: Optional[float]):
+        self.interval = 1.0 / max_rps if max_rps else 0.0
+        self._lock = threading.Lock()
+        self._next_at = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+
+_DONE = object()
+
+
+def iter_fetched(fetch: Callable[[Any], Any], items: Iterable[Any], workers: int = 1,
+                 max_rps: Optional[float] = None, queue_size: int = 1000) -> Iterator[Tuple[Any, Any]]:
+    """(item, fetch(item))를 수집되는 대로 내보냅니다.
+
+    workers > 1이면 worker 스레드들이 동시에 fetch를 호출하고, 결과는 크기가 제한된 큐를 통해
+    호출 측(DB 쓰기)으로 흘러갑니다. 큐가 차면 수집이 멈추므로 DB 쓰기가 느려도 메모리가 늘지 않습니다.
+    fetch에서 난 예외(토큰 오류 등)나 대상 조회 예외는 전체 중단 후 그대로 올립니다.
+    """
+    limiter = RateLimiter(max_rps)
+    if workers <= 1:
+        for item in items:
+            limiter.wait()
+            yield item, fetch(item)
+        return
+
+    item_q: "queue.Queue" = queue.Queue(maxsize=workers * 2)
+    result_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put_item(item) -> bool:
+        # 중단되면 더 넣지 않음 (worker가 모두 빠져나간 뒤 put에서 영원히 막히는 것 방지)
+        while not stop.is_set():
+            try:
+                item_q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feeder():
+        try:
+            for item in items:
+                if not put_item(item):
+                    break
+        except Exception as e:  # 대상 조회 실패도 호출 측으로 전달
+            stop.set()
+            result_q.put(e)
+        finally:
+            for _ in range(workers):
+                put_item(_DONE)
+
+    def worker():
+        try:
+            while True:
+                item = item_q.get()
+                if item is _DONE or stop.is_set():
+                    break
+                limiter.wait()
+                result_q.put((item, fetch(item)))
+        except Exception as e:
+            stop.set()
+            result_q.put(e)
+        finally:
+            result_q.put(_DONE)
+
+    threads = [threading.Thread(target=feeder, daemon=True)]
+    threads += [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for t in threads:
+        t.start()
+
+    finished = 0
+    try:
+        while finished < workers:
+            result = result_q.get()
+            if result is _DONE:
+                finished += 1
+            elif isinstance(result, Exception):
+                raise result
+            else:
+                yield result
+    finally:
+        stop.set()
+        # 중단 시 worker가 put에서 막히지 않도록 남은 결과를 비움
+        while any(t.is_alive() for t in threads):
+            try:
+                result_q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+            try:
+                item_q.put_nowait(_DONE)
+            except queue.Full:
+                pass
@@ -0,0 +1,61 @@
+"""
+은행별 금리 추출기 fixture 체크
+
+fixtures/loan_rates/<bank>_list.html, <bank>_product.html을 각 추출기로 파싱해서
+<bank>_expected.json과 다르면 실패(exit 1)합니다. 네트워크/DB 없이 돌아가므로
+은행 페이지 구조가 바뀌어 추출기를 고칠 때마다 실행하세요.
+(fixture가 없는 추출기는 실패로 처리 → 새 은행을 추가하면 fixture도 같이 넣어야 함)
+
+사용법:
+    python check_loan_extractors.py          # 등록된 전체 은행
+    python check_loan_extractors.py KB
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from typing import List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from loan_extractors import EXTRACTORS, BankExtractor
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures" / "loan_rates"
+
+
+def check(extractor: BankExtractor) -> List[str]:
+    """불일치 내용 목록 (비어 있으면 통과)"""
+    prefix = FIXTURE_DIR / extractor.bank_code.lower()
+    paths = {name: Path(f"{prefix}_{name}") for name in ("list.html", "product.html", "expected.json")}
+    missing = [str(p) for p in paths.values() if not p.exists()]
+    if missing:
+        return [f"fixture 없음: {', '.join(missing)}"]
+
+    expected = json.loads(paths["expected.json"].read_text(encoding="utf-8"))
+    list_html = paths["list.html"].read_text(encoding="utf-8")
+    product_html = paths["product.html"].read_text(encoding="utf-8")
+
+    errors = []
+    products = extractor.parse_product_list(list_html)
+    if products != expected["products"]:
+        errors.append(f"상품 목록 불일치\n    expected={expected['products']}\n    actual  ={products}")
+    rates = extractor.parse_product_rates(product_html)
+    if rates != expected["rates"]:
+        errors.append(f"금리 불일치\n    expected={expected['rates']}\n    actual  ={rates}")
+    return errors
+
+
+def main(bank_codes: List[str]) -> int:
+    failed = 0
+    for code in bank_codes or list(EXTRACTORS):
+        errors = check(EXTRACTORS[code])
+        print(f"[{'FAIL' if errors else 'OK'}] {code}")
+        for error in errors:
+            print(f"  - {error}")
+        failed += bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
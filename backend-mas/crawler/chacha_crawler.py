@@ -11,8 +11,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from db.connection import session_scope
 from db.model import (
     Vehicle, OptionMaster, VehicleOption,
-    create_tables_if_not_exist, check_database_status
+    create_tables_if_not_exist, check_database_status, refresh_platform_stats
 )
+from db.partitions import maintain_platform_partition
+from db.sweeper import sweep_delisted
 
 # 옵션 매핑
 from crawler.option_mapping import (
@@ -235,8 +237,8 @@ def get_car_info_via_api(car_seqs: List[str], session: Optional[requests.Session
 # 3. 페이지 크롤링 (carSeq 수집)
 # =============================================================================
 
-def get_car_seqs_from_page(page_num: int, maker_code: str = None, class_code: str = None, session: Optional[requests.Session] = None) -> List[str]:
-    """페이지에서 carSeq들을 추출합니다."""
+def get_car_seqs_from_page(page_num: int, maker_code: str = None, class_code: str = None, session: Optional[requests.Session] = None) -> Optional[List[str]]:
+    """페이지에서 carSeq들을 추출합니다. 요청 실패면 None (빈 목록은 목록 끝)"""
     s = session or build_session()
     
     url = f"https://www.kbchachacha.com/public/search/list.empty?page={page_num}&sort=-orderDate"
@@ -284,12 +286,17 @@ def get_car_seqs_from_page(page_num: int, maker_code: str = None, class_code: st
             
             return list(set(page_car_seqs))
         else:
-            return []
+            print(f"  [목록 조회 실패] 페이지 {page_num}: HTTP {res.status_code}")
+            return None
     except Exception as e:
-        return []
+        print(f"  [목록 조회 오류] 페이지 {page_num}: {e}")
+        return None
 
-def crawl_car_seqs(maker_code: str = None, maker_name: str = None, class_code: str = None, class_name: str = None, max_pages: int = 250, session: Optional[requests.Session] = None) -> List[str]:
-    """통합 크롤링 함수"""
+def crawl_car_seqs(maker_code: str = None, maker_name: str = None, class_code: str = None, class_name: str = None, max_pages: int = 250, session: Optional[requests.Session] = None, seen_seqs: Optional[set] = None, incomplete: Optional[set] = None) -> List[str]:
+    """통합 크롤링 함수 (seen_seqs가 주어지면 목록에 보인 carSeq를 신규 여부와 관계없이 모두 기록)
+
+    목록 조회 오류나 페이지 상한(max_pages)으로 끝까지 못 보면 incomplete에 구간 이름을 기록합니다. (sweeper용)
+    """
     existing_seqs = get_existing_car_seqs()
     s = session or build_session()
     all_car_seqs = []
@@ -307,10 +314,17 @@ def crawl_car_seqs(maker_code: str = None, maker_name: str = None, class_code: s
     for page in range(1, max_pages + 1):
         page_car_seqs = get_car_seqs_from_page(page, maker_code, class_code, s)
         
+        if page_car_seqs is None:
+            print(f"  [{display_name}] 페이지 {page} 조회 실패 - 미완료로 기록")
+            if incomplete is not None:
+                incomplete.add(display_name)
+            break
         if not page_car_seqs:
             print(f"  [{display_name}] 페이지 {page}에서 데이터 없음 - 크롤링 완료")
             break
             
+        if seen_seqs is not None:
+            seen_seqs.update(page_car_seqs)
         new_seqs = [seq for seq in page_car_seqs if seq not in existing_seqs]
         all_car_seqs.extend(new_seqs)
         
@@ -318,6 +332,12 @@ def crawl_car_seqs(maker_code: str = None, maker_name: str = None, class_code: s
             print(f"  [{display_name}] 페이지 {page}: 총 {len(all_car_seqs)}개 수집")
         
         time.sleep(0.2)
+    else:
+        # 마지막 페이지가 꽉 차 있었으면(페이지당 40대) 상한에 걸려 뒤쪽을 못 봤을 수 있음
+        if len(page_car_seqs) >= 40:
+            print(f"  [{display_name}] 페이지 상한({max_pages}) 도달 - 미완료로 기록")
+            if incomplete is not None:
+                incomplete.add(display_name)
     
     return list(set(all_car_seqs))
 
@@ -526,9 +546,12 @@ def save_vehicle_options_batch(vehicles_options: List[Dict], platform: str = 'kb
             # 1. 모든 옵션 마스터를 한 번에 조회 (N+1 쿼리 문제 해결)
             option_masters = {opt.option_code: opt.option_id for opt in session.query(OptionMaster).all()}
             
-            # 2. 기존 VehicleOption들을 한 번에 조회
+            # 2. 이번 배치 차량의 기존 VehicleOption만 조회 (전체 테이블 프리로드 방지)
+            batch_vehicle_ids = [vd['vehicle_id'] for vd in vehicles_options if vd.get('vehicle_id')]
             existing_pairs = set()
-            for vo in session.query(VehicleOption.vehicle_id, VehicleOption.option_id).all():
+            for vo in session.query(VehicleOption.vehicle_id, VehicleOption.option_id).filter(
+                VehicleOption.vehicle_id.in_(batch_vehicle_ids)
+            ).all():
                 existing_pairs.add((vo.vehicle_id, vo.option_id))
             
             # 3. 벌크 인서트용 데이터 준비
@@ -679,7 +702,10 @@ def save_car_info_batch(batch_records: List[Dict[str, Any]], existing_vehiclenos
         
         # 3. 저장된 차량들의 ID 조회
         carseqs = [v['carseq'] for v in vehicle_bulk_data]
-        saved_vehicles = session.query(Vehicle).filter(Vehicle.carseq.in_(carseqs)).all()
+        saved_vehicles = session.query(Vehicle).filter(
+            Vehicle.platform == 'kb_chachacha',
+            Vehicle.carseq.in_(carseqs)
+        ).all()
         vehicle_id_map = {v.carseq: v.vehicleid for v in saved_vehicles}
         
         # 4. has_options 플래그 업데이트
@@ -701,11 +727,13 @@ def save_car_info_batch(batch_records: List[Dict[str, Any]], existing_vehiclenos
         # has_options 플래그 일괄 업데이트
         if vehicles_with_options:
             session.query(Vehicle).filter(
+                Vehicle.platform == 'kb_chachacha',
                 Vehicle.vehicleid.in_(vehicles_with_options)
             ).update({Vehicle.has_options: True}, synchronize_session=False)
         
         if vehicles_without_options:
             session.query(Vehicle).filter(
+                Vehicle.platform == 'kb_chachacha',
                 Vehicle.vehicleid.in_(vehicles_without_options)
             ).update({Vehicle.has_options: False}, synchronize_session=False)
         
@@ -845,12 +873,14 @@ def crawl_options_batch(vehicles: List[Vehicle], requests_session: requests.Sess
         # 옵션이 있는 차량들
         if vehicles_with_options:
             session.query(Vehicle).filter(
+                Vehicle.platform == 'kb_chachacha',
                 Vehicle.vehicleid.in_(vehicles_with_options)
             ).update({Vehicle.has_options: True}, synchronize_session=False)
         
         # 옵션이 없는 차량들
         if vehicles_without_options:
             session.query(Vehicle).filter(
+                Vehicle.platform == 'kb_chachacha',
                 Vehicle.vehicleid.in_(vehicles_without_options)
             ).update({Vehicle.has_options: False}, synchronize_session=False)
         
@@ -863,8 +893,8 @@ def crawl_options_batch(vehicles: List[Vehicle], requests_session: requests.Sess
 # 8. 메인 크롤링 전략 (제조사별, 클래스별)
 # =============================================================================
 
-def crawl_kb_chachacha():
-    """스마트 크롤링 전략"""
+def crawl_kb_chachacha(seen_seqs: Optional[set] = None, incomplete: Optional[set] = None):
+    """스마트 크롤링 전략 (incomplete: 끝까지 수집하지 못한 제조사/클래스 이름을 기록)"""
     total_processed = 0
     session = build_session()
     
@@ -874,6 +904,8 @@ def crawl_kb_chachacha():
     
     print("[제조사별 정보 수집 중...]")
     makers = get_maker_info(session)
+    if not makers and incomplete is not None:
+        incomplete.add("제조사 목록")
     
     for maker in makers:
         maker_code = maker["makerCode"]
@@ -886,6 +918,8 @@ def crawl_kb_chachacha():
             print(f"[{maker_name}] 10,000대 초과 - 클래스별 세분화 크롤링")
             
             classes = get_classes_for_maker(maker_code, session)
+            if not classes and incomplete is not None:
+                incomplete.add(maker_name)
             
             for class_info in classes:
                 class_code = class_info["classCode"]
@@ -898,7 +932,7 @@ def crawl_kb_chachacha():
                 if pages_needed > 250:
                     print(f"    경고: {class_name}은 250페이지 초과! 차량명별 세분화 필요")
                 
-                car_seqs = crawl_car_seqs(maker_code, maker_name, class_code, class_name, session=session)
+                car_seqs = crawl_car_seqs(maker_code, maker_name, class_code, class_name, session=session, seen_seqs=seen_seqs, incomplete=incomplete)
                 
                 if car_seqs:
                     print(f"    [{class_name}] carSeq 수집 완료: {len(car_seqs)}개")
@@ -918,7 +952,7 @@ def crawl_kb_chachacha():
         else:
             print(f"[{maker_name}] 10,000대 이하 - 제조사별 크롤링")
             
-            car_seqs = crawl_car_seqs(maker_code, maker_name, session=session)
+            car_seqs = crawl_car_seqs(maker_code, maker_name, session=session, seen_seqs=seen_seqs, incomplete=incomplete)
             
             if car_seqs:
                 print(f"  [{maker_name}] carSeq 수집 완료: {len(car_seqs)}개")
@@ -1026,13 +1060,21 @@ def crawl_kb_chachacha_with_options():
     
     # 5. 통합 크롤링 실행 (새로운 차량들)
     print("[통합 크롤링 시작]")
-    total_processed = crawl_kb_chachacha()
+    seen_seqs, incomplete = set(), set()
+    total_processed = crawl_kb_chachacha(seen_seqs=seen_seqs, incomplete=incomplete)
     
     if total_processed > 0:
         print(f"[전체 크롤링 성공] 총 {total_processed:,}건 처리 완료")
     else:
         print("[크롤링 완료] 새로운 차량이 없습니다.")
 
+    # 6. 목록에서 사라진 매물 비활성 처리 / 오래된 비활성 매물 아카이브
+    sweep_delisted('kb_chachacha', seen_seqs, incomplete_segments=incomplete)
+
+    # 7. 이번에 적재한 파티션만 통계 갱신 + 플랫폼별 요약 통계 갱신
+    maintain_platform_partition('kb_chachacha')
+    refresh_platform_stats()
+
 # =============================================================================
 # 메인 실행
 # =============================================================================
@@ -10,7 +10,9 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from db.connection import session_scope
-from db.model import Vehicle, OptionMaster, VehicleOption, create_tables_if_not_exist, check_database_status
+from db.model import Vehicle, OptionMaster, VehicleOption, create_tables_if_not_exist, check_database_status, refresh_platform_stats
+from db.partitions import maintain_platform_partition
+from db.sweeper import sweep_delisted
 from crawler.option_mapping import initialize_global_options, convert_platform_options_to_global
 
 # =============================================================================
@@ -67,11 +69,12 @@ def get_encar_api_data(url: str, session: requests.Session, params: Optional[Dic
             print(f"[API 호출 오류] URL: {url}, 오류: {e}")
         return None
 
-def get_car_list(session: requests.Session, q_filter: str, page: int, page_size: int) -> List[Dict]:
+def get_car_list(session: requests.Session, q_filter: str, page: int, page_size: int) -> Optional[List[Dict]]:
+    """목록 한 페이지. 조회 오류면 None (빈 목록은 목록 끝)"""
     start = page * page_size
     params = {"q": q_filter, "sr": f"|ModifiedDate|{start}|{page_size}"}
     data = get_encar_api_data(BASE_URL, session, params=params)
-    return data.get("SearchResults", []) if data else []
+    return data.get("SearchResults", []) if data else None
 
 def fetch_vehicle_details(list_car_id: str, session: requests.Session) -> Optional[Dict]:
     """차량의 모든 상세 정보를 가져옵니다."""
@@ -251,7 +254,7 @@ def save_data_to_db(records: List[Dict]):
             vehicle_mappings = [{k: v for k, v in rec.items() if k != 'options'} for rec in records]
             session.bulk_insert_mappings(Vehicle, vehicle_mappings)
             
-            vehicle_map = {v.carseq: v.vehicleid for v in session.query(Vehicle.vehicleid, Vehicle.carseq).filter(Vehicle.carseq.in_([rec['CarSeq'] for rec in records]))}
+            vehicle_map = {v.carseq: v.vehicleid for v in session.query(Vehicle.vehicleid, Vehicle.carseq).filter(Vehicle.platform == 'encar', Vehicle.carseq.in_([rec['CarSeq'] for rec in records]))}
             all_option_codes = {code for rec in records for code in rec.get('options', [])}
             option_master_map = {opt.option_code: opt.option_id for opt in session.query(OptionMaster).filter(OptionMaster.option_code.in_(all_option_codes))}
 
@@ -279,19 +282,29 @@ def save_data_to_db(records: List[Dict]):
 # 크롤링 로직
 #==============================================================================
 def crawl_encar_modelgroup(brand: str, modelgroup: str, session: requests.Session, existing_data: Dict[str, set], max_pages: int = 1000, page_size: int = 50):
-    """특정 모델그룹 크롤링 (선-필터링 및 병렬 처리, 최종 중복 제거 적용)"""
+    """특정 모델그룹 크롤링 (선-필터링 및 병렬 처리, 최종 중복 제거 적용)
+
+    목록 조회 오류나 페이지 상한으로 끝까지 못 본 경우 existing_data['incomplete']에 모델그룹을 기록합니다. (sweeper용)
+    """
     print(f"\n[모델그룹 크롤링 시작] {brand} {modelgroup}")
     
     total_processed_for_modelgroup = 0
+    car_list = None
     
     for page in range(max_pages):
         q_filter = f"(And.Hidden.N._.(C.CarType.Y._.(C.Manufacturer.{brand}._.ModelGroup.{modelgroup}.)))"
         car_list = get_car_list(session, q_filter, page, page_size)
         
+        if car_list is None:
+            print(f"  [{brand} {modelgroup} - 페이지 {page + 1}] 목록 조회 실패. 이 모델그룹은 미완료로 기록.")
+            existing_data['incomplete'].add(f"{brand}/{modelgroup}")
+            break
         if not car_list:
             print(f"  [{brand} {modelgroup} - 페이지 {page + 1}] 데이터 없음. 완료.")
             break
         
+        # 매물 정리(sweeper)용: 목록에 보인 ID는 신규/기존 여부와 관계없이 모두 기록
+        existing_data['seen_ids'].update(str(car["Id"]) for car in car_list if car.get("Id"))
         new_cars_to_process = [car for car in car_list if car.get("Id") and str(car["Id"]) not in existing_data['list_ids']]
         
         skipped_count = len(car_list) - len(new_cars_to_process)
@@ -323,9 +336,17 @@ def crawl_encar_modelgroup(brand: str, modelgroup: str, session: requests.Sessio
         for record in processed_records:
             car_seq = record['CarSeq']
             vehicle_no = record['VehicleNo']
+            # 목록 Id와 상세 vehicleId(CarSeq)가 다를 수 있으므로, 이미 DB에 있어 건너뛰는 매물도 CarSeq를 기록 (sweeper 기준 ID)
+            existing_data['seen_ids'].add(car_seq)
             
             # DB에 이미 있는 데이터인지 최종 확인
-            if car_seq in existing_data['car_seqs'] or (vehicle_no and vehicle_no in existing_data['vehicle_nos']):
+            if car_seq in existing_data['car_seqs']:
+                continue
+            if vehicle_no and vehicle_no in existing_data['vehicle_nos']:
+                # 같은 차량이 새 CarSeq로 재등록된 경우: 기존 행의 carseq를 본 것으로 기록해야 sweeper가 내리지 않음
+                known_seq = existing_data['vehicle_no_carseqs'].get(vehicle_no)
+                if known_seq:
+                    existing_data['seen_ids'].add(known_seq)
                 continue
 
             # 현재 처리중인 배치 내에서 중복인지 확인 (차량번호 기준)
@@ -350,8 +371,14 @@ def crawl_encar_modelgroup(brand: str, modelgroup: str, session: requests.Sessio
                 existing_data['car_seqs'].add(rec['CarSeq'])
                 if rec['VehicleNo']:
                     existing_data['vehicle_nos'].add(rec['VehicleNo'])
+                    existing_data['vehicle_no_carseqs'][rec['VehicleNo']] = rec['CarSeq']
         
         _sleep_with_jitter(1.0, 0.5)
+    else:
+        # 마지막 페이지까지 꽉 차 있었으면 상한에 걸려 뒤쪽을 못 봤을 수 있음
+        if car_list and len(car_list) >= page_size:
+            print(f"  [{brand} {modelgroup}] 페이지 상한({max_pages}) 도달. 이 모델그룹은 미완료로 기록.")
+            existing_data['incomplete'].add(f"{brand}/{modelgroup}")
         
     return total_processed_for_modelgroup
 
@@ -372,9 +399,12 @@ def crawl_encar_with_options(max_pages_per_modelgroup: int = 1000, page_size: in
         # DB의 carseq를 문자열(str)로 조회해야 api에서 주는 데이터가 str이라 중복체크할때 문제 없음
         existing_car_seqs = {str(r[0]) for r in db_session.query(Vehicle.carseq).filter(Vehicle.platform == 'encar').all() if r[0]}
         existing_vehicle_nos = {r[0] for r in db_session.query(Vehicle.vehicleno).filter(Vehicle.vehicleno.isnot(None)).all()}
+        # 차량번호 → 기존 엔카 carseq (재등록 매물을 건너뛸 때 기존 행을 본 것으로 기록하기 위함)
+        vehicle_no_carseqs = {r[0]: str(r[1]) for r in db_session.query(Vehicle.vehicleno, Vehicle.carseq).filter(Vehicle.platform == 'encar', Vehicle.vehicleno.isnot(None)).all()}
     
     #  목록 ID(list_ids)도 중복 체크 대상에 포함/ list_ids는 같은 차량이 다른 광고 id로 올라와서 추적해야 할때 사용
-    existing_data = {'car_seqs': existing_car_seqs, 'vehicle_nos': existing_vehicle_nos, 'list_ids': set(existing_car_seqs)}
+    existing_data = {'car_seqs': existing_car_seqs, 'vehicle_nos': existing_vehicle_nos, 'vehicle_no_carseqs': vehicle_no_carseqs,
+                     'list_ids': set(existing_car_seqs), 'seen_ids': set(), 'incomplete': set()}
     print(f"[DB 확인] 기존 엔카 차량 {len(existing_data['car_seqs']):,}대, 차량번호 {len(existing_data['vehicle_nos']):,}대")
     
     major_brands = get_encar_brands(session)
@@ -386,18 +416,27 @@ def crawl_encar_with_options(max_pages_per_modelgroup: int = 1000, page_size: in
         print(f"\n{'='*50}\n[브랜드 처리 시작] {brand}")
         modelgroups = get_encar_modelgroups_by_brand(brand, session)
         if not modelgroups:
+            # 브랜드 목록은 매물이 있는 브랜드만이므로 모델그룹이 없으면 조회/파싱 실패
             print(f"  [{brand}] 모델그룹 없음. 건너뜁니다.")
+            existing_data['incomplete'].add(brand)
             continue
             
         for modelgroup in modelgroups:
             modelgroup_count_data = get_encar_api_data(BASE_URL, session, params={"count": "true", "q": f"(And.Hidden.N._.(C.CarType.Y._.(C.Manufacturer.{brand}._.ModelGroup.{modelgroup}.)))"})
-            modelgroup_count = modelgroup_count_data.get("Count", 0) if modelgroup_count_data else 0
+            if modelgroup_count_data is None:
+                print(f"  [{brand} {modelgroup}] 매물 수 조회 실패. 건너뜁니다.")
+                existing_data['incomplete'].add(f"{brand}/{modelgroup}")
+                continue
+            modelgroup_count = modelgroup_count_data.get("Count", 0)
             
             if modelgroup_count > 0:
                 required_pages = (modelgroup_count + page_size - 1) // page_size
                 crawl_encar_modelgroup(brand, modelgroup, session, existing_data, required_pages, page_size)
 
     print(f"\n[엔카 크롤링 최종 완료] 현재 DB의 엔카 차량: {len(existing_data['car_seqs']):,}대")
+    sweep_delisted('encar', existing_data['seen_ids'], incomplete_segments=existing_data['incomplete'])
+    maintain_platform_partition('encar')
+    refresh_platform_stats()
 
 # =============================================================================
 # 메인 실행
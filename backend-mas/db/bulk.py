@@ -0,0 +1,103 @@
+"""
+대량 UPSERT 헬퍼 (PostgreSQL)
+
+- 기본: 다중 행 INSERT ... VALUES (...), (...), ... ON CONFLICT 한 문장으로 chunk_size행씩 저장
+- copy_threshold 이상이면 COPY로 임시 테이블에 적재 후 INSERT ... SELECT ... ON CONFLICT 한 번
+
+같은 배치 안에 충돌 키가 중복되면 ON CONFLICT DO UPDATE가 실패하므로 마지막 값만 남깁니다.
+커밋은 호출 측 트랜잭션(Engine.begin() 등)에 맡깁니다.
+"""
+
+import io
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+DEFAULT_CHUNK_SIZE = 1000
+COPY_THRESHOLD = 5000
+
+
+def _dedupe(rows: List[Dict[str, Any]], conflict_columns: Sequence[str]) -> List[Dict[str, Any]]:
+    latest = {}
+    for row in rows:
+        latest[tuple(row[c] for c in conflict_columns)] = row
+    return list(latest.values())
+
+
+def _csv_field(value: Any) -> str:
+    """COPY (FORMAT csv)용 값: NULL은 따옴표 없는 빈 값, 문자열은 항상 따옴표 (빈 문자열과 NULL 구분)"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _values_upsert(conn, table: Table, rows: List[Dict[str, Any]], conflict_columns: Sequence[str],
+                   update_columns: Sequence[str], chunk_size: int):
+    for i in range(0, len(rows), chunk_size):
+        stmt = pg_insert(table).values(rows[i:i + chunk_size])
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={c: stmt.excluded[c] for c in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        conn.execute(stmt)
+
+
+def _copy_upsert(conn, table: Table, rows: List[Dict[str, Any]], columns: Sequence[str],
+                 conflict_columns: Sequence[str], update_columns: Sequence[str]):
+    temp = f"tmp_bulk_{table.name}"
+    column_list = ", ".join(columns)
+    conn.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {temp} (LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+    ))
+
+    buf = io.StringIO()
+    for row in rows:
+        buf.write(",".join(_csv_field(row.get(c)) for c in columns))
+        buf.write("\n")
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {temp} ({column_list}) FROM STDIN WITH (FORMAT csv)", buf)
+    finally:
+        cursor.close()
+
+    if update_columns:
+        on_conflict = "DO UPDATE SET " + ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+    else:
+        on_conflict = "DO NOTHING"
+    conn.execute(text(
+        f"INSERT INTO {table.name} ({column_list}) SELECT {column_list} FROM {temp} "
+        f"ON CONFLICT ({', '.join(conflict_columns)}) {on_conflict}"
+    ))
+    conn.execute(text(f"TRUNCATE {temp}"))
+
+
+def upsert_rows(conn, table: Table, rows: List[Dict[str, Any]], conflict_columns: Optional[Sequence[str]] = None,
+                update_columns: Optional[Sequence[str]] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                copy_threshold: Optional[int] = COPY_THRESHOLD) -> int:
+    """rows(dict 목록)를 table에 UPSERT 합니다. 저장한 행 수를 반환합니다.
+
+    conflict_columns 기본값은 PK, update_columns 기본값은 나머지 전체 컬럼입니다.
+    update_columns=()이면 충돌 시 아무것도 하지 않습니다(DO NOTHING).
+    """
+    if not rows:
+        return 0
+    conflict_columns = list(conflict_columns or [c.name for c in table.primary_key.columns])
+    columns = [c.name for c in table.columns if c.name in rows[0]]
+    if update_columns is None:
+        update_columns = [c for c in columns if c not in conflict_columns]
+
+    rows = _dedupe(rows, conflict_columns)
+    if copy_threshold is not None and len(rows) >= copy_threshold:
+        _copy_upsert(conn, table, rows, columns, conflict_columns, update_columns)
+    else:
+        _values_upsert(conn, table, rows, conflict_columns, update_columns, chunk_size)
+    return len(rows)
@@ -0,0 +1,154 @@
+"""
+핫 쿼리 실행계획 회귀 체크
+
+로컬 PostgreSQL에 임시 스키마를 만들어 합성 데이터를 시딩한 뒤,
+크롤러/MCP에서 자주 실행되는 쿼리의 EXPLAIN 결과에 vehicles 테이블
+Seq Scan이 남아 있으면 실패(exit 1)합니다.
+
+enable_seqscan=off 상태로 계획을 세우므로 시딩 규모나 통계와 무관하게
+"이 쿼리를 받쳐줄 인덱스가 있는가"만 판정합니다. (인덱스가 없으면
+planner는 비용이 커도 Seq Scan을 선택할 수밖에 없음)
+
+사용법:
+    python db/check_query_plans.py            # 기본 20만 건 시딩
+    python db/check_query_plans.py 50000
+"""
+
+import os
+import sys
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import Engine
+from db.model import Base
+
+SCHEMA = "query_plan_check"
+DEFAULT_SEED_ROWS = 200_000
+
+SEED_SQL = """
+INSERT INTO vehicles (carseq, vehicleno, platform, origin, cartype, manufacturer, model,
+                      modelyear, distance, price, has_options)
+SELECT g,
+       'QPC' || g,
+       CASE WHEN g % 2 = 0 THEN 'encar' ELSE 'kb_chachacha' END,
+       '국산',
+       (ARRAY['SUV', '준중형', '중형', '대형', '경차', '화물'])[1 + g % 6],
+       (ARRAY['현대', '기아', '제네시스', 'BMW', '벤츠', '쉐보레'])[1 + g % 6],
+       'MODEL-' || (g % 300),
+       2005 + g % 20,
+       (g * 7919) % 300000,
+       300 + (g * 104729) % 20000,
+       CASE WHEN g % 50 = 0 THEN NULL ELSE (g % 3 = 0) END
+FROM generate_series(1, :n) AS g
+"""
+
+# 이름 → (SQL, 파라미터). database_query.py / 크롤러의 실제 쿼리 형태와 맞춰 유지할 것
+HOT_QUERIES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "encar_carseq_preload": (
+        "SELECT carseq FROM vehicles WHERE platform = :platform",
+        {"platform": "encar"},
+    ),
+    "carseq_lookup_after_insert": (
+        "SELECT vehicleid, carseq FROM vehicles WHERE platform = :platform AND carseq IN (10, 20, 30, 40)",
+        {"platform": "encar"},
+    ),
+    "check_vehicles_without_options": (
+        "SELECT count(*) FROM vehicles WHERE platform = :platform AND has_options IS NULL",
+        {"platform": "kb_chachacha"},
+    ),
+    "vehicles_without_options_batch": (
+        "SELECT vehicleid, carseq FROM vehicles WHERE platform = :platform AND has_options IS NULL",
+        {"platform": "kb_chachacha"},
+    ),
+    "mcp_search_vehicles": (
+        """
+        SELECT vehicleid, manufacturer, model, modelyear, price, distance,
+               fueltype, cartype, location, detailurl, photo
+        FROM vehicles
+        WHERE price BETWEEN :min_price AND :max_price
+        AND is_active
+        AND distance <= :max_mileage
+        AND modelyear >= :min_year
+        AND cartype NOT LIKE '%화물%'
+        AND cartype NOT LIKE '%버스%'
+        AND cartype NOT LIKE '%특수%'
+        ORDER BY price ASC, distance ASC
+        LIMIT :limit
+        """,
+        {"min_price": 1000, "max_price": 3000, "max_mileage": 100000, "min_year": 2018, "limit": 50},
+    ),
+    "mcp_similar_vehicles": (
+        """
+        SELECT vehicleid, price, distance
+        FROM vehicles
+        WHERE manufacturer = :manufacturer
+        AND modelyear BETWEEN :year_from AND :year_to
+        AND price BETWEEN :price_from AND :price_to
+        AND vehicleid != :vehicleid
+        AND is_active
+        ORDER BY ABS(price - :price) ASC, distance ASC
+        LIMIT 10
+        """,
+        {"manufacturer": "현대", "year_from": 2018, "year_to": 2022,
+         "price_from": 2400, "price_to": 3600, "vehicleid": 1, "price": 3000},
+    ),
+}
+
+
+def _seq_scans(plan: Dict[str, Any], table: str = "vehicles") -> List[str]:
+    """실행계획 트리에서 대상 테이블(파티션 포함)의 Seq Scan 노드를 찾습니다."""
+    found = []
+    relation = plan.get("Relation Name") or ""
+    if plan.get("Node Type") == "Seq Scan" and (relation == table or relation.startswith(f"{table}_")):
+        found.append(plan.get("Filter", ""))
+    for child in plan.get("Plans", []):
+        found.extend(_seq_scans(child, table))
+    return found
+
+
+def _index_names(plan: Dict[str, Any]) -> List[str]:
+    names = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", []):
+        names.extend(_index_names(child))
+    return names
+
+
+def run_check(seed_rows: int = DEFAULT_SEED_ROWS) -> bool:
+    """임시 스키마에 시딩 후 핫 쿼리 실행계획을 검사합니다. 모두 통과하면 True."""
+    with Engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}"))
+        try:
+            Base.metadata.create_all(conn)
+            conn.execute(text(SEED_SQL), {"n": seed_rows})
+            conn.execute(text("VACUUM ANALYZE vehicles"))
+            print(f"[실행계획 체크] {seed_rows:,}건 시딩 완료 (schema={SCHEMA})")
+
+            conn.execute(text("SET enable_seqscan = off"))
+            failures = []
+            for name, (sql, params) in HOT_QUERIES.items():
+                plan = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), params).scalar()[0]["Plan"]
+                seq = _seq_scans(plan)
+                if seq:
+                    failures.append(name)
+                    print(f"  [FAIL] {name}: vehicles Seq Scan (filter: {seq[0] or '-'})")
+                else:
+                    print(f"  [OK]   {name}: {', '.join(_index_names(plan)) or plan.get('Node Type')}")
+        finally:
+            conn.execute(text("RESET enable_seqscan"))
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    if failures:
+        print(f"[실행계획 체크 실패] {len(failures)}개 쿼리가 Seq Scan으로 떨어짐: {', '.join(failures)}")
+        return False
+    print(f"[실행계획 체크 통과] {len(HOT_QUERIES)}개 쿼리 모두 인덱스 사용")
+    return True
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_SEED_ROWS
+    sys.exit(0 if run_check(rows) else 1)
@@ -0,0 +1,273 @@
+"""
+차량 카탈로그 컬럼형 스냅샷 내보내기 (Parquet / Arrow IPC)
+
+vehicles + 성능점검(vehicles_inspect) + 보험이력(vehicles_insurance) + 옵션 코드 목록을
+플랫폼 파티션별로 서버 사이드 커서로 스트리밍해서 파일로 씁니다.
+추천/학습 코드는 OLTP DB를 행 단위로 긁는 대신 스냅샷을 memory-map으로 읽으면 됩니다.
+
+출력 구조 (hive 파티셔닝, platform/snapshot_date 컬럼은 경로에만 들어감):
+    {out_dir}/snapshot_date=2025-01-31/platform=encar/part-000.parquet
+    {out_dir}/snapshot_date=2025-01-31/platform=kb_chachacha/part-000.parquet
+
+제조사/차종/연료 등 범주형 문자열 컬럼은 dictionary 인코딩으로 저장합니다.
+
+사용법:
+    python db/export_snapshot.py                    # parquet, ./snapshots
+    python db/export_snapshot.py arrow /data/snapshots
+
+필요 패키지: pyarrow
+"""
+
+import os
+import sys
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy import types as sa_types
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import Engine
+from db.model import Vehicle, VEHICLE_PLATFORMS
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 내보내기/읽기를 쓸 때만 필요
+    pa = None
+    pq = None
+
+DEFAULT_OUT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+DEFAULT_CHUNK_SIZE = 50_000
+FORMATS = ("parquet", "arrow")
+
+# 값 종류가 적은 범주형 컬럼 → dictionary 인코딩
+CATEGORICAL_COLUMNS = {
+    'origin', 'cartype', 'manufacturer', 'model', 'generation', 'trim', 'fueltype',
+    'transmission', 'colorname', 'selltype', 'location',
+}
+# 경로(hive 파티션)로 표현되는 컬럼은 파일에 쓰지 않음
+PARTITION_COLUMNS = {'platform'}
+
+# (테이블, 별칭, 컬럼 접두어) - 테이블이 없으면 조인을 생략
+ENRICHMENT_TABLES = (
+    ('vehicles_inspect', 'vin', 'inspect_'),
+    ('vehicles_insurance', 'vins', 'insurance_'),
+)
+ENRICHMENT_SKIP_COLUMNS = {'vehicleid', 'vehicleno'}
+
+OPTIONS_LATERAL = """
+LEFT JOIN LATERAL (
+    SELECT array_agg(om.option_code ORDER BY om.option_code) AS option_codes
+    FROM vehicle_options vo
+    JOIN option_masters om ON om.option_id = vo.option_id
+    WHERE vo.vehicle_id = v.vehicleid
+) opt ON TRUE
+"""
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow가 설치되어 있지 않습니다. 'pip install pyarrow' 후 다시 실행하세요.")
+
+
+def _arrow_type(sa_type, categorical: bool = False):
+    """SQLAlchemy 컬럼 타입 → Arrow 타입"""
+    if isinstance(sa_type, sa_types.Boolean):
+        return pa.bool_()
+    if isinstance(sa_type, sa_types.BigInteger):
+        return pa.int64()
+    if isinstance(sa_type, sa_types.SmallInteger):
+        return pa.int16()
+    if isinstance(sa_type, sa_types.Integer):
+        return pa.int32()
+    if isinstance(sa_type, (sa_types.Float, sa_types.Numeric)):
+        return pa.float64()
+    if isinstance(sa_type, sa_types.DateTime):
+        return pa.timestamp('us')
+    if isinstance(sa_type, sa_types.Date):
+        return pa.date32()
+    if categorical:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def _build_export_query(conn, active_only: bool) -> Tuple[str, List[Tuple[str, Any]]]:
+    """SELECT 문과 (컬럼명, arrow 타입) 목록을 만듭니다. 보강 테이블은 존재하는 것만 조인합니다."""
+    select_list = []
+    fields = []
+    for col in Vehicle.__table__.columns:
+        select_list.append(f"v.{col.name}")
+        fields.append((col.name, _arrow_type(col.type, col.name in CATEGORICAL_COLUMNS)))
+
+    joins = []
+    inspector = inspect(conn)
+    for table, alias, prefix in ENRICHMENT_TABLES:
+        if not inspector.has_table(table):
+            print(f"[스냅샷] {table} 테이블이 없어 조인을 생략합니다.")
+            continue
+        for col in inspector.get_columns(table):
+            name = col['name']
+            if name.lower() in ENRICHMENT_SKIP_COLUMNS:
+                continue
+            select_list.append(f'{alias}."{name}" AS {prefix}{name.lower()}')
+            # 점검/보험 문자열 컬럼은 코드값이라 dictionary 인코딩
+            fields.append((f"{prefix}{name.lower()}", _arrow_type(col['type'], categorical=True)))
+        joins.append(f"LEFT JOIN {table} {alias} ON {alias}.vehicleid = v.vehicleid")
+
+    select_list.append("opt.option_codes")
+    fields.append(('option_codes', pa.list_(pa.string())))
+
+    sql = (
+        f"SELECT {', '.join(select_list)}\n"
+        f"FROM vehicles v\n"
+        f"{chr(10).join(joins)}\n"
+        f"{OPTIONS_LATERAL}\n"
+        f"WHERE v.platform = :platform"
+        f"{' AND v.is_active' if active_only else ''}"
+    )
+    return sql, fields
+
+
+class _StableDictionary:
+    """청크가 바뀌어도 인덱스가 유지되는 dictionary 인코더.
+
+    사전은 뒤에만 추가되므로 Arrow IPC 파일에는 delta로, Parquet에는 그대로 쓸 수 있습니다.
+    """
+
+    def __init__(self):
+        self.index: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def encode(self, values: Iterable[Optional[str]]):
+        indices = []
+        for value in values:
+            if value is None:
+                indices.append(None)
+                continue
+            idx = self.index.get(value)
+            if idx is None:
+                idx = self.index[value] = len(self.values)
+                self.values.append(value)
+            indices.append(idx)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(indices, type=pa.int32()), pa.array(self.values, type=pa.string())
+        )
+
+
+class _SnapshotWriter:
+    """파티션 하나(platform)를 파일 하나로 쓰는 writer. 완료 후 rename으로 교체합니다."""
+
+    def __init__(self, path: str, schema, fmt: str):
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.schema = schema
+        self.encoders = {
+            field.name: _StableDictionary()
+            for field in schema if pa.types.is_dictionary(field.type)
+        }
+        if fmt == "parquet":
+            self._writer = pq.ParquetWriter(self.tmp_path, schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(self.tmp_path, 'wb')
+            self._writer = pa.ipc.new_file(
+                self._sink, schema, options=pa.ipc.IpcWriteOptions(emit_dictionary_deltas=True)
+            )
+        self.rows = 0
+
+    def write_rows(self, rows: List[Tuple]):
+        columns = list(zip(*rows))
+        arrays = []
+        for field, values in zip(self.schema, columns):
+            encoder = self.encoders.get(field.name)
+            arrays.append(encoder.encode(values) if encoder else pa.array(values, type=field.type))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows += len(rows)
+
+    def close(self):
+        self._writer.close()
+        if hasattr(self, '_sink'):
+            self._sink.close()
+        os.replace(self.tmp_path, self.path)
+
+
+def export_snapshot(
+    out_dir: str = DEFAULT_OUT_DIR,
+    fmt: str = "parquet",
+    platforms: Iterable[str] = VEHICLE_PLATFORMS,
+    snapshot_date: Optional[date] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    active_only: bool = True,
+) -> Dict[str, int]:
+    """플랫폼별로 vehicles 카탈로그를 스트리밍해서 스냅샷 파일을 씁니다. 플랫폼별 행 수를 반환합니다."""
+    _require_pyarrow()
+    if fmt not in FORMATS:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({' | '.join(FORMATS)})")
+
+    snapshot_date = snapshot_date or date.today()
+    extension = "parquet" if fmt == "parquet" else "arrow"
+    counts = {}
+
+    with Engine.connect() as conn:
+        sql, fields = _build_export_query(conn, active_only)
+        file_columns = [i for i, (name, _) in enumerate(fields) if name not in PARTITION_COLUMNS]
+        schema = pa.schema([pa.field(*fields[i]) for i in file_columns])
+
+        for platform in platforms:
+            partition_dir = os.path.join(out_dir, f"snapshot_date={snapshot_date.isoformat()}", f"platform={platform}")
+            os.makedirs(partition_dir, exist_ok=True)
+            writer = _SnapshotWriter(os.path.join(partition_dir, f"part-000.{extension}"), schema, fmt)
+
+            # 서버 사이드 커서로 chunk_size씩 가져와 RecordBatch로 바로 씀 (전체를 메모리에 올리지 않음)
+            result = conn.execution_options(stream_results=True, max_row_buffer=chunk_size).execute(
+                text(sql), {'platform': platform}
+            )
+            for rows in result.partitions(chunk_size):
+                writer.write_rows([tuple(row[i] for i in file_columns) for row in rows])
+            writer.close()
+
+            counts[platform] = writer.rows
+            print(f"[스냅샷] {platform}: {writer.rows:,}건 → {writer.path}")
+
+    return counts
+
+
+def load_snapshot(out_dir: str = DEFAULT_OUT_DIR, snapshot_date: Optional[str] = None, platforms: Optional[List[str]] = None):
+    """스냅샷을 pyarrow Table로 읽습니다. snapshot_date가 없으면 가장 최근 날짜를 사용합니다.
+
+    Arrow IPC 파일은 memory-map으로 열리므로 대용량도 복사 없이 바로 읽습니다.
+    platform / snapshot_date 컬럼은 hive 경로에서 복원됩니다.
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    from pyarrow import fs
+
+    if snapshot_date is None:
+        dates = sorted(
+            name.split("=", 1)[1] for name in os.listdir(out_dir) if name.startswith("snapshot_date=")
+        )
+        if not dates:
+            raise FileNotFoundError(f"스냅샷이 없습니다: {out_dir}")
+        snapshot_date = dates[-1]
+
+    root = os.path.join(out_dir, f"snapshot_date={snapshot_date}")
+    fmt = "parquet" if any(
+        name.endswith(".parquet") for _, _, files in os.walk(root) for name in files
+    ) else "arrow"
+    dataset = ds.dataset(
+        root, format="ipc" if fmt == "arrow" else fmt, partitioning="hive",
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+    table = dataset.to_table(filter=ds.field("platform").isin(platforms) if platforms else None)
+    return table.append_column("snapshot_date", pa.array([snapshot_date] * table.num_rows, type=pa.string()))
+
+
+if __name__ == "__main__":
+    fmt_arg = sys.argv[1] if len(sys.argv) > 1 else "parquet"
+    out_arg = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_OUT_DIR
+    if fmt_arg not in FORMATS:
+        print(f"알 수 없는 형식: {fmt_arg} ({' | '.join(FORMATS)}) [out_dir]")
+        sys.exit(1)
+    result = export_snapshot(out_arg, fmt_arg)
+    print(f"[스냅샷 완료] 총 {sum(result.values()):,}건")
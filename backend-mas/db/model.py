@@ -1,16 +1,26 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Index, UniqueConstraint, Text, Boolean
+from typing import Dict, List
+from sqlalchemy import Column, String, Integer, Float, Date, ForeignKey, Index, UniqueConstraint, Text, Boolean, DateTime, Table, inspect, text, bindparam, func, event
 from sqlalchemy.ext.declarative import declarative_base
 from .connection import session_scope, Engine
 
 Base = declarative_base()
 
+# vehicles는 platform 기준 LIST 파티션 테이블 (플랫폼별 파티션 + 그 외 값은 default 파티션)
+VEHICLE_PLATFORMS = ('encar', 'kb_chachacha')
+VEHICLE_DEFAULT_PARTITION = 'vehicles_default'
+
+def vehicle_partition_name(platform: str) -> str:
+    """플랫폼에 해당하는 vehicles 파티션 테이블 이름을 반환합니다."""
+    return f"vehicles_{platform}" if platform in VEHICLE_PLATFORMS else VEHICLE_DEFAULT_PARTITION
+
 class Vehicle(Base):
     __tablename__ = 'vehicles'
     
+    # 파티션 테이블의 PK/UNIQUE에는 파티션 키(platform)가 반드시 포함되어야 함
     vehicleid = Column(Integer, primary_key=True, autoincrement=True)
+    platform = Column(String, primary_key=True)
     carseq = Column(Integer, nullable=False)
-    vehicleno = Column(String, nullable=False, unique=True)
-    platform = Column(String)
+    vehicleno = Column(String, nullable=False)
     origin = Column(String)
     cartype = Column(String)
     manufacturer = Column(String)
@@ -31,6 +41,32 @@ class Vehicle(Base):
     detailurl = Column(String)
     photo = Column(String)
     has_options = Column(Boolean, default=None)  # NULL: 미확인, TRUE: 옵션 있음, FALSE: 옵션 없음
+    is_active = Column(Boolean, nullable=False, default=True, server_default=text('true'))  # FALSE: 최근 크롤링에서 사라진(판매완료/내림) 매물
+    inactive_since = Column(DateTime)  # 비활성 처리 시각 (유예기간 후 vehicles_archive로 이동)
+
+    # 인덱스 (크롤러 중복체크 / 옵션 미확인 조회 / MCP 검색 쿼리 기준)
+    __table_args__ = (
+        UniqueConstraint('vehicleno', 'platform', name='uq_vehicles_vehicleno_platform'),
+        # 플랫폼별 carseq 프리로드, carseq IN (...) 조회 → index-only scan
+        Index('idx_vehicles_platform_carseq', 'platform', 'carseq'),
+        # 옵션 상태 미확인 차량만 담는 부분 인덱스 (확인이 끝나면 인덱스에서 빠짐)
+        Index('idx_vehicles_options_unchecked', 'platform', 'vehicleid', postgresql_where=has_options.is_(None)),
+        # search_vehicles: price 범위 + ORDER BY price, distance
+        Index('idx_vehicles_price_distance', 'price', 'distance', 'modelyear'),
+        # similar_vehicles: manufacturer 일치 + modelyear/price 범위
+        Index('idx_vehicles_manufacturer_year_price', 'manufacturer', 'modelyear', 'price'),
+        {'postgresql_partition_by': 'LIST (platform)'},
+    )
+
+@event.listens_for(Vehicle.__table__, 'after_create')
+def _create_vehicle_partitions(target, connection, **kw):
+    """vehicles 생성 직후 플랫폼별 파티션을 만듭니다. (부모 인덱스는 파티션에 자동 전파)"""
+    for platform in VEHICLE_PLATFORMS:
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {vehicle_partition_name(platform)} "
+            f"PARTITION OF vehicles FOR VALUES IN ('{platform}')"
+        ))
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {VEHICLE_DEFAULT_PARTITION} PARTITION OF vehicles DEFAULT"))
 
 class OptionMaster(Base):
     __tablename__ = 'option_masters'
@@ -52,15 +88,100 @@ class VehicleOption(Base):
     __tablename__ = 'vehicle_options'
     
     id = Column(Integer, primary_key=True, autoincrement=True)
-    vehicle_id = Column(Integer, ForeignKey('vehicles.vehicleid'), nullable=False)
+    vehicle_id = Column(Integer, nullable=False)
     option_id = Column(Integer, ForeignKey('option_masters.option_id'), nullable=False)
     
-    # 인덱스
+    # vehicles가 파티션 테이블이라 vehicleid 단독 FK는 걸 수 없음 (idx_vehicle_option으로 조회)
     __table_args__ = (
         UniqueConstraint('vehicle_id', 'option_id', name='uq_vehicle_option'),
         Index('idx_vehicle_option', 'vehicle_id', 'option_id'),
     )
 
+# 유예기간이 지난 비활성 매물 보관용 (vehicles와 같은 컬럼 + archived_at)
+vehicles_archive = Table(
+    'vehicles_archive', Base.metadata,
+    *[Column(c.name, c.type, primary_key=c.primary_key, autoincrement=False) for c in Vehicle.__table__.columns],
+    Column('archived_at', DateTime, nullable=False, server_default=func.now()),
+)
+
+class VehiclePlatformStat(Base):
+    """플랫폼별 차량 수 요약 (refresh_platform_stats가 파티션 통계 추정치로 갱신)"""
+    __tablename__ = 'vehicle_platform_stats'
+
+    platform = Column(String, primary_key=True)
+    vehicle_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, server_default=func.now())
+
+# 엔카 보강 데이터 (encar_inspect / encar_insurance / encar_enrich에서 채움)
+# vehicles가 파티션 테이블이라 vehicleid 단독 FK는 걸 수 없음
+class VehicleInspect(Base):
+    """성능점검 요약"""
+    __tablename__ = 'vehicles_inspect'
+
+    vehicleid = Column(Integer, primary_key=True, autoincrement=False)
+    warrantytype = Column(String(50))
+    tuning = Column(String(50))
+    changeusage = Column(String(16))
+    recall = Column(String(16))
+    recallstatus = Column(String(16))
+    accidenthistory = Column(String(16))
+    simplerepair = Column(String(16))
+
+class VehicleInsurance(Base):
+    """보험이력 요약 (isdisclosed=False: 판매자 비공개)"""
+    __tablename__ = 'vehicles_insurance'
+
+    vehicleid = Column(Integer, primary_key=True, autoincrement=False)
+    vehicleno = Column(String(20))
+    ownerchangecnt = Column(Integer)
+    myaccidentcnt = Column(Integer)
+    myaccidentcost = Column(Integer)
+    otheraccidentcnt = Column(Integer)
+    otheraccidentcost = Column(Integer)
+    isdisclosed = Column(Boolean)
+
+class EnrichmentFreshness(Base):
+    """보강 소스별 마지막 수집 시각 (소스별 TTL 판단용)
+
+    fetched_at은 결과가 확정된 응답(ok/empty)을 받은 시각만 기록하고,
+    일시 오류는 failed_at에 따로 남겨 짧은 재시도 TTL로 다시 수집합니다.
+    """
+    __tablename__ = 'enrichment_freshness'
+
+    vehicleid = Column(Integer, primary_key=True, autoincrement=False)
+    source = Column(String(16), primary_key=True)
+    fetched_at = Column(DateTime, nullable=False)   # 확정 응답을 한 번도 못 받았으면 datetime.min
+    status = Column(String(16), nullable=False)     # 마지막 시도 결과: ok / empty / error
+    failed_at = Column(DateTime)                    # 마지막 일시 오류 시각 (확정 응답을 받으면 NULL)
+
+# 은행 자동차 대출 금리 (finanace_crawler에서 채움). 같은 날 다시 수집하면 덮어씀
+class LoanRate(Base):
+    """대출상품 기간별 금리 (단위: %)"""
+    __tablename__ = 'loan_rates'
+
+    bank_code = Column(String(16), primary_key=True)
+    product_code = Column(String(32), primary_key=True)
+    term_months = Column(Integer, primary_key=True, autoincrement=False)
+    effective_date = Column(Date, primary_key=True)
+    product_name = Column(String(200))
+    base_rate = Column(Float)
+    spread_rate = Column(Float)
+    pref_rate = Column(Float)
+    min_rate = Column(Float)
+    max_rate = Column(Float)
+    source_url = Column(Text)
+    scraped_at = Column(DateTime, nullable=False, server_default=func.now())
+
+class LoanRatePage(Base):
+    """상품 금리 페이지 내용 해시 (변경 없으면 파싱/저장 생략)"""
+    __tablename__ = 'loan_rate_pages'
+
+    bank_code = Column(String(16), primary_key=True)
+    product_code = Column(String(32), primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+    checked_at = Column(DateTime, nullable=False)
+    changed_at = Column(DateTime, nullable=False)
+
 # =============================================================================
 # DB 관리 함수들
 # =============================================================================
@@ -70,33 +191,171 @@ def create_tables_if_not_exist():
     try:
         print("[DB 테이블 확인 중...]")
         Base.metadata.create_all(Engine)
+        add_missing_columns()
+        create_missing_indexes()
+        with Engine.connect() as conn:
+            relkind = conn.execute(text(
+                "SELECT relkind FROM pg_class WHERE relname = 'vehicles' AND pg_table_is_visible(oid)"
+            )).scalar()
+        if relkind == 'r':
+            print("[DB 안내] vehicles가 파티션 테이블이 아닙니다. 'python db/partitions.py migrate'로 전환하세요.")
         print("[DB 테이블 생성 완료] 모든 테이블이 준비되었습니다.")
     except Exception as e:
         print(f"[DB 테이블 생성 실패] {e}")
         raise
 
-def check_database_status():
-    """데이터베이스 상태를 확인합니다."""
+def add_missing_columns():
+    """모델에는 있지만 DB 테이블에는 없는 컬럼을 추가합니다. (create_all은 기존 테이블을 변경하지 않음)"""
+    added = []
+    with Engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col['name'] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN IF NOT EXISTS {column.name} {column.type.compile(dialect=conn.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg.compile(dialect=conn.dialect)}"
+                if not column.nullable and column.server_default is not None:
+                    ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+    if added:
+        print(f"[DB 컬럼 추가] {', '.join(added)}")
+    return added
+
+def create_missing_indexes():
+    """모델에 정의된 인덱스 중 DB에 없는 것만 생성합니다.
+
+    create_all은 이미 존재하는 테이블에는 인덱스를 추가하지 않으므로,
+    기존 DB에 새 인덱스를 반영하는 마이그레이션 역할을 합니다.
+    """
+    created = []
+    with Engine.begin() as conn:
+        existing = {
+            table.name: {ix['name'] for ix in inspect(conn).get_indexes(table.name)}
+            for table in Base.metadata.sorted_tables
+        }
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing[table.name]:
+                    index.create(conn)
+                    created.append(index.name)
+    if created:
+        print(f"[DB 인덱스 생성] {', '.join(created)}")
+    return created
+
+# 파티션 테이블은 부모에 통계가 없으므로 파티션들의 추정치를 합산
+ESTIMATED_COUNT_SQL = text("""
+SELECT p.relname,
+       SUM(COALESCE(s.n_live_tup, GREATEST(c.reltuples, 0)))::bigint AS estimated
+FROM pg_class p
+LEFT JOIN pg_inherits i ON i.inhparent = p.oid
+JOIN pg_class c ON c.oid = COALESCE(i.inhrelid, p.oid)
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE p.relname IN :names
+  AND p.relkind IN ('r', 'p')
+  AND pg_table_is_visible(p.oid)
+GROUP BY p.relname
+""").bindparams(bindparam('names', expanding=True))
+
+# vehicles 파티션별 추정 건수 (파티션 = 플랫폼이므로 COUNT(*) 없이 플랫폼별 건수를 얻음)
+VEHICLE_PARTITION_ESTIMATES_SQL = text("""
+SELECT c.relname, COALESCE(s.n_live_tup, GREATEST(c.reltuples, 0))::bigint AS estimated
+FROM pg_inherits i
+JOIN pg_class c ON c.oid = i.inhrelid
+LEFT JOIN pg_stat_user_tables s ON s.relid = c.oid
+WHERE i.inhparent = 'vehicles'::regclass
+""")
+
+# default 파티션에는 여러 플랫폼이 섞일 수 있으므로 거기만 정확히 셈 (보통 비어 있거나 작음)
+DEFAULT_PARTITION_COUNTS_SQL = text(f"SELECT platform, COUNT(*) FROM {VEHICLE_DEFAULT_PARTITION} GROUP BY platform")
+
+# 파티션 전환 전(단일 테이블) DB용
+EXACT_PLATFORM_COUNTS_SQL = text("SELECT platform, COUNT(*) FROM vehicles GROUP BY platform")
+
+UPSERT_PLATFORM_STAT_SQL = text("""
+INSERT INTO vehicle_platform_stats (platform, vehicle_count, updated_at)
+VALUES (:platform, :vehicle_count, NOW())
+ON CONFLICT (platform) DO UPDATE
+SET vehicle_count = EXCLUDED.vehicle_count, updated_at = EXCLUDED.updated_at
+""")
+
+def get_estimated_counts(session, table_names: List[str]) -> Dict[str, int]:
+    """통계 카탈로그(pg_stat_user_tables / pg_class)에서 테이블별 추정 건수를 가져옵니다. (테이블 스캔 없음)"""
+    rows = session.execute(ESTIMATED_COUNT_SQL, {'names': list(table_names)}).all()
+    return {name: int(estimated) for name, estimated in rows}
+
+def estimate_platform_counts(session) -> Dict[str, int]:
+    """플랫폼 파티션별 추정 건수 + default 파티션의 정확한 건수로 플랫폼별 차량 수를 구합니다."""
+    partitions = {name: int(estimated) for name, estimated in session.execute(VEHICLE_PARTITION_ESTIMATES_SQL)}
+    if not partitions:
+        return {platform: int(n) for platform, n in session.execute(EXACT_PLATFORM_COUNTS_SQL)}
+    counts = {platform: partitions.get(vehicle_partition_name(platform), 0) for platform in VEHICLE_PLATFORMS}
+    if VEHICLE_DEFAULT_PARTITION in partitions:
+        counts.update({platform: int(n) for platform, n in session.execute(DEFAULT_PARTITION_COUNTS_SQL)})
+    return {platform: n for platform, n in counts.items() if n > 0}
+
+def refresh_platform_stats() -> Dict[str, int]:
+    """플랫폼별 차량 수 요약 테이블을 갱신합니다. 크롤링/정리 작업이 끝난 뒤 호출합니다.
+
+    vehicles 전체를 세지 않고 파티션별 통계 카탈로그 추정치를 사용합니다. (ANALYZE/autovacuum 주기만큼 오차)
+    """
+    with session_scope() as session:
+        counts = estimate_platform_counts(session)
+        if counts:
+            session.execute(UPSERT_PLATFORM_STAT_SQL,
+                            [{'platform': platform, 'vehicle_count': n} for platform, n in counts.items()])
+        session.execute(text("DELETE FROM vehicle_platform_stats WHERE platform <> ALL(:platforms)"),
+                        {'platforms': list(counts)})
+    counts = get_platform_counts()
+    print(f"[플랫폼 통계 갱신] {', '.join(f'{k}: {v:,}건' for k, v in counts.items())} (추정)")
+    return counts
+
+def get_platform_counts() -> Dict[str, int]:
+    """요약 테이블에서 플랫폼별 차량 수를 조회합니다. 대시보드는 vehicles 대신 이 값을 사용합니다."""
+    with session_scope() as session:
+        return {s.platform: s.vehicle_count for s in session.query(VehiclePlatformStat).order_by(VehiclePlatformStat.platform)}
+
+def check_database_status(exact: bool = False):
+    """데이터베이스 상태를 확인합니다.
+
+    기본값은 통계 카탈로그 기반 추정 건수(즉시 반환)이며,
+    exact=True일 때만 COUNT(*) 전체 스캔으로 정확한 건수를 셉니다.
+    """
+    label = "정확" if exact else "추정"
     try:
         with session_scope() as session:
-            # Vehicle 테이블 확인
-            vehicle_count = session.query(Vehicle).count()
-            print(f"[DB 상태] Vehicle 테이블: {vehicle_count:,}건")
-            
-            # OptionMaster 테이블 확인
-            option_master_count = session.query(OptionMaster).count()
-            print(f"[DB 상태] OptionMaster 테이블: {option_master_count:,}건")
-            
-            # VehicleOption 테이블 확인
-            vehicle_option_count = session.query(VehicleOption).count()
-            print(f"[DB 상태] VehicleOption 테이블: {vehicle_option_count:,}건")
-            
-            return {
-                'vehicle_count': vehicle_count,
-                'option_master_count': option_master_count,
-                'vehicle_option_count': vehicle_option_count
-            }
+            if exact:
+                vehicle_count = session.query(Vehicle).count()
+                option_master_count = session.query(OptionMaster).count()
+                vehicle_option_count = session.query(VehicleOption).count()
+            else:
+                estimated = get_estimated_counts(session, [
+                    Vehicle.__tablename__, OptionMaster.__tablename__, VehicleOption.__tablename__
+                ])
+                vehicle_count = estimated.get(Vehicle.__tablename__, 0)
+                option_master_count = estimated.get(OptionMaster.__tablename__, 0)
+                vehicle_option_count = estimated.get(VehicleOption.__tablename__, 0)
+
+            print(f"[DB 상태] Vehicle 테이블: {vehicle_count:,}건 ({label})")
+            print(f"[DB 상태] OptionMaster 테이블: {option_master_count:,}건 ({label})")
+            print(f"[DB 상태] VehicleOption 테이블: {vehicle_option_count:,}건 ({label})")
+
+        platform_counts = get_platform_counts()
+        if platform_counts:
+            print(f"[DB 상태] 플랫폼별: {', '.join(f'{k}: {v:,}건' for k, v in platform_counts.items())}")
+
+        return {
+            'vehicle_count': vehicle_count,
+            'option_master_count': option_master_count,
+            'vehicle_option_count': vehicle_option_count,
+            'platform_counts': platform_counts,
+            'exact': exact
+        }
     except Exception as e:
         print(f"[DB 상태 확인 실패] {e}")
         return None
-
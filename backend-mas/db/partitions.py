@@ -0,0 +1,127 @@
+"""
+vehicles 파티션 관리
+
+- migrate_vehicles_to_partitioned: 기존 일반 테이블 vehicles를 platform LIST 파티션 테이블로 전환
+- maintain_platform_partition: 특정 플랫폼 파티션만 VACUUM ANALYZE (다른 플랫폼 읽기에 영향 없음)
+- truncate_platform_partition: 특정 플랫폼 데이터 전체 삭제 (행 단위 DELETE 대신 파티션 TRUNCATE)
+
+사용법:
+    python db/partitions.py migrate
+    python db/partitions.py maintain encar
+"""
+
+import os
+import sys
+
+from sqlalchemy import inspect, text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import Engine
+from db.model import (
+    Vehicle, VEHICLE_PLATFORMS, VEHICLE_DEFAULT_PARTITION, vehicle_partition_name
+)
+
+LEGACY_TABLE = "vehicles_legacy"
+
+
+def is_vehicles_partitioned(conn) -> bool:
+    relkind = conn.execute(text(
+        "SELECT relkind FROM pg_class WHERE relname = 'vehicles' AND pg_table_is_visible(oid)"
+    )).scalar()
+    return relkind == 'p'
+
+
+def migrate_vehicles_to_partitioned() -> bool:
+    """일반 테이블 vehicles를 파티션 테이블로 옮깁니다. 이미 파티션 테이블이면 아무것도 하지 않습니다.
+
+    한 트랜잭션 안에서 기존 테이블/인덱스/시퀀스 이름을 *_legacy로 바꾸고,
+    모델 정의대로 새 파티션 테이블을 만든 뒤 데이터를 복사하고 시퀀스를 이어 붙입니다.
+    """
+    with Engine.begin() as conn:
+        exists = conn.execute(text("SELECT to_regclass('vehicles') IS NOT NULL")).scalar()
+        if not exists:
+            print("[파티션 전환] vehicles 테이블이 없습니다. create_tables_if_not_exist()가 파티션 테이블로 생성합니다.")
+            return False
+        if is_vehicles_partitioned(conn):
+            print("[파티션 전환] vehicles는 이미 파티션 테이블입니다.")
+            return False
+
+        print("[파티션 전환] vehicles → platform LIST 파티션 전환 시작")
+        conn.execute(text(f"ALTER TABLE vehicles RENAME TO {LEGACY_TABLE}"))
+
+        # 인덱스/제약 이름은 스키마 전역이라 새 테이블과 겹치지 않도록 이름 변경 (PK/UNIQUE 제약도 함께 바뀜)
+        index_names = conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = :t AND schemaname = current_schema()"
+        ), {"t": LEGACY_TABLE}).scalars().all()
+        for name in index_names:
+            conn.execute(text(f'ALTER INDEX "{name}" RENAME TO "{name}_legacy"'))
+        conn.execute(text("ALTER SEQUENCE IF EXISTS vehicles_vehicleid_seq RENAME TO vehicles_legacy_vehicleid_seq"))
+
+        # vehicle_options → vehicles FK 제거 (파티션 테이블에는 vehicleid 단독 FK 불가)
+        fk_names = conn.execute(text("""
+            SELECT conname FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = to_regclass(:t)
+        """), {"t": LEGACY_TABLE}).scalars().all()
+        for name in fk_names:
+            conn.execute(text(f'ALTER TABLE vehicle_options DROP CONSTRAINT IF EXISTS "{name}"'))
+
+        Vehicle.__table__.create(conn)
+
+        # 기존 테이블에 있는 컬럼만 복사 (새로 추가된 컬럼은 기본값 사용)
+        legacy_columns = {col['name'] for col in inspect(conn).get_columns(LEGACY_TABLE)}
+        copy_columns = [c.name for c in Vehicle.__table__.columns if c.name in legacy_columns]
+        columns = ", ".join(copy_columns)
+        select_columns = ", ".join(
+            "COALESCE(platform, 'unknown')" if name == 'platform' else name
+            for name in copy_columns
+        )
+        moved = conn.execute(text(
+            f"INSERT INTO vehicles ({columns}) SELECT {select_columns} FROM {LEGACY_TABLE}"
+        )).rowcount
+        conn.execute(text(
+            "SELECT setval(pg_get_serial_sequence('vehicles', 'vehicleid'), "
+            "COALESCE((SELECT MAX(vehicleid) FROM vehicles), 0) + 1, false)"
+        ))
+        conn.execute(text(f"DROP TABLE {LEGACY_TABLE} CASCADE"))
+        print(f"[파티션 전환 완료] {moved:,}건 이동")
+
+    for platform in VEHICLE_PLATFORMS:
+        maintain_platform_partition(platform)
+    return True
+
+
+def maintain_platform_partition(platform: str):
+    """해당 플랫폼 파티션만 VACUUM ANALYZE 합니다. 크롤링이 끝난 플랫폼에 대해서만 호출합니다."""
+    partition = vehicle_partition_name(platform)
+    try:
+        with Engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"VACUUM (ANALYZE) {partition}"))
+        print(f"[파티션 정리] {partition} VACUUM ANALYZE 완료")
+    except Exception as e:
+        print(f"[파티션 정리 실패] {partition}: {e}")
+
+
+def truncate_platform_partition(platform: str):
+    """해당 플랫폼 차량을 파티션 TRUNCATE로 한 번에 삭제합니다. (옵션 매핑도 함께 정리)"""
+    partition = vehicle_partition_name(platform)
+    if partition == VEHICLE_DEFAULT_PARTITION:
+        raise ValueError(f"등록되지 않은 플랫폼입니다: {platform}")
+    with Engine.begin() as conn:
+        conn.execute(text(
+            f"DELETE FROM vehicle_options WHERE vehicle_id IN (SELECT vehicleid FROM {partition})"
+        ))
+        conn.execute(text(f"TRUNCATE {partition}"))
+    print(f"[파티션 삭제] {partition} TRUNCATE 완료")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "migrate"
+    if command == "migrate":
+        migrate_vehicles_to_partitioned()
+    elif command == "maintain":
+        for name in (sys.argv[2:] or VEHICLE_PLATFORMS):
+            maintain_platform_partition(name)
+    else:
+        print(f"알 수 없는 명령: {command} (migrate | maintain [platform ...])")
+        sys.exit(1)
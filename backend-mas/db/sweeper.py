@@ -0,0 +1,200 @@
+"""
+판매완료/내림 매물 정리 (sweeper)
+
+크롤링에서 본 carseq 집합을 임시 테이블에 한 번에 올린 뒤 vehicles와 조인해서
+1) 다시 보인 비활성 매물은 재활성화하고
+2) 이번 크롤링에서 사라진 활성 매물은 배치 단위로 is_active = FALSE 처리하며
+   (목록 조회 오류/페이지 상한으로 끝까지 못 본 구간이 하나라도 있으면 이번에는 비활성 처리를 하지 않음)
+3) 유예기간(grace_days)이 지난 비활성 매물은 vehicles_archive로 옮기고,
+   vehicleid로 딸린 데이터(옵션 매핑/성능점검/보험이력/보강 수집 기록)는 같은 배치에서 삭제합니다.
+   (아카이브에는 차량 정보만 남김 - 보강 데이터는 필요하면 다시 수집)
+
+사용법:
+    python db/sweeper.py archive          # 유예기간 지난 비활성 매물만 아카이브 (기본 7일)
+    python db/sweeper.py archive 14
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List
+
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import Engine
+from db.model import (
+    EnrichmentFreshness, Vehicle, VehicleInspect, VehicleInsurance, VehicleOption, vehicles_archive
+)
+
+SEEN_TABLE = "seen_listings"
+SEEN_CHUNK_SIZE = 50_000
+DEFAULT_BATCH_SIZE = 5_000
+DEFAULT_GRACE_DAYS = 7
+# 이번 크롤링에서 본 매물 수가 활성 매물의 이 비율보다 적으면 부분 크롤링으로 보고 비활성 처리를 건너뜀
+DEFAULT_MIN_SEEN_RATIO = 0.8
+
+REACTIVATE_SQL = text(f"""
+UPDATE vehicles v
+SET is_active = TRUE, inactive_since = NULL
+FROM {SEEN_TABLE} s
+WHERE v.platform = :platform
+  AND v.carseq = s.carseq
+  AND NOT v.is_active
+""")
+
+DEACTIVATE_BATCH_SQL = text(f"""
+WITH target AS (
+    SELECT v.vehicleid
+    FROM vehicles v
+    WHERE v.platform = :platform
+      AND v.is_active
+      AND NOT EXISTS (SELECT 1 FROM {SEEN_TABLE} s WHERE s.carseq = v.carseq)
+    LIMIT :batch_size
+)
+UPDATE vehicles v
+SET is_active = FALSE, inactive_since = :now
+FROM target
+WHERE v.platform = :platform
+  AND v.vehicleid = target.vehicleid
+""")
+
+_ARCHIVE_COLUMNS = ", ".join(c.name for c in Vehicle.__table__.columns)
+# 아카이브되는 차량에 딸린 테이블 (vehicles가 파티션 테이블이라 FK/CASCADE가 없어서 직접 삭제)
+CHILD_TABLES = (
+    (VehicleOption.__tablename__, 'vehicle_id'),
+    (VehicleInspect.__tablename__, 'vehicleid'),
+    (VehicleInsurance.__tablename__, 'vehicleid'),
+    (EnrichmentFreshness.__tablename__, 'vehicleid'),
+)
+_DROP_CHILDREN = ",\n".join(
+    f"dropped_{table} AS (\n    DELETE FROM {table} WHERE {column} IN (SELECT vehicleid FROM moved)\n)"
+    for table, column in CHILD_TABLES
+)
+ARCHIVE_BATCH_SQL = text(f"""
+WITH moved AS (
+    DELETE FROM vehicles v
+    WHERE v.platform = :platform
+      AND v.vehicleid IN (
+          SELECT vehicleid FROM vehicles
+          WHERE platform = :platform
+            AND NOT is_active
+            AND inactive_since < :cutoff
+          LIMIT :batch_size
+      )
+    RETURNING {", ".join(f"v.{c.name}" for c in Vehicle.__table__.columns)}
+),
+archived AS (
+    INSERT INTO {vehicles_archive.name} ({_ARCHIVE_COLUMNS})
+    SELECT {_ARCHIVE_COLUMNS} FROM moved
+    ON CONFLICT DO NOTHING
+),
+{_DROP_CHILDREN}
+SELECT COUNT(*) FROM moved
+""")
+
+
+def _to_carseqs(ids: Iterable) -> List[int]:
+    """API/HTML에서 받은 문자열 ID를 carseq(int)로 변환합니다. 숫자가 아닌 값은 버립니다."""
+    carseqs = set()
+    for value in ids:
+        value = str(value).strip()
+        if value.isdigit():
+            carseqs.add(int(value))
+    return sorted(carseqs)
+
+
+def sweep_delisted(
+    platform: str,
+    seen_ids: Iterable,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    grace_days: int = DEFAULT_GRACE_DAYS,
+    min_seen_ratio: float = DEFAULT_MIN_SEEN_RATIO,
+    incomplete_segments: Iterable[str] = (),
+) -> Dict[str, int]:
+    """최근 크롤링에서 본 ID 집합과 DB를 비교해 사라진 매물을 비활성 처리하고 오래된 비활성 매물을 아카이브합니다.
+
+    incomplete_segments: 끝까지 수집하지 못한 구간(브랜드/모델그룹 등) 이름. 하나라도 있으면
+    그 구간 매물이 안 보인 것이 판매완료인지 알 수 없으므로 재활성화만 하고 비활성 처리는 건너뜁니다.
+    """
+    carseqs = _to_carseqs(seen_ids)
+    incomplete = sorted(set(incomplete_segments))
+    result = {'seen': len(carseqs), 'reactivated': 0, 'deactivated': 0, 'archived': 0}
+    print(f"[매물 정리 시작] {platform}: 이번 크롤링에서 확인된 매물 {len(carseqs):,}대")
+    if incomplete:
+        print(f"[매물 정리] {platform}: 끝까지 수집하지 못한 구간 {len(incomplete)}개 → 비활성 처리 건너뜀 "
+              f"({', '.join(incomplete[:10])}{' ...' if len(incomplete) > 10 else ''})")
+
+    with Engine.connect() as conn:
+        active_count = conn.execute(
+            text("SELECT COUNT(*) FROM vehicles WHERE platform = :platform AND is_active"),
+            {'platform': platform}
+        ).scalar()
+        if not carseqs:
+            print(f"[매물 정리 건너뜀] {platform}: 확인된 매물 없음")
+        elif not incomplete and len(carseqs) < active_count * min_seen_ratio:
+            print(f"[매물 정리 건너뜀] {platform}: 확인 {len(carseqs):,}대 < 활성 {active_count:,}대 × {min_seen_ratio} (부분 크롤링으로 판단)")
+        else:
+            # 세션 임시 테이블: 배치마다 커밋해도 연결이 살아있는 동안 유지됨
+            conn.execute(text(f"CREATE TEMP TABLE IF NOT EXISTS {SEEN_TABLE} (carseq INTEGER PRIMARY KEY)"))
+            conn.execute(text(f"TRUNCATE {SEEN_TABLE}"))
+            for i in range(0, len(carseqs), SEEN_CHUNK_SIZE):
+                conn.execute(
+                    text(f"INSERT INTO {SEEN_TABLE} (carseq) SELECT unnest(CAST(:ids AS INTEGER[])) ON CONFLICT DO NOTHING"),
+                    {'ids': carseqs[i:i + SEEN_CHUNK_SIZE]}
+                )
+            conn.execute(text(f"ANALYZE {SEEN_TABLE}"))
+            conn.commit()
+
+            result['reactivated'] = conn.execute(REACTIVATE_SQL, {'platform': platform}).rowcount
+            conn.commit()
+
+            now = datetime.now()
+            while not incomplete:
+                updated = conn.execute(
+                    DEACTIVATE_BATCH_SQL, {'platform': platform, 'batch_size': batch_size, 'now': now}
+                ).rowcount
+                conn.commit()
+                result['deactivated'] += updated
+                if updated < batch_size:
+                    break
+                print(f"  [비활성 처리 중] {platform}: 누적 {result['deactivated']:,}대")
+
+            conn.execute(text(f"DROP TABLE IF EXISTS {SEEN_TABLE}"))
+            conn.commit()
+
+    result['archived'] = archive_inactive(platform, grace_days=grace_days, batch_size=batch_size)
+    print(f"[매물 정리 완료] {platform}: 재활성 {result['reactivated']:,}대, "
+          f"비활성 {result['deactivated']:,}대, 아카이브 {result['archived']:,}대")
+    return result
+
+
+def archive_inactive(platform: str, grace_days: int = DEFAULT_GRACE_DAYS, batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """유예기간이 지난 비활성 매물을 배치 단위로 vehicles_archive로 옮기고 딸린 옵션/보강 데이터를 삭제합니다."""
+    cutoff = datetime.now() - timedelta(days=grace_days)
+    total = 0
+    with Engine.connect() as conn:
+        while True:
+            moved = conn.execute(
+                ARCHIVE_BATCH_SQL, {'platform': platform, 'cutoff': cutoff, 'batch_size': batch_size}
+            ).scalar() or 0
+            conn.commit()
+            total += moved
+            if moved < batch_size:
+                break
+            print(f"  [아카이브 중] {platform}: 누적 {total:,}대")
+    return total
+
+
+if __name__ == "__main__":
+    from db.model import VEHICLE_PLATFORMS
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "archive"
+    if command != "archive":
+        print(f"알 수 없는 명령: {command} (archive [grace_days])")
+        sys.exit(1)
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_GRACE_DAYS
+    for name in VEHICLE_PLATFORMS:
+        count = archive_inactive(name, grace_days=days)
+        print(f"[아카이브] {name}: {count:,}대")
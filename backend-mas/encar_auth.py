@@ -0,0 +1,197 @@
+"""
+엔카 Bearer 토큰 인증 클라이언트 (성능점검/보험이력 수집 공용)
+
+401/403을 받으면 "토큰 만료"인지 "해당 매물만 비공개/권한없음"인지 구분합니다.
+- 보험이력의 403은 평소에도 흔한 "비공개" 응답이므로 거부마다 확인하지 않고,
+  토큰 세대마다 첫 401 또는 거부가 ENCAR_AUTH_PROBE_AFTER번(기본 8) 연속될 때만 확인 요청을 보냄
+  (200을 한 번이라도 받으면 연속 횟수는 0으로)
+- 확인은 직전에 200을 받았던 URL(last known good)을 같은 토큰으로 다시 찔러보는 요청 하나.
+  락 밖에서 한 스레드만 보내고, 그동안 거부받은 다른 스레드는 그 결과만 기다림 (정상 응답 worker는 영향 없음)
+- 그것도 401/403이면 토큰 문제로 판단 → 모든 worker를 멈추고 토큰 공급자로 새 토큰을 받아 재개
+- 다시 찌른 URL이 정상이면 해당 매물만의 응답으로 보고 그대로 돌려줌 (보험이력 비공개 등)
+- 토큰이 403으로 만료되면 확인 전까지의 거부(최대 ENCAR_AUTH_PROBE_AFTER - 1건)는 매물 단위로 처리됨
+
+토큰 공급자는 교체 가능:
+    ENCAR_TOKEN_PROVIDER=mypkg.tokens:get_encar_token   # 인자 없이 호출해서 토큰 문자열을 반환하는 함수
+설정이 없으면 .env를 다시 읽어 ENCAR_BEARER를 사용합니다 (실행 중 .env만 고쳐도 이어서 진행).
+"""
+
+import os
+import time
+import threading
+import importlib
+from typing import Callable, Optional
+
+import requests
+from dotenv import load_dotenv
+
+AUTH_FAILURE_STATUS = (401, 403)
+DEFAULT_REFRESH_ATTEMPTS = int(os.getenv("ENCAR_TOKEN_REFRESH_ATTEMPTS", "3"))
+DEFAULT_REFRESH_WAIT = float(os.getenv("ENCAR_TOKEN_REFRESH_WAIT", "60"))  # 초, 새 토큰을 기다리는 간격
+# 아직 한 번도 200을 못 받아 비교할 URL이 없을 때, 403이 이만큼 연속되면 토큰 문제로 판단
+NO_REFERENCE_FAILURE_LIMIT = 20
+# 401/403이 이만큼 연속되면(사이에 200 없이) 토큰 확인 요청을 보냄
+DEFAULT_PROBE_AFTER = int(os.getenv("ENCAR_AUTH_PROBE_AFTER", "8"))
+
+
+class TokenExpired(RuntimeError):
+    """토큰 갱신까지 실패해서 더 진행할 수 없음. (requests 예외가 아니므로 fetch_one에서 삼켜지지 않음)"""
+
+
+class EnvTokenProvider:
+    """.env를 다시 읽어 ENCAR_BEARER를 돌려주는 기본 토큰 공급자"""
+    def __init__(self, env_path: Optional[str] = None):
+        self.env_path = env_path
+
+    def __call__(self) -> str:
+        if self.env_path:
+            load_dotenv(dotenv_path=self.env_path, override=True)
+        load_dotenv(override=True)
+        return (os.getenv("ENCAR_BEARER") or "").strip()
+
+
+def load_token_provider(env_path: Optional[str] = None) -> Callable[[], str]:
+    """ENCAR_TOKEN_PROVIDER("모듈:함수")가 있으면 그 함수를, 없으면 EnvTokenProvider를 반환합니다."""
+    spec = (os.getenv("ENCAR_TOKEN_PROVIDER") or "").strip()
+    if not spec:
+        return EnvTokenProvider(env_path)
+    module_name, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "get_token")
+
+
+class _Probe:
+    """진행 중인 토큰 확인 요청 하나 (같은 세대에 거부받은 스레드들이 결과를 공유)"""
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.valid = False
+
+
+class EncarAuthClient:
+    """requests.Session을 감싸 토큰 만료를 감지/갱신하는 클라이언트. 여러 스레드에서 같이 써도 됩니다.
+
+    get()은 requests.Session.get과 같은 응답을 돌려주고, 토큰 갱신이 끝내 실패하면 TokenExpired를 올립니다.
+    """
+
+    def __init__(self, session: requests.Session, token: Optional[str] = None,
+                 token_provider: Optional[Callable[[], str]] = None,
+                 refresh_attempts: int = DEFAULT_REFRESH_ATTEMPTS, refresh_wait: float = DEFAULT_REFRESH_WAIT,
+                 probe_after: int = DEFAULT_PROBE_AFTER):
+        self.session = session
+        self.token_provider = token_provider or EnvTokenProvider()
+        self.refresh_attempts = refresh_attempts
+        self.refresh_wait = refresh_wait
+        self.probe_after = max(1, probe_after)
+        self._lock = threading.Lock()          # 토큰 갱신 (한 번에 한 스레드)
+        self._state_lock = threading.Lock()    # 거부 집계/확인 요청 상태 (요청을 보내는 동안에는 잡지 않음)
+        self._ready = threading.Event()   # 토큰 갱신 중에는 clear → 모든 worker가 요청 전에 대기
+        self._ready.set()
+        self._generation = 0              # 토큰이 바뀔 때마다 증가 (중복 갱신 방지)
+        self._last_good_url: Optional[str] = None
+        self._failures_without_reference = 0
+        self._consecutive_denials = 0
+        self._probe: Optional[_Probe] = None
+        self._probed_generation = 0       # 401로 확인 요청을 이미 보낸 토큰 세대
+
+        token = (token or "").strip() or self.token_provider()
+        if not token:
+            raise RuntimeError("ENCAR_BEARER 토큰이 비어 있습니다. .env 또는 토큰 공급자를 확인하세요.")
+        self._set_token(token)
+
+    def _set_token(self, token: str):
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        self._generation += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        while True:
+            self._ready.wait()
+            generation = self._generation
+            r = self.session.get(url, **kwargs)
+            if r.status_code not in AUTH_FAILURE_STATUS:
+                if r.status_code == 200:
+                    self._last_good_url = url
+                    self._consecutive_denials = 0
+                return r
+            if not self._handle_auth_failure(generation, r.status_code, **kwargs):
+                return r  # 토큰은 정상 → 해당 매물만의 401/403
+            # 토큰이 갱신됐으므로 같은 요청을 다시 보냄 (큐에 있던 작업 유실 없음)
+
+    def _token_is_valid(self, status_code: int = 401, **kwargs) -> bool:
+        """직전에 성공했던 URL을 다시 요청해 토큰 자체가 유효한지 확인합니다.
+
+        비교할 URL이 아직 없으면 401은 토큰 문제, 403은 연속 횟수가 한도를 넘을 때만 토큰 문제로 봅니다.
+        """
+        if not self._last_good_url:
+            return status_code != 401 and self._failures_without_reference < NO_REFERENCE_FAILURE_LIMIT
+        try:
+            return self.session.get(self._last_good_url, **kwargs).status_code not in AUTH_FAILURE_STATUS
+        except requests.RequestException:
+            return False
+
+    def _needs_probe(self, generation: int, status_code: int) -> bool:
+        """_state_lock 안에서 호출. 이번 거부로 토큰 확인 요청을 보내야 하는지"""
+        if status_code == 401 and self._probed_generation != generation:
+            return True
+        return self._consecutive_denials >= self.probe_after
+
+    def _handle_auth_failure(self, generation: int, status_code: int, **kwargs) -> bool:
+        """토큰 문제였으면 갱신하고 True(재시도), 매물 단위 거부면 False를 반환합니다."""
+        with self._state_lock:
+            if generation != self._generation:
+                return True  # 다른 스레드가 이미 토큰을 바꿨음
+            self._consecutive_denials += 1
+            if not self._last_good_url:
+                self._failures_without_reference += 1
+            probe = self._probe
+            owner = probe is None
+            if owner:
+                if not self._needs_probe(generation, status_code):
+                    return False
+                probe = self._probe = _Probe(generation)
+
+        if owner:
+            # 확인 요청은 락 밖에서 (다른 worker의 정상 요청을 막지 않음)
+            try:
+                probe.valid = self._token_is_valid(status_code, **kwargs)
+            finally:
+                with self._state_lock:
+                    self._probe = None
+                    if status_code == 401:
+                        self._probed_generation = generation
+                    if probe.valid:
+                        self._consecutive_denials = 0
+                probe.done.set()
+        else:
+            probe.done.wait()
+
+        if probe.valid:
+            return False
+        return self._refresh(generation, **kwargs)
+
+    def _refresh(self, generation: int, **kwargs) -> bool:
+        """토큰 공급자로 새 토큰을 받아 적용합니다. 끝내 실패하면 TokenExpired."""
+        with self._lock:
+            if generation != self._generation:
+                return True  # 다른 스레드가 이미 토큰을 바꿨음
+
+            self._ready.clear()
+            try:
+                print("[토큰] 인증 실패 감지 → 수집 일시 정지, 토큰 갱신 시도")
+                old_header = self.session.headers.get("Authorization")
+                for attempt in range(1, self.refresh_attempts + 1):
+                    token = (self.token_provider() or "").strip()
+                    if token and f"Bearer {token}" != old_header:
+                        with self._state_lock:
+                            self._set_token(token)
+                            self._failures_without_reference = 0
+                            self._consecutive_denials = 0
+                        # 비교 대상이 없으면(첫 요청부터 실패) 새 토큰으로 재시도해서 판단
+                        if not self._last_good_url or self._token_is_valid(**kwargs):
+                            print(f"[토큰] 갱신 완료 (시도 {attempt}) → 수집 재개")
+                            return True
+                    if attempt < self.refresh_attempts:
+                        print(f"[토큰] 새 토큰 대기 중... ({attempt}/{self.refresh_attempts}, {self.refresh_wait:.0f}초 후 재시도)")
+                        time.sleep(self.refresh_wait)
+                raise TokenExpired("Bearer 토큰이 만료되었고 갱신에도 실패했습니다. 토큰을 갱신한 뒤 다시 실행하세요.")
+            finally:
+                self._ready.set()
@@ -0,0 +1,242 @@
+"""
+엔카 매물 보강 통합 러너 (성능점검 / 보험이력 / 옵션)
+
+- 차량을 keyset 페이지로 한 번만 훑으면서, 소스별 신선도(enrichment_freshness)를 보고
+  TTL이 지난 소스만 골라 (차량, 소스) 작업으로 펼쳐 worker들이 동시에 수집
+- 세 소스 결과 + 신선도 갱신을 배치마다 한 트랜잭션으로 저장 (공용 Engine, 다중 행 UPSERT)
+- 소스별 TTL은 ENRICH_TTL_DAYS_<SOURCE> 환경변수로 조정 (기본: 점검 30일, 보험 14일, 옵션 90일)
+- 5xx/네트워크 오류 같은 일시 오류는 신선도(fetched_at)를 갱신하지 않고 failed_at만 남겨
+  ENRICH_RETRY_HOURS(기본 6시간) 뒤에 다시 수집
+- priority=True(기본)면 추천 수요 점수(enrich_priority) 순으로 수집.
+  대상을 한 번 훑어 (점수, vehicleid)만으로 전체 순서를 정한 뒤 그 순서대로 행을 청크 조회 (행 전체는 들고 있지 않음).
+  limit(ENRICH_BUDGET)이 있으면 상위 limit대(수집 예산)만 수집.
+  ENRICH_PRIORITY_WINDOW를 주면 저메모리 모드: 스트림을 그 크기씩 끊어 구간 안에서만 점수 순
+  False면 vehicleid 순 스트리밍
+
+사용법:
+    python encar_enrich.py            # 전체 소스
+    python encar_enrich.py 0/4        # 4개 프로세스 중 0번 샤드
+"""
+
+import os, sys, time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import Table, text
+
+import encar_inspect
+import encar_insurance
+import encar_option
+from db.connection import Engine
+from db.model import Base, VehicleInspect, VehicleInsurance, EnrichmentFreshness, add_missing_columns
+from db.bulk import upsert_rows
+from backfill import iter_keyset_targets, iter_rows_by_keys, iter_fetched, parse_shard
+from encar_auth import TokenExpired
+from enrich_priority import load_demand_signals, parse_weights, prioritize_in_windows, rank_keys
+
+connect_db = Engine.raw_connection
+make_client = encar_inspect.make_client
+
+
+class EnrichmentSource(NamedTuple):
+    name: str
+    table: Optional[Table]                                    # create_all 대상 (없으면 None)
+    seed_sql: str                                             # 이미 수집된 vehicleid 목록 (신선도 초기화용)
+    fetch: Callable[[Any, int, Optional[str]], Tuple[str, Any]]  # (client, carseq, vehicleno) → (ok/empty/error, 결과)
+    to_item: Callable[[int, Optional[str], Any], Any]         # ok 결과 → 저장할 항목
+    write: Callable[[Any, List[Any]], None]                   # (conn, 항목 목록) → 저장
+    ttl_days: float
+    needs_vehicle_no: bool = False
+
+
+def _ttl_days(name: str, default: float) -> float:
+    return float(os.getenv(f"ENRICH_TTL_DAYS_{name.upper()}", default))
+
+
+RETRY_HOURS = float(os.getenv("ENRICH_RETRY_HOURS", "6"))
+NEVER_FETCHED = datetime.min  # 확정 응답 없이 일시 오류만 난 차량의 fetched_at
+
+
+def _insurance_result(s, carseq: int, vno: Optional[str]) -> Tuple[str, Any]:
+    result = encar_insurance.fetch_one(s, carseq, vno)
+    return ("error", None) if result is None else ("ok", result)
+
+
+_option_master_map: Dict[str, int] = {}
+
+def _write_options(conn, items: List[Tuple[int, List[str]]]):
+    if not _option_master_map:
+        _option_master_map.update(encar_option.load_option_master_map(conn))
+    encar_option.save_options(conn, items, _option_master_map)
+
+
+SOURCES: Dict[str, EnrichmentSource] = {
+    "inspect": EnrichmentSource(
+        "inspect", VehicleInspect.__table__,
+        "SELECT vehicleid FROM vehicles_inspect",
+        lambda s, carseq, vno: encar_inspect.fetch_result(s, carseq),
+        lambda vid, vno, info: encar_inspect.to_row(vid, info),
+        lambda conn, rows: upsert_rows(conn, VehicleInspect.__table__, rows),
+        _ttl_days("inspect", 30),
+    ),
+    "insurance": EnrichmentSource(
+        "insurance", VehicleInsurance.__table__,
+        "SELECT vehicleid FROM vehicles_insurance",
+        _insurance_result,
+        lambda vid, vno, result: encar_insurance.to_row(vid, vno, *result),
+        lambda conn, rows: upsert_rows(conn, VehicleInsurance.__table__, rows),
+        _ttl_days("insurance", 14), needs_vehicle_no=True,
+    ),
+    "options": EnrichmentSource(
+        "options", None,
+        "SELECT vehicleid FROM vehicles WHERE platform = 'encar' AND has_options IS NOT NULL",
+        lambda s, carseq, vno: encar_option.fetch_result(s, carseq),
+        lambda vid, vno, codes: (vid, codes),
+        _write_options,
+        _ttl_days("options", 90),
+    ),
+}
+
+# 통합 러너 도입 전에 이미 저장된 결과는 "지금 수집한 것"으로 간주해 바로 다시 긁지 않도록 함
+FRESHNESS_SEED_SQL = """
+INSERT INTO enrichment_freshness (vehicleid, source, fetched_at, status)
+SELECT vehicleid, :source, NOW(), 'ok' FROM ({seed_sql}) seeded
+ON CONFLICT (vehicleid, source) DO NOTHING
+"""
+
+
+def _due_expr(source: EnrichmentSource, alias: str) -> str:
+    """해당 소스를 다시 수집해야 하는지 판단하는 SQL 식 (TTL은 초 단위 정수로 박아 넣음)
+
+    확정 응답이 TTL보다 오래됐고, 최근 RETRY_HOURS 안에 일시 오류가 나지 않았을 때 대상
+    """
+    ttl_seconds = int(source.ttl_days * 86400)
+    retry_seconds = int(RETRY_HOURS * 3600)
+    expr = (f"(({alias}.fetched_at IS NULL OR {alias}.fetched_at < NOW() - INTERVAL '{ttl_seconds} seconds')"
+            f" AND ({alias}.failed_at IS NULL OR {alias}.failed_at < NOW() - INTERVAL '{retry_seconds} seconds'))")
+    if source.needs_vehicle_no:
+        expr = f"(v.vehicleno IS NOT NULL AND {expr})"
+    return expr
+
+
+def build_target_query(sources: Sequence[EnrichmentSource]) -> Tuple[str, List[str]]:
+    """(SELECT ... FROM ... JOIN ..., WHERE 조건 목록). 행은 (vehicleid, carseq, vehicleno, price, due_소스1, ...)"""
+    joins = []
+    due = []
+    for i, source in enumerate(sources):
+        alias = f"f{i}"
+        joins.append(f"LEFT JOIN enrichment_freshness {alias} "
+                     f"ON {alias}.vehicleid = v.vehicleid AND {alias}.source = '{source.name}'")
+        due.append(_due_expr(source, alias))
+    select = (f"SELECT v.vehicleid, v.carseq, v.vehicleno, v.price, {', '.join(due)}\n"
+              f"FROM vehicles v\n" + "\n".join(joins))
+    return select, ["v.platform = 'encar'", "v.is_active", f"({' OR '.join(due)})"]
+
+
+def iter_tasks(rows: Iterator[tuple], sources: Sequence[EnrichmentSource]) -> Iterator[Tuple[int, int, Optional[str], EnrichmentSource]]:
+    """차량 한 대의 행을 TTL이 지난 소스별 작업으로 펼칩니다."""
+    for vid, carseq, vno, _price, *due_flags in rows:
+        for source, due in zip(sources, due_flags):
+            if due:
+                yield vid, carseq, vno, source
+
+
+def write_batch(items: Dict[str, List[Any]], freshness: List[Dict[str, Any]], failures: List[Dict[str, Any]]):
+    """소스별 결과와 신선도를 한 트랜잭션으로 저장합니다.
+
+    일시 오류(failures)는 status/failed_at만 갱신하고 기존 fetched_at은 그대로 둡니다.
+    """
+    with Engine.begin() as conn:
+        for name, source_items in items.items():
+            if source_items:
+                SOURCES[name].write(conn, source_items)
+        upsert_rows(conn, EnrichmentFreshness.__table__, freshness)
+        upsert_rows(conn, EnrichmentFreshness.__table__, failures, update_columns=("status", "failed_at"))
+
+
+def main(sources: Sequence[str] = tuple(SOURCES), limit: Optional[int] = None, batch_size: int = 500,
+         workers: int = 16, max_rps: Optional[float] = 20, shard_spec: Optional[str] = None,
+         priority: bool = True, feedback_db_path: Optional[str] = None, priority_weights: Optional[str] = None,
+         priority_window: Optional[int] = None):
+    selected = [SOURCES[name] for name in sources]
+    shard = parse_shard(shard_spec)
+    s = make_client()
+
+    Base.metadata.create_all(Engine, tables=[EnrichmentFreshness.__table__] + [src.table for src in selected if src.table is not None])
+    add_missing_columns()
+    with Engine.begin() as conn:
+        for source in selected:
+            conn.execute(text(FRESHNESS_SEED_SQL.format(seed_sql=source.seed_sql)), {"source": source.name})
+
+    select_sql, conditions = build_target_query(selected)
+    if priority:
+        with Engine.connect() as conn:
+            signals = load_demand_signals(conn, feedback_db_path, weights=parse_weights(priority_weights))
+        scan = iter_keyset_targets(connect_db, select_sql, "v.vehicleid", conditions, shard=shard)
+        score = lambda row: signals.score(row[0], row[3])
+        if priority_window:
+            vehicles = prioritize_in_windows(scan, score, priority_window, budget=limit)
+        else:
+            # 전체 대상의 (점수, vehicleid)만으로 전역 순서를 정하고 그 순서대로 행을 다시 조회
+            order = rank_keys(scan, score, budget=limit)
+            print(f"[우선순위] 대상 {len(order):,}대 점수 순 정렬 완료")
+            vehicles = iter_rows_by_keys(connect_db, select_sql, "v.vehicleid", order, conditions)
+    else:
+        vehicles = iter_keyset_targets(connect_db, select_sql, "v.vehicleid", conditions, limit=limit, shard=shard)
+    print(f"[INFO] 보강 수집 시작 (sources={[src.name for src in selected]}, "
+          f"ttl={ {src.name: src.ttl_days for src in selected} }, shard={shard}, priority={priority}, window={priority_window}, "
+          f"limit={limit}, workers={workers}, max_rps={max_rps})")
+
+    def fetch(task):
+        _vid, carseq, vno, source = task
+        return source.fetch(s, carseq, vno)
+
+    items: Dict[str, List[Any]] = {src.name: [] for src in selected}
+    freshness: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    stats = {src.name: {"ok": 0, "empty": 0, "error": 0} for src in selected}
+    started = time.time()
+    i = 0
+    try:
+        for i, ((vid, _carseq, vno, source), (status, result)) in enumerate(
+                iter_fetched(fetch, iter_tasks(vehicles, selected), workers=workers,
+                             max_rps=max_rps, queue_size=batch_size * 2), 1):
+            stats[source.name][status] += 1
+            if status == "error":
+                # 신선도는 그대로 두고 실패 시각만 기록 → RETRY_HOURS 뒤 다시 수집
+                failures.append({"vehicleid": vid, "source": source.name, "fetched_at": NEVER_FETCHED,
+                                 "status": status, "failed_at": datetime.now()})
+            else:
+                if status == "ok":
+                    items[source.name].append(source.to_item(vid, vno, result))
+                freshness.append({"vehicleid": vid, "source": source.name, "fetched_at": datetime.now(),
+                                  "status": status, "failed_at": None})
+
+            if i % batch_size == 0:
+                write_batch(items, freshness, failures)
+                print(f"[DB] 배치 커밋 (누적 작업 {i:,}, {time.time() - started:.0f}s) {stats}")
+                for source_items in items.values():
+                    source_items.clear()
+                freshness.clear()
+                failures.clear()
+    except TokenExpired as e:
+        # 이미 받은 결과는 저장 → 토큰 갱신 후 재실행하면 신선도 기준으로 나머지만 이어서 수집
+        print(f"[중단] {e}")
+        raise
+    finally:
+        if freshness or failures:
+            write_batch(items, freshness, failures)
+            print(f"[DB] 잔여 {len(freshness) + len(failures):,}건 커밋")
+
+    print(f"[DONE] 보강 수집 완료 — 작업 {i:,}건 {stats}")
+
+
+if __name__ == "__main__":
+    main(shard_spec=sys.argv[1] if len(sys.argv) > 1 else os.getenv("ENRICH_SHARD"),
+         limit=int(os.getenv("ENRICH_BUDGET")) if os.getenv("ENRICH_BUDGET") else None,
+         priority=os.getenv("ENRICH_PRIORITY", "1") != "0",
+         feedback_db_path=os.getenv("FEEDBACK_DB_PATH"),
+         priority_weights=os.getenv("ENRICH_PRIORITY_WEIGHTS"),
+         priority_window=int(os.getenv("ENRICH_PRIORITY_WINDOW")) if os.getenv("ENRICH_PRIORITY_WINDOW") else None,
+         workers=int(os.getenv("ENRICH_WORKERS", "16")),
+         max_rps=float(os.getenv("ENRICH_MAX_RPS", "20")) or None)
@@ -1,10 +1,9 @@
-import os, time
+import os, sys, time
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
-import pymysql
 from dotenv import load_dotenv
 
 # ===== 경로 & .env =====
@@ -15,66 +14,37 @@ else:
 ENV_PATH = REPO_ROOT.parent / ".env"
 load_dotenv(dotenv_path=ENV_PATH); load_dotenv()
 
-DB_HOST = os.getenv('DB_HOST')
-DB_PORT = int(os.getenv('DB_PORT', '3306'))
-DB_USER = os.getenv('DB_USER')
-DB_PASS = os.getenv('DB_PASSWORD')
-DB_NAME = os.getenv('DB_NAME')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.connection import Engine
+from db.model import Base, VehicleInspect
+from db.bulk import upsert_rows
+from backfill import iter_keyset_targets, iter_fetched, parse_shard
+from encar_auth import EncarAuthClient, TokenExpired, load_token_provider
 
 API_URL = "https://api.encar.com/v1/readside/inspection/vehicle/{vehicle_id}"
 ENCAR_BEARER = (os.getenv("ENCAR_BEARER") or "").strip() # ENCAR_BEARER 토큰은 .env에 넣어 사용
 
 # ===== DB =====
-def connect_db():
-    return pymysql.connect(
-        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS,
-        db=DB_NAME, charset='utf8mb4', autocommit=False
-    )
-
-CREATE_SQL = """
-CREATE TABLE IF NOT EXISTS vehicles_inspect (
-    vehicleId INT PRIMARY KEY,
-    WarrantyType VARCHAR(50)  NULL,
-    Tuning       VARCHAR(50)  NULL,
-    ChangeUsage  VARCHAR(16)  NULL,
-    Recall       VARCHAR(16)  NULL,
-    RecallStatus VARCHAR(16)  NULL,
-    AccidentHistory VARCHAR(16) NULL,
-    SimpleRepair VARCHAR(16)  NULL,
-    CONSTRAINT fk_vi_vehicle
-      FOREIGN KEY (vehicleId) REFERENCES vehicles(vehicleId)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-"""
+# 공용 Engine(db/connection.py) 사용. 대상 조회용 DBAPI 커넥션도 같은 풀에서 빌림
+connect_db = Engine.raw_connection
 
-UPSERT_SQL = """
-INSERT INTO vehicles_inspect
-  (vehicleId, WarrantyType, Tuning, ChangeUsage, Recall, RecallStatus, AccidentHistory, SimpleRepair)
-VALUES
-  (%s, %s, %s, %s, %s, %s, %s, %s)
-ON DUPLICATE KEY UPDATE
-  WarrantyType=VALUES(WarrantyType),
-  Tuning=VALUES(Tuning),
-  ChangeUsage=VALUES(ChangeUsage),
-  Recall=VALUES(Recall),
-  RecallStatus=VALUES(RecallStatus),
-  AccidentHistory=VALUES(AccidentHistory),
-  SimpleRepair=VALUES(SimpleRepair);
-"""
-
-TARGET_BASE = """
-SELECT v.vehicleId
+# WHERE / ORDER BY / LIMIT은 keyset 페이지마다 backfill.iter_keyset_targets에서 붙임
+# 엔카 API의 vehicleId는 vehicles.carseq (vehicles.vehicleid는 내부 PK)
+TARGET_SELECT = """
+SELECT v.vehicleid, v.carseq
 FROM vehicles v
 {join_clause}
-{where_clause}
-ORDER BY v.vehicleId
-{limit_clause}
 """
+TARGET_CONDITIONS = ["v.platform = 'encar'", "v.is_active"]
+
+def save_rows(rows: List[Dict[str, Any]]):
+    """다중 행 INSERT ... ON CONFLICT (대량이면 COPY)로 한 번에 저장"""
+    with Engine.begin() as conn:
+        upsert_rows(conn, VehicleInspect.__table__, rows)
 
 # ===== HTTP 세션 =====
 def make_session() -> requests.Session:
-    if not ENCAR_BEARER:
-        raise RuntimeError("ENCAR_BEARER 환경변수가 비어 있습니다. .env에 유효한 토큰을 넣어주세요.")
-
     s = requests.Session()
     s.trust_env = False       # OS 프록시 무시(407 예방)
     s.proxies = {}
@@ -96,12 +66,15 @@ def make_session() -> requests.Session:
         "Accept": "application/json, text/plain, */*",
         "Accept-Encoding": "gzip, deflate, br, zstd",
         "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
-        "Authorization": f"Bearer {ENCAR_BEARER}",
         "Origin": "https://fem.encar.com",
         "Referer": "https://fem.encar.com/",
     })
     return s
 
+def make_client() -> EncarAuthClient:
+    """토큰 만료를 감지해서 일시 정지 → 토큰 공급자로 갱신 → 재개하는 인증 클라이언트"""
+    return EncarAuthClient(make_session(), token=ENCAR_BEARER, token_provider=load_token_provider(str(ENV_PATH)))
+
 def _safe_get(obj: dict, keys: list, default=None):
     cur = obj
     for k in keys:
@@ -153,91 +126,99 @@ def parse_inspect_json(j: Dict[str, Any]) -> Dict[str, Optional[str]]:
 
     return result
 
-def fetch_one(s: requests.Session, vehicle_id: int) -> Optional[Dict[str, Optional[str]]]:
+def to_row(vehicle_id: int, info: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """parse_inspect_json 결과 → vehicles_inspect 행 (vehicle_id는 vehicles.vehicleid)"""
+    return {
+        "vehicleid": vehicle_id,
+        "warrantytype": info["WarrantyType"],
+        "tuning": info["Tuning"],
+        "changeusage": info["ChangeUsage"],
+        "recall": info["Recall"],
+        "recallstatus": info["RecallStatus"],
+        "accidenthistory": info["AccidentHistory"],
+        "simplerepair": info["SimpleRepair"],
+    }
+
+def fetch_result(s: EncarAuthClient, vehicle_id: int) -> Tuple[str, Optional[Dict[str, Optional[str]]]]:
+    """(상태, 점검 정보). 상태는 ok / empty(점검 기록 없음·매물 단위 거부) / error(일시 오류, 나중에 재시도)"""
     url = API_URL.format(vehicle_id=vehicle_id)
     try:
         r = s.get(url, timeout=8)
-        if r.status_code == 200:
-            try:
-                data = r.json()
-            except Exception:
-                return None
-            info = parse_inspect_json(data)
-            # 전부 None이면 무의미 → 쓰지 않음
-            if all(v is None for v in info.values()):
-                return None
-            return info
-
-        # 토큰 문제면 즉시 중단 유도
-        if r.status_code in (401, 403):
-            raise RuntimeError(f"Bearer 토큰 오류(status {r.status_code}). 토큰을 갱신하세요.")
-
-        # 404/기타는 스킵
-        return None
-
     except requests.RequestException:
-        return None
+        return "error", None
+    if r.status_code == 200:
+        try:
+            data = r.json()
+        except Exception:
+            return "error", None
+        info = parse_inspect_json(data)
+        # 전부 None이면 무의미 → 쓰지 않음
+        if all(v is None for v in info.values()):
+            return "empty", None
+        return "ok", info
+
+    # 토큰 만료는 EncarAuthClient가 갱신/TokenExpired로 처리하므로
+    # 여기까지 온 401/403/404는 해당 매물만의 응답, 그 외(5xx 등)는 일시 오류
+    if r.status_code in (401, 403, 404):
+        return "empty", None
+    return "error", None
+
+def fetch_one(s: EncarAuthClient, vehicle_id: int) -> Optional[Dict[str, Optional[str]]]:
+    return fetch_result(s, vehicle_id)[1]
 
 # ===== main =====
-def main(only_missing: bool = True, limit: Optional[int] = None, offset: int = 0, batch_size: int = 500):
-    s = make_session()
-    db = connect_db()
-    cur = db.cursor()
+def main(only_missing: bool = True, limit: Optional[int] = None, start_after: int = 0, batch_size: int = 500,
+         workers: int = 1, max_rps: Optional[float] = None, shard: Optional[Tuple[int, int]] = None):
+    s = make_client()
 
     # 테이블 보장
-    cur.execute(CREATE_SQL)
-    db.commit()
-
-    # 대상 vehicleId 목록
-    join_clause  = "LEFT JOIN vehicles_inspect i ON i.vehicleId = v.vehicleId" if only_missing else ""
-    where_clause = "WHERE i.vehicleId IS NULL" if only_missing else ""
-    limit_clause = ""
-    params: List[Any] = []
-    if limit is not None:
-        limit_clause = "LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-
-    sql = TARGET_BASE.format(join_clause=join_clause, where_clause=where_clause, limit_clause=limit_clause)
-    cur.execute(sql, params)
-    ids = [row[0] for row in cur.fetchall()]
-    total = len(ids)
-    print(f"[INFO] 성능점검 수집 대상: {total:,}건 (only_missing={only_missing}, limit={limit}, offset={offset})")
-
-    rows: List[tuple] = []
-    ok = skipped = 0
-
-    for i, vid in enumerate(ids, 1):
-        info = fetch_one(s, vid)
-        if info:
-            rows.append((
-                vid,
-                info["WarrantyType"],
-                info["Tuning"],
-                info["ChangeUsage"],
-                info["Recall"],
-                info["RecallStatus"],
-                info["AccidentHistory"],
-                info["SimpleRepair"],
-            ))
-            ok += 1
-        else:
-            skipped += 1
+    Base.metadata.create_all(Engine, tables=[VehicleInspect.__table__])
+
+    # 대상 (vehicleid, carseq): keyset 페이지로 스트리밍 (shard=(i, n)이면 vehicleid % n == i 인 것만)
+    join_clause = "LEFT JOIN vehicles_inspect i ON i.vehicleid = v.vehicleid" if only_missing else ""
+    conditions = TARGET_CONDITIONS + (["i.vehicleid IS NULL"] if only_missing else [])
+    targets = iter_keyset_targets(
+        connect_db, TARGET_SELECT.format(join_clause=join_clause), "v.vehicleid", conditions,
+        start_after=start_after, limit=limit, shard=shard,
+    )
+    print(f"[INFO] 성능점검 수집 시작 (only_missing={only_missing}, limit={limit}, start_after={start_after}, "
+          f"shard={shard}, workers={workers}, max_rps={max_rps})")
 
-        if i % batch_size == 0 and rows:
-            cur.executemany(UPSERT_SQL, rows)
-            db.commit()
-            print(f"[DB] upsert {len(rows):,}건 커밋 (누적 {i:,}/{total:,}, 성공 {ok}, 스킵 {skipped})")
-            rows.clear()
-        if i % 50 == 0:
-            time.sleep(0.05)
+    def fetch(target):
+        return fetch_one(s, target[1])
 
-    if rows:
-        cur.executemany(UPSERT_SQL, rows)
-        db.commit()
-        print(f"[DB] 잔여 {len(rows):,}건 커밋")
+    rows: List[Dict[str, Any]] = []
+    ok = skipped = 0
 
-    cur.close(); db.close()
-    print(f"[DONE] vehicles_inspect 업데이트 완료 — 성공 {ok}, 스킵 {skipped}, 대상 {total}")
+    try:
+        for i, ((vid, _carseq), info) in enumerate(iter_fetched(fetch, targets, workers=workers,
+                                                                max_rps=max_rps, queue_size=batch_size * 2), 1):
+            if info:
+                rows.append(to_row(vid, info))
+                ok += 1
+            else:
+                skipped += 1
+
+            if i % batch_size == 0 and rows:
+                save_rows(rows)
+                print(f"[DB] upsert {len(rows):,}건 커밋 (누적 {i:,}, 성공 {ok}, 스킵 {skipped})")
+                rows.clear()
+            if workers <= 1 and not max_rps and i % 50 == 0:
+                time.sleep(0.05)
+    except TokenExpired as e:
+        # 이미 받은 결과는 버리지 않고 저장 → 토큰 갱신 후 재실행하면 only_missing으로 나머지만 이어서 수집
+        print(f"[중단] {e}")
+        raise
+    finally:
+        if rows:
+            save_rows(rows)
+            print(f"[DB] 잔여 {len(rows):,}건 커밋")
+
+    print(f"[DONE] vehicles_inspect 업데이트 완료 — 성공 {ok}, 스킵 {skipped}, 대상 {ok + skipped}")
 
 if __name__ == "__main__":
-    main(only_missing=True, limit=None, offset=0, batch_size=500)
+    # 여러 프로세스로 나눠 돌릴 때: python encar_inspect.py 0/4, python encar_inspect.py 1/4, ...
+    main(only_missing=True, limit=None, start_after=0, batch_size=500,
+         shard=parse_shard(sys.argv[1] if len(sys.argv) > 1 else os.getenv("INSPECT_SHARD")),
+         workers=int(os.getenv("INSPECT_WORKERS", "16")),
+         max_rps=float(os.getenv("INSPECT_MAX_RPS", "20")) or None)
@@ -1,10 +1,9 @@
-import os, time
+import os, sys, time
 from pathlib import Path
 from typing import Optional, Dict, Any, Tuple, List
 
 import requests
 from requests.adapters import HTTPAdapter, Retry
-import pymysql
 from dotenv import load_dotenv
 
 # ===== env =====
@@ -16,62 +15,35 @@ else:
 ENV_PATH = REPO_ROOT.parent / ".env"
 load_dotenv(dotenv_path=ENV_PATH); load_dotenv()
 
-DB_HOST = os.getenv("DB_HOST")
-DB_PORT = int(os.getenv("DB_PORT", "3306"))
-DB_USER = os.getenv("DB_USER")
-DB_PASS = os.getenv("DB_PASSWORD")
-DB_NAME = os.getenv("DB_NAME")
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.connection import Engine
+from db.model import Base, VehicleInsurance
+from db.bulk import upsert_rows
+from backfill import iter_keyset_targets, iter_fetched, parse_shard
+from encar_auth import EncarAuthClient, TokenExpired, load_token_provider
 
 # 보험이력 공개(open) 엔드포인트 (vehicleId + vehicleNo 필요)
 API_URL = "https://api.encar.com/v1/readside/record/vehicle/{vehicle_id}/open?vehicleNo={vehicle_no}"
 ENCAR_BEARER = os.getenv("ENCAR_BEARER", "").strip() # ENCAR_BEARER 토큰은 .env에 넣어 사용
 
 # ===== DB =====
-def connect_db():
-    return pymysql.connect(
-        host=DB_HOST, port=DB_PORT, user=DB_USER, password=DB_PASS,
-        db=DB_NAME, charset="utf8mb4", autocommit=False
-    )
-
-CREATE_SQL = """
-CREATE TABLE IF NOT EXISTS vehicles_insurance (
-  vehicleId         INT PRIMARY KEY,
-  vehicleNo         VARCHAR(20),
-  OwnerChangeCnt    INT NULL,
-  MyAccidentCnt     INT NULL,
-  MyAccidentCost    INT NULL,
-  OtherAccidentCnt  INT NULL,
-  OtherAccidentCost INT NULL,
-  isDisclosed       TINYINT(1) NULL,
-  CONSTRAINT fk_vi_ins FOREIGN KEY (vehicleId) REFERENCES vehicles(vehicleId)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+# 공용 Engine(db/connection.py) 사용. 대상 조회용 DBAPI 커넥션도 같은 풀에서 빌림
+connect_db = Engine.raw_connection
+
+# WHERE / ORDER BY / LIMIT은 keyset 페이지마다 backfill.iter_keyset_targets에서 붙임
+# 엔카 API의 vehicleId는 vehicles.carseq (vehicles.vehicleid는 내부 PK)
+TARGET_SELECT = """
+SELECT v.vehicleid, v.carseq, v.vehicleno
+FROM vehicles v
+LEFT JOIN vehicles_insurance ins ON ins.vehicleid = v.vehicleid
 """
+TARGET_CONDITIONS = ["v.platform = 'encar'", "v.is_active", "v.vehicleno IS NOT NULL"]
 
-UPSERT_SQL = """
-INSERT INTO vehicles_insurance
- (vehicleId, vehicleNo, OwnerChangeCnt, MyAccidentCnt, MyAccidentCost,
-  OtherAccidentCnt, OtherAccidentCost, isDisclosed)
-VALUES
- (%s, %s, %s, %s, %s, %s, %s, %s)
-ON DUPLICATE KEY UPDATE
-  vehicleNo=VALUES(vehicleNo),
-  OwnerChangeCnt=VALUES(OwnerChangeCnt),
-  MyAccidentCnt=VALUES(MyAccidentCnt),
-  MyAccidentCost=VALUES(MyAccidentCost),
-  OtherAccidentCnt=VALUES(OtherAccidentCnt),
-  OtherAccidentCost=VALUES(OtherAccidentCost),
-  isDisclosed=VALUES(isDisclosed);
-"""
-
-TARGET_SQL = """
-SELECT vi.vehicleId, vi.vehicleNo
-FROM vehicles_info vi
-LEFT JOIN vehicles_insurance ins ON ins.vehicleId = vi.vehicleId
-WHERE vi.vehicleNo IS NOT NULL
-  AND {cond}
-ORDER BY vi.vehicleId
-{limit_clause}
-"""
+def save_rows(rows: List[Dict[str, Any]]):
+    """다중 행 INSERT ... ON CONFLICT (대량이면 COPY)로 한 번에 저장"""
+    with Engine.begin() as conn:
+        upsert_rows(conn, VehicleInsurance.__table__, rows)
 
 # ===== HTTP =====
 def make_session() -> requests.Session:
@@ -95,10 +67,12 @@ def make_session() -> requests.Session:
         "Origin": "https://fem.encar.com",
         "Referer": "https://fem.encar.com/",
     })
-    if ENCAR_BEARER:
-        s.headers["Authorization"] = f"Bearer {ENCAR_BEARER}"
     return s
 
+def make_client() -> EncarAuthClient:
+    """토큰 만료를 감지해서 일시 정지 → 토큰 공급자로 갱신 → 재개하는 인증 클라이언트"""
+    return EncarAuthClient(make_session(), token=ENCAR_BEARER, token_provider=load_token_provider(str(ENV_PATH)))
+
 # ===== parsing =====
 def to_int(v) -> Optional[int]:
     try:
@@ -125,84 +99,101 @@ def parse_insurance_json(j: Dict[str, Any]) -> Tuple[bool, Dict[str, Optional[in
     any_value = any(v is not None for v in fields.values())
     return any_value, fields
 
+def to_row(vehicle_id: int, vehicle_no: str, is_disclosed: bool, fields: Dict[str, Optional[int]]) -> Dict[str, Any]:
+    """fetch_one 결과 → vehicles_insurance 행 (vehicle_id는 vehicles.vehicleid)"""
+    return {
+        "vehicleid": vehicle_id,
+        "vehicleno": vehicle_no,
+        "ownerchangecnt": fields["OwnerChangeCnt"],
+        "myaccidentcnt": fields["MyAccidentCnt"],
+        "myaccidentcost": fields["MyAccidentCost"],
+        "otheraccidentcnt": fields["OtherAccidentCnt"],
+        "otheraccidentcost": fields["OtherAccidentCost"],
+        "isdisclosed": bool(is_disclosed),
+    }
+
 # ===== fetch =====
-def fetch_one(s: requests.Session, vehicle_id: int, vehicle_no: str) -> Tuple[bool, Dict[str, Optional[int]]]:
+def fetch_one(s: EncarAuthClient, vehicle_id: int, vehicle_no: str) -> Optional[Tuple[bool, Dict[str, Optional[int]]]]:
     """
     is_disclosed, fields 를 반환.
-    200 OK 이면 파싱, 403/404/409 등은 비공개로 처리.
+    200 OK 이면 파싱, 401/403/404/409는 비공개로 처리.
+    5xx 등 그 외 상태코드/깨진 응답/네트워크 오류는 일시 오류로 보고 None (저장하지 않음 → 다음 실행에서 재시도)
+    토큰 만료로 인한 401/403은 EncarAuthClient가 먼저 걸러서 갱신하거나 TokenExpired를 올리므로
+    비공개(isDisclosed=0) 행으로 잘못 저장되지 않음.
     """
     url = API_URL.format(vehicle_id=vehicle_id, vehicle_no=vehicle_no)
     try:
         r = s.get(url, timeout=8)
-        if r.status_code == 200:
-            try:
-                data = r.json()
-            except Exception:
-                return False, {k: None for k in
-                               ("OwnerChangeCnt","MyAccidentCnt","MyAccidentCost","OtherAccidentCnt","OtherAccidentCost")}
-            return parse_insurance_json(data)
-
-        if r.status_code in (401, 403, 404, 409):   # 비공개/권한없음/없음
-            return False, {k: None for k in
-                           ("OwnerChangeCnt","MyAccidentCnt","MyAccidentCost","OtherAccidentCnt","OtherAccidentCost")}
-
-        # 그 외 상태코드: 일시 오류 -> 비공개처럼 표기만 하고 진행(무한재시도 방지)
-        return False, {k: None for k in
-                       ("OwnerChangeCnt","MyAccidentCnt","MyAccidentCost","OtherAccidentCnt","OtherAccidentCost")}
     except requests.RequestException:
+        return None
+    if r.status_code == 200:
+        try:
+            data = r.json()
+        except Exception:
+            return None
+        return parse_insurance_json(data)
+
+    if r.status_code in (401, 403, 404, 409):   # 비공개/권한없음/없음
         return False, {k: None for k in
                        ("OwnerChangeCnt","MyAccidentCnt","MyAccidentCost","OtherAccidentCnt","OtherAccidentCost")}
 
+    # 그 외 상태코드: 일시 오류 (세션의 Retry까지 실패) → 비공개로 저장하지 않고 건너뜀
+    return None
+
 # ===== main =====
-def main(only_missing: bool = True, limit: int | None = None, offset: int = 0, batch_size: int = 400):
-    s = make_session()
-    db = connect_db(); cur = db.cursor()
-    cur.execute(CREATE_SQL); db.commit()
-
-    cond = "ins.vehicleId IS NULL" if only_missing else "1=1"
-    limit_clause = ""
-    params: List[Any] = []
-    if limit is not None:
-        limit_clause = "LIMIT %s OFFSET %s"
-        params.extend([limit, offset])
-
-    cur.execute(TARGET_SQL.format(cond=cond, limit_clause=limit_clause), params)
-    rows = cur.fetchall()
-    targets = [(vid, vno) for vid, vno in rows if vno]  # 안전
-    total = len(targets)
-    print(f"[INFO] 보험이력 대상: {total:,}건 (only_missing={only_missing}, limit={limit}, offset={offset})")
-
-    buf = []
+def main(only_missing: bool = True, limit: int | None = None, start_after: int = 0, batch_size: int = 400,
+         workers: int = 1, max_rps: float | None = None, shard: Tuple[int, int] | None = None):
+    s = make_client()
+    Base.metadata.create_all(Engine, tables=[VehicleInsurance.__table__])
+
+    # 대상 (vehicleid, carseq, vehicleno): keyset 페이지로 스트리밍 (shard=(i, n)이면 vehicleid % n == i 인 것만)
+    conditions = TARGET_CONDITIONS + (["ins.vehicleid IS NULL"] if only_missing else [])
+    targets = iter_keyset_targets(
+        connect_db, TARGET_SELECT, "v.vehicleid", conditions,
+        start_after=start_after, limit=limit, shard=shard,
+    )
+    print(f"[INFO] 보험이력 수집 시작 (only_missing={only_missing}, limit={limit}, start_after={start_after}, "
+          f"shard={shard}, workers={workers}, max_rps={max_rps})")
+
+    def fetch(target):
+        _vid, carseq, vno = target
+        return fetch_one(s, carseq, vno)
+
+    buf: List[Dict[str, Any]] = []
     success = 0
-    for i, (vid, vno) in enumerate(targets, 1):
-        is_disclosed, fields = fetch_one(s, vid, vno)
-        if is_disclosed:
-            success += 1
-
-        buf.append((
-            vid, vno,
-            fields["OwnerChangeCnt"],
-            fields["MyAccidentCnt"],
-            fields["MyAccidentCost"],
-            fields["OtherAccidentCnt"],
-            fields["OtherAccidentCost"],
-            1 if is_disclosed else 0
-        ))
-
-        if i % batch_size == 0:
-            cur.executemany(UPSERT_SQL, buf)
-            db.commit()
-            print(f"[DB] upsert {len(buf):,}건 커밋 (누적 {i:,}/{total:,}, 공개 {success:,})")
-            buf.clear()
-            time.sleep(0.05)
-
-    if buf:
-        cur.executemany(UPSERT_SQL, buf)
-        db.commit()
-        print(f"[DB] 잔여 {len(buf):,}건 커밋 (공개 {success:,})")
-
-    cur.close(); db.close()
-    print("[DONE] vehicles_insurance 업데이트 완료")
+    failed = 0
+    i = 0
+    try:
+        for i, ((vid, _carseq, vno), result) in enumerate(
+                iter_fetched(fetch, targets, workers=workers, max_rps=max_rps, queue_size=batch_size * 2), 1):
+            if result is None:
+                failed += 1  # 일시 오류 → 행을 쓰지 않으므로 only_missing 재실행 때 다시 수집
+                continue
+            is_disclosed, fields = result
+            if is_disclosed:
+                success += 1
+            buf.append(to_row(vid, vno, is_disclosed, fields))
+
+            if len(buf) >= batch_size:
+                save_rows(buf)
+                print(f"[DB] upsert {len(buf):,}건 커밋 (누적 {i:,}, 공개 {success:,}, 일시 오류 {failed:,})")
+                buf.clear()
+                if workers <= 1 and not max_rps:
+                    time.sleep(0.05)
+    except TokenExpired as e:
+        # 이미 받은 결과는 버리지 않고 저장 → 토큰 갱신 후 재실행하면 only_missing으로 나머지만 이어서 수집
+        print(f"[중단] {e}")
+        raise
+    finally:
+        if buf:
+            save_rows(buf)
+            print(f"[DB] 잔여 {len(buf):,}건 커밋 (공개 {success:,})")
+
+    print(f"[DONE] vehicles_insurance 업데이트 완료 — 대상 {i:,}, 공개 {success:,}, 일시 오류(미저장) {failed:,}")
 
 if __name__ == "__main__":
-    main(only_missing=True, limit=None, offset=0, batch_size=500)
+    # 여러 프로세스로 나눠 돌릴 때: python encar_insurance.py 0/4, python encar_insurance.py 1/4, ...
+    main(only_missing=True, limit=None, start_after=0, batch_size=500,
+         shard=parse_shard(sys.argv[1] if len(sys.argv) > 1 else os.getenv("INSURANCE_SHARD")),
+         workers=int(os.getenv("INSURANCE_WORKERS", "16")),
+         max_rps=float(os.getenv("INSURANCE_MAX_RPS", "20")) or None)
@@ -0,0 +1,109 @@
+import os, sys
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple
+
+import requests
+from dotenv import load_dotenv
+from sqlalchemy import select, text, update
+
+# ===== 경로 & .env =====
+if '__file__' in globals():
+    REPO_ROOT = Path(__file__).resolve().parent.parent
+else:
+    REPO_ROOT = Path.cwd().parent
+ENV_PATH = REPO_ROOT.parent / ".env"
+load_dotenv(dotenv_path=ENV_PATH); load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from db.model import Vehicle, OptionMaster, VehicleOption
+from db.bulk import upsert_rows
+from crawler.option_mapping import convert_platform_options_to_global
+from encar_auth import EncarAuthClient
+
+# 차량 옵션 API 엔드포인트 (옵션 수집은 이 모듈로 일원화 - 팀 data-pipeline 사본은 삭제)
+API_URL = "https://api.encar.com/v1/readside/vehicle/{vehicle_id}?include=OPTIONS"
+
+# 다시 수집한 차량의 기존 매핑 중 새 옵션 목록에 없는 것 삭제 (판매자가 옵션을 뺀 경우)
+DELETE_STALE_OPTIONS_SQL = text("""
+DELETE FROM vehicle_options vo
+WHERE vo.vehicle_id = ANY(CAST(:vehicle_ids AS INTEGER[]))
+  AND NOT EXISTS (
+      SELECT 1
+      FROM unnest(CAST(:new_vehicle_ids AS INTEGER[]), CAST(:new_option_ids AS INTEGER[])) AS n(vehicle_id, option_id)
+      WHERE n.vehicle_id = vo.vehicle_id AND n.option_id = vo.option_id
+  )
+""")
+
+# ===== 옵션 파싱 =====
+def parse_option_json(j: Dict[str, Any]) -> List[str]:
+    """엔카 표준 옵션 코드 목록"""
+    try:
+        standard_list = j.get('options', {}).get('standard', []) or []
+    except Exception:
+        return []
+    return [str(cd) for cd in standard_list]
+
+def fetch_result(s: EncarAuthClient, vehicle_id: int) -> Tuple[str, Optional[List[str]]]:
+    """(상태, 옵션 코드 목록). 상태는 ok / empty(매물 단위 거부·없음) / error(일시 오류, 나중에 재시도)"""
+    url = API_URL.format(vehicle_id=vehicle_id)
+    try:
+        r = s.get(url, timeout=8)
+    except requests.RequestException:
+        return "error", None
+    if r.status_code == 200:
+        try:
+            data = r.json()
+        except Exception:
+            return "error", None
+        return "ok", parse_option_json(data)
+    # 토큰 만료는 EncarAuthClient가 처리 → 여기까지 온 401/403/404는 매물 단위 응답, 그 외는 일시 오류
+    if r.status_code in (401, 403, 404):
+        return "empty", None
+    return "error", None
+
+def fetch_one(s: EncarAuthClient, vehicle_id: int) -> Optional[List[str]]:
+    """엔카 옵션 코드 목록을 반환합니다. 응답을 못 받으면 None, 옵션이 없으면 빈 목록."""
+    return fetch_result(s, vehicle_id)[1]
+
+# ===== 저장 =====
+def load_option_master_map(conn) -> Dict[str, int]:
+    """공통 옵션 코드 → option_id"""
+    return {code: option_id for code, option_id in conn.execute(select(OptionMaster.option_code, OptionMaster.option_id))}
+
+def save_options(conn, results: List[Tuple[int, List[str]]], option_master_map: Dict[str, int]):
+    """(vehicleid, 엔카 옵션 코드 목록)을 공통 옵션(vehicle_options)으로 변환해 저장하고 has_options를 갱신합니다.
+
+    results의 옵션 목록이 그 차량의 전체 옵션이므로, 기존 매핑 중 목록에 없는 것은 같은 트랜잭션에서 삭제합니다.
+    """
+    if not results:
+        return
+    mappings = []
+    with_options, without_options = [], []
+    for vehicle_id, codes in results:
+        option_ids = {
+            option_master_map[code]
+            for code in convert_platform_options_to_global(codes, 'encar') if code in option_master_map
+        }
+        mappings.extend({'vehicle_id': vehicle_id, 'option_id': option_id} for option_id in option_ids)
+        (with_options if option_ids else without_options).append(vehicle_id)
+
+    conn.execute(DELETE_STALE_OPTIONS_SQL, {
+        'vehicle_ids': [vehicle_id for vehicle_id, _ in results],
+        'new_vehicle_ids': [m['vehicle_id'] for m in mappings],
+        'new_option_ids': [m['option_id'] for m in mappings],
+    })
+    upsert_rows(conn, VehicleOption.__table__, mappings, conflict_columns=['vehicle_id', 'option_id'], update_columns=())
+    for vehicle_ids, has_options in ((with_options, True), (without_options, False)):
+        if vehicle_ids:
+            conn.execute(
+                update(Vehicle)
+                .where(Vehicle.platform == 'encar', Vehicle.vehicleid.in_(vehicle_ids))
+                .values(has_options=has_options)
+            )
+
+# ===== main =====
+if __name__ == "__main__":
+    # 옵션만 단독으로 수집할 때도 통합 러너를 사용 (대상 선정/신선도/배치 저장 공용)
+    from encar_enrich import main
+    main(sources=("options",), shard_spec=sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,163 @@
+"""
+보강 수집 우선순위 (추천 수요 기준)
+
+vehicleid 순서로 훑으면 잘 안 보이는 차량부터 보강되므로,
+아래 신호를 섞은 점수로 우선순위 큐를 만들어 많이 보이는 차량부터 수집합니다.
+
+- impressions: 피드백 저장소(MCP 서버 feedback.db의 user_feedback)에서 최근 N일 차량별 노출/반응 수
+- price_band : 해당 가격대(500만원 단위)가 피드백에서 차지하는 비중 (피드백이 없으면 매물 비중)
+- recency    : 최근 등록 매물일수록 높음 (vehicleid 범위 기준 정규화)
+
+가중치: ENRICH_PRIORITY_WEIGHTS="impressions=0.6,price_band=0.25,recency=0.15"
+피드백 DB 경로: FEEDBACK_DB_PATH (없으면 impressions 신호 없이 진행)
+"""
+
+import os
+import math
+import heapq
+from itertools import islice
+import sqlite3
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import text
+
+PRICE_BAND_SIZE = 500  # 만원
+DEFAULT_LOOKBACK_DAYS = 14
+DEFAULT_WEIGHTS = {"impressions": 0.6, "price_band": 0.25, "recency": 0.15}
+IMPRESSION_PRICE_CHUNK = 1000
+
+IMPRESSIONS_SQL = """
+SELECT vehicle_id, COUNT(*)
+FROM user_feedback
+WHERE timestamp >= datetime('now', ?)
+GROUP BY vehicle_id
+"""
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """'impressions=0.6,recency=0.4' → dict. 지정하지 않은 신호는 기본값 유지"""
+    weights = dict(DEFAULT_WEIGHTS)
+    for part in (value or "").split(","):
+        if "=" in part:
+            key, raw = part.split("=", 1)
+            if key.strip() not in weights:
+                raise ValueError(f"알 수 없는 우선순위 신호: {key.strip()} ({', '.join(DEFAULT_WEIGHTS)})")
+            weights[key.strip()] = float(raw)
+    return weights
+
+
+def price_band(price: Optional[int]) -> Optional[int]:
+    return None if price is None else int(price) // PRICE_BAND_SIZE
+
+
+def load_impressions(db_path: Optional[str], days: int = DEFAULT_LOOKBACK_DAYS) -> Counter:
+    """피드백 DB에서 최근 days일 차량별 이벤트 수를 읽습니다. DB가 없으면 빈 Counter."""
+    counts: Counter = Counter()
+    if not db_path or not os.path.exists(db_path):
+        print(f"[우선순위] 피드백 DB 없음({db_path}) → impressions 신호 없이 진행")
+        return counts
+    conn = sqlite3.connect(db_path)
+    try:
+        for vehicle_id, n in conn.execute(IMPRESSIONS_SQL, (f"-{int(days)} days",)):
+            if str(vehicle_id).isdigit():
+                counts[int(vehicle_id)] += n
+    finally:
+        conn.close()
+    print(f"[우선순위] 최근 {days}일 피드백 차량 {len(counts):,}대, 이벤트 {sum(counts.values()):,}건")
+    return counts
+
+
+class DemandSignals:
+    """차량 한 대의 우선순위 점수(0~1)를 계산하는 데 필요한 신호 모음"""
+
+    def __init__(self, impressions: Counter, band_share: Dict[int, float],
+                 id_range: Tuple[int, int], weights: Dict[str, float]):
+        self.impressions = impressions
+        self.max_log_impressions = math.log1p(max(impressions.values())) if impressions else 0.0
+        self.band_share = band_share
+        self.max_band_share = max(band_share.values()) if band_share else 0.0
+        self.min_id, self.max_id = id_range
+        self.weights = weights
+
+    def score(self, vehicle_id: int, price: Optional[int]) -> float:
+        w = self.weights
+        impressions = (math.log1p(self.impressions.get(vehicle_id, 0)) / self.max_log_impressions
+                       if self.max_log_impressions else 0.0)
+        band = (self.band_share.get(price_band(price), 0.0) / self.max_band_share
+                if self.max_band_share else 0.0)
+        span = self.max_id - self.min_id
+        recency = (vehicle_id - self.min_id) / span if span > 0 else 0.0
+        return w["impressions"] * impressions + w["price_band"] * band + w["recency"] * recency
+
+
+def load_demand_signals(conn, feedback_db_path: Optional[str] = None, days: int = DEFAULT_LOOKBACK_DAYS,
+                        weights: Optional[Dict[str, float]] = None) -> DemandSignals:
+    """피드백 DB + 매물 DB(conn, SQLAlchemy 커넥션)에서 우선순위 신호를 한 번에 읽어 둡니다."""
+    impressions = load_impressions(feedback_db_path, days)
+
+    id_range = tuple(conn.execute(text(
+        "SELECT COALESCE(MIN(vehicleid), 0), COALESCE(MAX(vehicleid), 0) FROM vehicles WHERE platform = 'encar'"
+    )).one())
+
+    # 가격대 비중: 피드백이 있으면 피드백 받은 차량들의 가격대, 없으면 매물 분포
+    bands: Counter = Counter()
+    if impressions:
+        ids = list(impressions)
+        for i in range(0, len(ids), IMPRESSION_PRICE_CHUNK):
+            rows = conn.execute(
+                text("SELECT vehicleid, price FROM vehicles WHERE vehicleid = ANY(:ids)"),
+                {"ids": ids[i:i + IMPRESSION_PRICE_CHUNK]},
+            )
+            for vid, price in rows:
+                if price is not None:
+                    bands[price_band(price)] += impressions[vid]
+    if not bands:
+        rows = conn.execute(text(
+            f"SELECT FLOOR(price / {PRICE_BAND_SIZE}), COUNT(*) FROM vehicles "
+            f"WHERE platform = 'encar' AND price IS NOT NULL GROUP BY 1"
+        ))
+        bands.update({int(band): n for band, n in rows})
+    total = sum(bands.values()) or 1
+    band_share = {band: n / total for band, n in bands.items()}
+
+    return DemandSignals(impressions, band_share, id_range, weights or DEFAULT_WEIGHTS)
+
+
+def rank_keys(rows: Iterable[tuple], score: Callable[[tuple], float], budget: Optional[int] = None) -> List[int]:
+    """행들의 키(row[0])를 점수 높은 순으로 정렬해 돌려줍니다. (전체 대상 기준 전역 순서)
+
+    행 자체는 들고 있지 않고 (점수, 순번, 키)만 남기므로 대상이 수십만 대여도 수십 MB 수준이며,
+    budget이 있으면 크기 budget의 min-heap으로 상위 budget개만 들고 있습니다.
+    """
+    ranked: List[Tuple[float, int, int]] = []
+    for seq, row in enumerate(rows):
+        item = (score(row), -seq, row[0])  # 동점이면 먼저 본(더 오래된 id) 행 우선
+        if budget is None:
+            ranked.append(item)
+        elif len(ranked) < budget:
+            heapq.heappush(ranked, item)
+        elif item > ranked[0]:
+            heapq.heapreplace(ranked, item)
+    ranked.sort(reverse=True)
+    return [key for _, _, key in ranked]
+
+
+def prioritize_in_windows(rows: Iterable[tuple], score: Callable[[tuple], float], window: int,
+                          budget: Optional[int] = None) -> Iterator[tuple]:
+    """저메모리 모드: 스트림을 window개씩 끊어 구간마다 점수 순으로 내보냅니다.
+
+    순서는 구간 안에서만 맞으므로(뒤쪽 구간의 인기 차량은 앞 구간 뒤에 수집) 메모리를 아껴야 할 때만 사용합니다.
+    """
+    it = iter(rows)
+    emitted = 0
+    while budget is None or emitted < budget:
+        chunk = list(islice(it, max(1, window)))
+        if not chunk:
+            return
+        # sorted는 안정 정렬 → 동점이면 먼저 본 행 우선
+        for row in sorted(chunk, key=score, reverse=True):
+            if budget is not None and emitted >= budget:
+                return
+            yield row
+            emitted += 1
@@ -1,105 +1,227 @@
-from datetime import datetime
-from bs4 import BeautifulSoup
-import pandas as pd
-import requests
-import re
-
-
-#국민은행 자동차 대출상품 크롤링
-res = requests.get('https://obank.kbstar.com/quics?page=C103573')
-soup = BeautifulSoup(res.text , 'html.parser')
-title_tag = soup.select('.title')
-
-result = []
-for tag in title_tag:
-  temp = {}
-  # strong 태그에서 제목 추출
-  strong_tag = tag.select_one('strong')
-  if strong_tag:
-    temp['title'] = strong_tag.get_text(strip=True)
-  else:
-    temp['title'] = None
-  
-  # onclick에서 ln_code 추출
-  onclick = tag.attrs['onclick']
-  ln_code = re.search(r'LN\d+', onclick)
-  if ln_code:
-    temp['ln_code'] = ln_code.group()
-  
-    
-  result.append(temp)
-
-print(result)
-
-loan_data = []
-
-for item in result:
-    ln_res = requests.get(f'https://obank.kbstar.com/quics?page=C103573&cc=b104363:b104516&isNew=N&prcode={item["ln_code"]}&QSL=F')
-    soup = BeautifulSoup(ln_res.text , 'html.parser')
-    loan_rate = soup.select('td[align="center"]')
-
-    # 크롤링한 데이터에서 금리 정보 추출 (숫자만)
-    rate_values = []
-    for i, td in enumerate(loan_rate[:12]):
-        text = td.get_text(strip=True)
-        # 숫자 패턴 찾기 (소수점 포함)
-        match = re.search(r'(\d+\.?\d*)', text)
-        if match:
-            try:
-                rate_values.append(float(match.group(1)))
-            except ValueError:
-                rate_values.append(None)
-        else:
-            rate_values.append(None)
-
-    # 인덱스 0, 6번 제외하고 가져오기
-    exclude_indices = [0, 6]
-    filtered_rates = []
-    for i, value in enumerate(rate_values):
-        if i not in exclude_indices and value is not None:
-            filtered_rates.append(value)
-    
-    # 기준금리, 가산금리, 우대금리, 최저금리, 최고금리 순서로 2번 반복
-    rate_labels = ['base_rate', 'spread_rate', 'pref_rate', 'min_rate', 'max_rate']
-    loan_terms = [6, 12]  # 2번 반복이므로 2개 기간
-
-    # 기본 정보 설정
-    bank_code = 'KB'
-    effective_date = datetime.now().strftime('%Y-%m-%d')
-    source_url = f'https://obank.kbstar.com/quics?page=C103573&cc=b104363:b104516&isNew=N&prcode={item["ln_code"]}&QSL=F'
-
-    # 데이터 매칭 - 5개씩 묶어서 처리
-    for i, term in enumerate(loan_terms):
-        start_idx = i * 5  # 각 기간마다 5개 금리
-        end_idx = start_idx + 5
-        
-        if end_idx <= len(filtered_rates):
-            term_rates = filtered_rates[start_idx:end_idx]
-            
-            loan_record = {
-                'product_name': item['title'],  # 상품명 추가
-                'ln_code': item['ln_code'],     # 상품코드 추가
-                'bank_code': bank_code,
-                'effective_date': effective_date,
-                'term_months': term,
-                'base_rate': term_rates[0] if len(term_rates) > 0 else None,
-                'spread_rate': term_rates[1] if len(term_rates) > 1 else None,
-                'pref_rate': term_rates[2] if len(term_rates) > 2 else None,
-                'min_rate': term_rates[3] if len(term_rates) > 3 else None,
-                'max_rate': term_rates[4] if len(term_rates) > 4 else None,
-                'source_url': source_url,
-                'scraped_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            loan_data.append(loan_record)
-
-# DataFrame 생성
-df = pd.DataFrame(loan_data)
-print("\n생성된 데이터셋:")
-print(df)
-  
-
-
-
-
+"""
+자동차 대출상품 금리 크롤러 (은행별 추출 규칙은 loan_extractors)
+
+- 등록된 은행 전체를 동시에 수집하고, 은행 안에서도 상품 페이지들을 커넥션 풀 세션으로 동시에 수집
+- 상품 페이지 내용 해시(loan_rate_pages)가 지난번과 같으면 파싱과 금리 저장을 건너뜀
+- loan_rates 테이블에 (bank_code, product_code, term_months, effective_date) 기준 UPSERT
+  → 같은 날 여러 번 돌려도 결과는 한 벌
+- latest_rates(): 상품/기간별 최신 금리를 프로세스 메모리에 캐시해 두고 반환
+  (TTL 동안은 DB 조회 없이 dict 조회만 하므로 금융 에이전트가 요청마다 불러도 부담 없음)
+
+사용법:
+    python finanace_crawler.py          # 등록된 전체 은행
+    python finanace_crawler.py KB       # 지정 은행만
+"""
+
+import os, sys, time, threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter, Retry
+from dotenv import load_dotenv
+
+# ===== 경로 & .env =====
+if '__file__' in globals():
+    REPO_ROOT = Path(__file__).resolve().parent.parent
+else:
+    REPO_ROOT = Path.cwd().parent
+load_dotenv(dotenv_path=REPO_ROOT.parent / ".env"); load_dotenv()
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import select, text
+
+from db.connection import Engine
+from db.model import Base, LoanRate, LoanRatePage
+from db.bulk import upsert_rows
+from loan_extractors import EXTRACTORS, BankExtractor
+
+LATEST_RATES_TTL = float(os.getenv("LOAN_RATES_CACHE_TTL", "600"))  # 초
+
+# ===== HTTP 세션 =====
+def make_session(pool_size: int = 8) -> requests.Session:
+    s = requests.Session()
+    retries = Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=pool_size, pool_maxsize=pool_size)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update({
+        "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                       "AppleWebKit/537.36 (KHTML, like Gecko) "
+                       "Chrome/140.0.0.0 Safari/537.36"),
+        "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+    })
+    return s
+
+# ===== 수집 =====
+class BankResult(NamedTuple):
+    bank_code: str
+    rates: List[Dict[str, Any]]      # 내용이 바뀐 상품의 loan_rates 행
+    pages: List[Dict[str, Any]]      # 내용이 바뀐 상품 페이지 (loan_rate_pages 행)
+    unchanged: List[Dict[str, Any]]  # 내용이 같은 상품 페이지 (checked_at만 갱신)
+    failed: int
+    error: Optional[str] = None
+
+def load_page_hashes(bank_codes: Sequence[str]) -> Dict[Tuple[str, str], str]:
+    """(bank_code, product_code) → 지난번 상품 페이지 해시"""
+    Base.metadata.create_all(Engine, tables=[LoanRate.__table__, LoanRatePage.__table__])
+    with Engine.connect() as conn:
+        rows = conn.execute(
+            select(LoanRatePage.bank_code, LoanRatePage.product_code, LoanRatePage.content_hash)
+            .where(LoanRatePage.bank_code.in_(list(bank_codes)))
+        )
+        return {(bank, product): content_hash for bank, product, content_hash in rows}
+
+def crawl_bank(extractor: BankExtractor, s: requests.Session, known_hashes: Dict[Tuple[str, str], str],
+               workers: int = 4, timeout: float = 10) -> BankResult:
+    """은행 하나: 상품 목록 → 상품 페이지 동시 수집 → 해시가 바뀐 페이지만 파싱"""
+    effective_date = date.today()
+    res = s.get(extractor.list_url, timeout=timeout)
+    res.raise_for_status()
+    products = extractor.parse_product_list(res.text)
+
+    def fetch(product):
+        url = extractor.product_url(product['product_code'])
+        try:
+            page = s.get(url, timeout=timeout)
+            page.raise_for_status()
+            return product, url, page.text
+        except requests.RequestException as e:
+            print(f"[WARN] {extractor.bank_code} {product['product_code']} 금리 페이지 실패: {e}")
+            return product, url, None
+
+    rates, pages, unchanged, failed = [], [], [], 0
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for product, url, html in pool.map(fetch, products):
+            if html is None:
+                failed += 1
+                continue
+            now = datetime.now()
+            key = {'bank_code': extractor.bank_code, 'product_code': product['product_code'], 'checked_at': now}
+            content_hash = extractor.content_fingerprint(html)
+            if known_hashes.get((extractor.bank_code, product['product_code'])) == content_hash:
+                unchanged.append(key)
+                continue
+            term_rates = extractor.parse_product_rates(html)
+            if not term_rates:
+                # 구조가 바뀌어 못 읽은 페이지는 해시를 남기지 않음 → 추출기 수정 후 다시 파싱되도록
+                print(f"[WARN] {extractor.bank_code} {product['product_code']} 금리표를 찾지 못함")
+                failed += 1
+                continue
+            pages.append({**key, 'content_hash': content_hash, 'changed_at': now})
+            rates.extend(
+                {
+                    'bank_code': extractor.bank_code,
+                    'product_code': product['product_code'],
+                    'product_name': product['product_name'],
+                    'effective_date': effective_date,
+                    'source_url': url,
+                    'scraped_at': now,
+                    **term_rate,
+                }
+                for term_rate in term_rates
+            )
+    return BankResult(extractor.bank_code, rates, pages, unchanged, failed)
+
+def crawl(bank_codes: Optional[Sequence[str]] = None, workers_per_bank: int = 4,
+          known_hashes: Optional[Dict[Tuple[str, str], str]] = None) -> List[BankResult]:
+    """등록된 은행(또는 bank_codes)을 동시에 수집합니다. 한 은행이 실패해도 나머지는 계속 진행."""
+    extractors = [EXTRACTORS[code] for code in (bank_codes or EXTRACTORS)]
+    if known_hashes is None:
+        known_hashes = load_page_hashes([e.bank_code for e in extractors])
+    s = make_session(pool_size=workers_per_bank * max(1, len(extractors)))
+
+    def run(extractor):
+        try:
+            return crawl_bank(extractor, s, known_hashes, workers=workers_per_bank)
+        except Exception as e:
+            print(f"[ERROR] {extractor.bank_code} 수집 실패: {e}")
+            return BankResult(extractor.bank_code, [], [], [], 0, error=str(e))
+
+    with ThreadPoolExecutor(max_workers=max(1, len(extractors))) as pool:
+        return list(pool.map(run, extractors))
+
+# ===== 저장 =====
+def save_results(results: Sequence[BankResult]) -> int:
+    """바뀐 금리/페이지 해시를 한 트랜잭션으로 저장하고 최신 금리 캐시를 비웁니다. 저장한 금리 행 수 반환"""
+    rates = [row for r in results for row in r.rates]
+    pages = [row for r in results for row in r.pages]
+    unchanged = [row for r in results for row in r.unchanged]
+    Base.metadata.create_all(Engine, tables=[LoanRate.__table__, LoanRatePage.__table__])
+    with Engine.begin() as conn:
+        saved = upsert_rows(conn, LoanRate.__table__, rates)
+        upsert_rows(conn, LoanRatePage.__table__, pages)
+        upsert_rows(conn, LoanRatePage.__table__, unchanged, update_columns=['checked_at'])
+    if rates:
+        _latest_rates.invalidate()
+    return saved
+
+# ===== 최신 금리 조회 (캐시) =====
+LATEST_RATES_SQL = """
+SELECT DISTINCT ON (bank_code, product_code, term_months)
+       bank_code, product_code, product_name, term_months, effective_date,
+       base_rate, spread_rate, pref_rate, min_rate, max_rate
+FROM loan_rates
+ORDER BY bank_code, product_code, term_months, effective_date DESC
+"""
+
+class _LatestRatesCache:
+    """(bank_code, term_months)별 최신 금리 목록을 TTL 동안 들고 있는 캐시"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._index: Dict[Tuple[Optional[str], Optional[int]], List[Dict[str, Any]]] = {}
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        self._loaded_at = 0.0
+
+    def _load(self):
+        with Engine.connect() as conn:
+            rows = [dict(row._mapping) for row in conn.execute(text(LATEST_RATES_SQL))]
+        index: Dict[Tuple[Optional[str], Optional[int]], List[Dict[str, Any]]] = {}
+        for row in rows:
+            # 필터 조합(은행/기간 지정 여부)별로 미리 묶어 둠 → 조회는 dict 한 번
+            for key in ((None, None), (row['bank_code'], None), (None, row['term_months']),
+                        (row['bank_code'], row['term_months'])):
+                index.setdefault(key, []).append(row)
+        self._index = index
+        self._loaded_at = time.monotonic()
+
+    def get(self, bank_code: Optional[str] = None, term_months: Optional[int] = None) -> List[Dict[str, Any]]:
+        if time.monotonic() - self._loaded_at > self.ttl:
+            with self._lock:
+                if time.monotonic() - self._loaded_at > self.ttl:  # 다른 스레드가 이미 갱신했으면 생략
+                    self._load()
+        return self._index.get((bank_code, term_months), [])
+
+_latest_rates = _LatestRatesCache(LATEST_RATES_TTL)
+
+def latest_rates(bank_code: Optional[str] = None, term_months: Optional[int] = None) -> List[Dict[str, Any]]:
+    """상품/기간별 최신 금리 목록. 반환된 dict는 캐시와 공유하므로 수정하지 마세요."""
+    return _latest_rates.get(bank_code, term_months)
+
+# ===== main =====
+def main(bank_codes: Optional[Sequence[str]] = None, workers_per_bank: int = 4) -> int:
+    started = time.time()
+    results = crawl(bank_codes, workers_per_bank=workers_per_bank)
+    saved = save_results(results)
+    for r in results:
+        status = f"실패: {r.error}" if r.error else (
+            f"변경 {len(r.pages)} / 동일 {len(r.unchanged)} / 실패 {r.failed}, 금리 {len(r.rates)}행")
+        print(f"  [{r.bank_code}] {status}")
+    print(f"[DB] loan_rates {saved}건 저장 ({time.time() - started:.1f}s)")
+    return saved
+
+
+if __name__ == "__main__":
+    main(bank_codes=sys.argv[1:] or None, workers_per_bank=int(os.getenv("LOAN_CRAWL_WORKERS", "4")))
@@ -0,0 +1,110 @@
+"""
+은행별 자동차 대출 금리 추출기
+
+은행마다 페이지 구조가 달라서 추출 규칙만 은행별 클래스로 나누고,
+수집/변경 감지/저장은 finanace_crawler가 공통으로 처리합니다.
+
+새 은행 추가:
+    @register
+    class XXExtractor(BankExtractor):
+        bank_code = 'XX'
+        list_url = '...'
+        def product_url(self, product_code): ...
+        def parse_product_list(self, html): ...   # → [{'product_code', 'product_name'}]
+        def parse_product_rates(self, html): ...  # → [{'term_months', 'base_rate', ...}]
+
+그리고 fixtures/loan_rates/<bank_code 소문자>_list.html, _product.html, _expected.json을 넣으면
+check_loan_extractors.py가 같이 검사합니다.
+"""
+
+import re
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+RATE_LABELS = ['base_rate', 'spread_rate', 'pref_rate', 'min_rate', 'max_rate']
+
+
+class BankExtractor:
+    """은행 하나의 상품 목록/상품 금리 페이지 추출 규칙"""
+
+    bank_code: str = ''
+    list_url: str = ''
+
+    def product_url(self, product_code: str) -> str:
+        raise NotImplementedError
+
+    def parse_product_list(self, html: str) -> List[Dict[str, Optional[str]]]:
+        raise NotImplementedError
+
+    def parse_product_rates(self, html: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def content_fingerprint(self, html: str) -> str:
+        """변경 감지용 해시 (파싱 전에 계산). 세션 토큰/시각처럼 매번 바뀌는 부분이 있으면 정규식으로 지우고 해시하도록 재정의"""
+        return hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+EXTRACTORS: Dict[str, BankExtractor] = {}
+
+def register(cls):
+    """추출기 클래스를 EXTRACTORS에 등록하는 데코레이터"""
+    EXTRACTORS[cls.bank_code] = cls()
+    return cls
+
+
+def _rate_value(text_value: str) -> Optional[float]:
+    # 숫자 패턴 찾기 (소수점 포함)
+    match = re.search(r'(\d+\.?\d*)', text_value)
+    return float(match.group(1)) if match else None
+
+
+@register
+class KBExtractor(BankExtractor):
+    """국민은행(KB) 자동차 대출"""
+
+    bank_code = 'KB'
+    list_url = 'https://obank.kbstar.com/quics?page=C103573'
+    TERM_LABEL = re.compile(r'(\d+)\s*(개월|년)')
+
+    def product_url(self, product_code: str) -> str:
+        return f'https://obank.kbstar.com/quics?page=C103573&cc=b104363:b104516&isNew=N&prcode={product_code}&QSL=F'
+
+    def parse_product_list(self, html: str) -> List[Dict[str, Optional[str]]]:
+        soup = BeautifulSoup(html, 'html.parser')
+        products = []
+        for tag in soup.select('.title'):
+            # strong 태그에서 제목, onclick에서 ln_code 추출
+            strong_tag = tag.select_one('strong')
+            ln_code = re.search(r'LN\d+', tag.attrs.get('onclick', ''))
+            if ln_code:
+                products.append({
+                    'product_code': ln_code.group(),
+                    'product_name': strong_tag.get_text(strip=True) if strong_tag else None,
+                })
+        return products
+
+    def parse_product_rates(self, html: str) -> List[Dict[str, Any]]:
+        """금리표를 앞에서부터 읽으며 기간 라벨(예: '6개월', '1년') 칸이 나오면 새 기간을 시작하고,
+        뒤따르는 숫자 칸 5개를 기준/가산/우대/최저/최고 금리로 묶습니다."""
+        term_rates = []
+        current: Optional[Dict[str, Any]] = None
+        values: List[float] = []
+        for td in BeautifulSoup(html, 'html.parser').select('td[align="center"]'):
+            cell = td.get_text(strip=True)
+            label = self.TERM_LABEL.search(cell)
+            if label:
+                months = int(label.group(1)) * (12 if label.group(2) == '년' else 1)
+                current, values = {'term_months': months}, []
+                continue
+            if current is None:
+                continue
+            value = _rate_value(cell)
+            if value is None:
+                continue
+            values.append(value)
+            if len(values) == len(RATE_LABELS):
+                term_rates.append({**current, **dict(zip(RATE_LABELS, values))})
+                current = None
+        return term_rates